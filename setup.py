@@ -36,7 +36,12 @@ class Tox(TestCommand):
 
 
 long_description = read('README.rst', 'HISTORY.rst')
-install_requires = ['PySide']
+# PySide is only available up to Python 3.4, newer versions get a newer binding
+install_requires = ['PySide; python_version < "3.5"',
+                    'PySide2; python_version >= "3.5" and python_version < "3.7"',
+                    'PySide6; python_version >= "3.7"']
+# alternative bindings. The binding is chosen at runtime, see qmenuview.qt
+extras_require = {'pyside2': ['PySide2'], 'pyside6': ['PySide6']}
 tests_require = ['tox']
 
 
@@ -53,6 +58,7 @@ setup(
     include_package_data=True,
     tests_require=tests_require,
     install_requires=install_requires,
+    extras_require=extras_require,
     cmdclass={'test': Tox},
     license='BSD',
     zip_safe=False,
@@ -1,9 +1,49 @@
 from __future__ import absolute_import
 
-from .view import *
+import importlib
+import sys
+import types
+
+from .setdataargs import SetDataArgs
+
+_LAZY = {'BatchMenu': 'menu', 'suspended_layout': 'menu',
+         'MenuView': 'view',
+         'TreeSource': 'source', 'NestedSource': 'source',
+         'MenuStore': 'store', 'StoreNode': 'store'}
+"""The exported names, that need Qt, and their modules.
+They are imported on first access, so ``import qmenuview`` does not import Qt."""
+
+__all__ = ['SetDataArgs']
+__all__ += sorted(_LAZY)
+
+
+class _LazyModule(types.ModuleType):
+    """The package module, that imports the names of :data:`_LAZY` on first access
+
+    A module level ``__getattr__`` needs Python 3.7. So the package replaces
+    itself in :data:`sys.modules` with an instance of this class on every version.
+    """
+
+    def __getattr__(self, name):
+        # only called for names, that are not loaded yet
+        try:
+            module = _LAZY[name]
+        except KeyError:
+            raise AttributeError('module %r has no attribute %r' % (self.__name__, name))
+        value = getattr(importlib.import_module('.' + module, self.__name__), name)
+        setattr(self, name, value)
+        return value
+
+    def __dir__(self, ):
+        return sorted(set(self.__dict__) | set(_LAZY))
 
-__all__ = [view.__all__]
 
 __author__ = 'David Zuber'
 __email__ = 'zuber.david@gmx.de'
 __version__ = '0.1.4'
+
+_package = _LazyModule(__name__, __doc__)
+_package.__dict__.update(globals())
+# keep the original module alive, Python 2 clears the globals of collected modules
+_package._module = sys.modules[__name__]
+sys.modules[__name__] = _package
@@ -0,0 +1,217 @@
+"""The column configuration, that :class:`qmenuview.MenuView` and :class:`qmenuview.MenuStore` share
+
+Both convert the data of a row with the same columns and :class:`qmenuview.SetDataArgs`.
+:class:`DataColumns` holds them, so the defaults and the conversions are defined once.
+"""
+from .qt import QtCore, QtGui
+
+from .icons import PendingIcon
+from .setdataargs import SetDataArgs
+
+__all__ = ['COLUMNS', 'DataColumns']
+
+COLUMNS = ['text_column', 'icon_column', 'icontext_column', 'tooltip_column',
+           'checked_column', 'whatsthis_column', 'statustip_column']
+"""The names of the column attributes"""
+
+
+def _observed_column(name):
+    """Return a property for a column attribute,
+    that reports the affected :class:`SetDataArgs` when it changes
+
+    :param name: the name of the attribute
+    :type name: :class:`str`
+    :returns: the property
+    :rtype: :class:`property`
+    :raises: None
+    """
+    attr = '_' + name
+
+    def fget(self):
+        return getattr(self, attr)
+
+    def fset(self, value):
+        old = getattr(self, attr, None)
+        setattr(self, attr, value)
+        if old is not None and old != value:
+            self._data_args_changed([args for args in self.setdataargs if args.column == name])
+
+    return property(fget, fset)
+
+
+def _args_key(setdataarg):
+    """Return the attributes of the container, that define what is applied
+
+    :param setdataarg: the data argument
+    :type setdataarg: :class:`SetDataArgs`
+    :returns: the setter, column, role and conversion function
+    :rtype: :class:`tuple`
+    :raises: None
+    """
+    return setdataarg.setfunc, setdataarg.column, setdataarg.role, setdataarg.convertfunc
+
+
+class DataColumns(object):
+    """A mixin with the columns and :class:`SetDataArgs`, that define how the data
+    of a row is converted for an action
+
+    Call :meth:`DataColumns._init_data_columns` in ``__init__`` to set the defaults.
+    Override :meth:`DataColumns._data_args_changed` to apply changes.
+    """
+
+    text_column = _observed_column('text_column')
+    """The column for the action text. Default 0"""
+    icon_column = _observed_column('icon_column')
+    """The column for the action icon. Default 0"""
+    icontext_column = _observed_column('icontext_column')
+    """The column for the action icon text. Default -1"""
+    tooltip_column = _observed_column('tooltip_column')
+    """The column for the tooltip data. Default 0"""
+    checked_column = _observed_column('checked_column')
+    """The column for the checked data. Has to be checkable. Default 0"""
+    whatsthis_column = _observed_column('whatsthis_column')
+    """The column for the whatsThis text. Default 0"""
+    statustip_column = _observed_column('statustip_column')
+    """The column for the statustip text. Default 0"""
+
+    def _init_data_columns(self, ):
+        """Set the default columns and :data:`DataColumns.setdataargs`
+
+        :returns: None
+        :rtype: None
+        :raises: None
+        """
+        self.text_column = 0
+        self.icon_column = 0
+        self.icontext_column = -1
+        self.tooltip_column = 0
+        self.checked_column = 0
+        self.whatsthis_column = 0
+        self.statustip_column = 0
+        Qt = QtCore.Qt
+        args = [SetDataArgs('setText', 'text_column', Qt.DisplayRole, str),
+                SetDataArgs('setIcon', 'icon_column', Qt.DecorationRole, self._process_icondata),
+                SetDataArgs('setIconText', 'icontext_column', Qt.DisplayRole, str),
+                SetDataArgs('setToolTip', 'tooltip_column', Qt.ToolTipRole, str),
+                SetDataArgs('setChecked', 'checked_column', Qt.CheckStateRole, self._checkconvertfunc),
+                SetDataArgs('setWhatsThis', 'whatsthis_column', Qt.WhatsThisRole, str),
+                SetDataArgs('setStatusTip', 'statustip_column', Qt.StatusTipRole, str)]
+        self.setdataargs = args
+
+    @property
+    def setdataargs(self, ):
+        """Get the list of :class:`SetDataArgs` containers. Defines how the
+        data from the model is applied to the action
+
+        :returns: the data arguments
+        :rtype: :class:`list` of :class:`SetDataArgs`
+        :raises: None
+        """
+        return self._setdataargs
+
+    @setdataargs.setter
+    def setdataargs(self, setdataargs):
+        """Set the list of :class:`SetDataArgs` containers
+
+        The list is compared with the containers of the last assignment.
+        New and changed containers and the setters, that are not used anymore,
+        are passed to :meth:`DataColumns._data_args_changed`.
+        So after changing the list or a container in place, assign the list again.
+
+        :param setdataargs: the data arguments
+        :type setdataargs: :class:`list` of :class:`SetDataArgs`
+        :returns: None
+        :rtype: None
+        :raises: None
+        """
+        first = getattr(self, '_setdataargs', None) is None
+        self._setdataargs = setdataargs
+        if first:
+            self._data_args_state = [(args, _args_key(args)) for args in setdataargs]
+            return
+        changed, cleared = self._diff_data_args()
+        if changed or cleared:
+            self._data_args_changed(changed, cleared)
+
+    def _diff_data_args(self, ):
+        """Compare :data:`DataColumns.setdataargs` with the state of the last comparison
+
+        A container is changed, if it is new, if one of its attributes changed or
+        if it shares the setter with a removed or changed container.
+        The setters of removed or changed containers, that no container uses anymore, are cleared.
+
+        :returns: the changed containers and the cleared setters
+        :rtype: :class:`tuple` of :class:`list` of :class:`SetDataArgs`, :class:`list` of :class:`str`
+        :raises: None
+        """
+        old = self._data_args_state
+        new = self._setdataargs
+        self._data_args_state = [(args, _args_key(args)) for args in new]
+        oldkeys = dict((id(args), key) for args, key in old)
+        newids = set(id(args) for args in new)
+        stale = set(key[0] for args, key in old if id(args) not in newids)
+        for args, key in self._data_args_state:
+            oldkey = oldkeys.get(id(args))
+            if oldkey is not None and oldkey != key:
+                stale.add(oldkey[0])
+        changed = [args for args, key in self._data_args_state
+                   if oldkeys.get(id(args)) != key or args.setfunc in stale]
+        used = set(args.setfunc for args in new)
+        cleared = sorted(setfunc for setfunc in stale if setfunc not in used)
+        return changed, cleared
+
+    def _data_args_changed(self, setdataargs, cleared=()):
+        """Called, when a column or :data:`DataColumns.setdataargs` changed
+
+        Does nothing by default.
+
+        :param setdataargs: the affected data arguments
+        :type setdataargs: :class:`list` of :class:`SetDataArgs`
+        :param cleared: the setters, that no container uses anymore
+        :type cleared: :class:`list` of :class:`str`
+        :returns: None
+        :rtype: None
+        :raises: None
+        """
+        pass
+
+    def _data_columns(self, ):
+        """Return the current value of every column attribute
+
+        :returns: the columns in the order of :data:`COLUMNS`
+        :rtype: :class:`list` of :class:`int`
+        :raises: None
+        """
+        return [getattr(self, name) for name in COLUMNS]
+
+    @staticmethod
+    def _process_icondata(icondata):
+        """Return an icon for the data of the :data:`PySide.QtCore.Qt.DecorationRole`
+
+        File paths and byte buffers are decoded asynchronously.
+        For them a :class:`qmenuview.icons.PendingIcon` is returned.
+        Other strings are names of theme icons. See :meth:`qmenuview.icons.PendingIcon.is_theme_name`.
+
+        :param icondata: The data from the :data:`PySide.QtCore.Qt.DecorationRole`
+        :type icondata: :class:`PySide.QtGui.QIcon` | :class:`PySide.QtGui.QPixmap` |
+                        :class:`str` | :class:`bytes`
+        :returns: A Icon based on the data.
+        :rtype: :class:`PySide.QtGui.QIcon` | :class:`qmenuview.icons.PendingIcon`
+        :raises: None
+        """
+        if isinstance(icondata, QtGui.QIcon):
+            return icondata
+        if isinstance(icondata, QtGui.QPixmap):
+            return QtGui.QIcon(icondata)
+        if PendingIcon.is_theme_name(icondata):
+            return QtGui.QIcon.fromTheme(icondata)
+        if isinstance(icondata, PendingIcon.types):
+            return PendingIcon(icondata)
+
+    @staticmethod
+    def _checkconvertfunc(data):
+        if data is None:
+            return False
+        # newer bindings use enums, which can not be converted with int
+        checked = QtCore.Qt.Checked
+        return int(getattr(data, 'value', data)) == int(getattr(checked, 'value', checked))
@@ -0,0 +1,543 @@
+"""A compact list model for very large flat menus
+
+A :class:`PySide.QtGui.QStandardItemModel` allocates one item per row.
+:class:`FlatListModel` keeps each column in contiguous arrays instead:
+the texts are UTF-8 encoded in one buffer with an offset per row,
+the enabled, checkable and checked state are one byte per row::
+
+  model = FlatListModel()
+  model.append(recent_files, tooltips=recent_paths)
+  view.model = model
+
+Bulk changes emit one signal for the whole range.
+"""
+from array import array
+
+from .qt import QtCore
+
+__all__ = ['FlatListModel', 'ENABLED', 'CHECKABLE', 'CHECKED']
+
+ENABLED = 1
+"""Flag bit for an enabled row"""
+CHECKABLE = 2
+"""Flag bit for a checkable row"""
+CHECKED = 4
+"""Flag bit for a checked row"""
+
+_OFFSET_TYPE = 'L'
+"""The array type of the text offsets"""
+
+try:
+    _text_types = basestring
+except NameError:  # python 3
+    _text_types = str
+
+
+def _int(value):
+    """Return the integer value of a Qt enum or integer
+
+    :param value: the enum or integer
+    :returns: the integer
+    :rtype: :class:`int`
+    :raises: None
+    """
+    return int(getattr(value, 'value', value))
+
+
+def _shifted(offsets, shift):
+    """Return a copy of the offsets moved by shift
+
+    :param offsets: the offsets
+    :type offsets: :class:`array.array`
+    :param shift: the difference, that is added
+    :type shift: :class:`int`
+    :returns: the moved offsets
+    :rtype: :class:`array.array`
+    :raises: None
+    """
+    # map with a bound builtin runs in C, unlike a comprehension
+    return array(_OFFSET_TYPE, map(shift.__add__, offsets))
+
+
+class _TextColumn(object):
+    """The UTF-8 encoded texts of all rows in one buffer"""
+
+    __slots__ = ('data', 'offsets')
+
+    def __init__(self, ):
+        """Initialize a new empty column
+
+        :raises: None
+        """
+        self.data = bytearray()
+        """The encoded texts of all rows"""
+        self.offsets = array(_OFFSET_TYPE, [0])
+        """The start of each row in data and the end of the last row"""
+
+    def __len__(self, ):
+        return len(self.offsets) - 1
+
+    def get(self, row):
+        """Return the text of the row
+
+        :param row: the row
+        :type row: :class:`int`
+        :returns: the text
+        :rtype: :class:`str`
+        :raises: :class:`IndexError` for an invalid row
+        """
+        offsets = self.offsets
+        return self.data[offsets[row]:offsets[row + 1]].decode('utf-8')
+
+    def insert(self, row, texts):
+        """Insert the texts before the given row
+
+        :param row: the row to insert before. The number of rows appends.
+        :type row: :class:`int`
+        :param texts: the texts. None is stored as empty text.
+        :type texts: sequence of :class:`str` | None
+        :returns: None
+        :rtype: None
+        :raises: None
+        """
+        chunks = [(t or u'').encode('utf-8') for t in texts]
+        start = self.offsets[row]
+        new = array(_OFFSET_TYPE)
+        end = start
+        for chunk in chunks:
+            end += len(chunk)
+            new.append(end)
+        self.data[start:start] = b''.join(chunks)
+        shift = end - start
+        tail = self.offsets[row + 1:]
+        if shift and tail:
+            tail = _shifted(tail, shift)
+        self.offsets[row + 1:] = new + tail
+
+    def remove(self, first, last):
+        """Remove the rows first til last
+
+        :param first: the first row
+        :type first: :class:`int`
+        :param last: the last row
+        :type last: :class:`int`
+        :returns: None
+        :rtype: None
+        :raises: None
+        """
+        start, end = self.offsets[first], self.offsets[last + 1]
+        del self.data[start:end]
+        shift = end - start
+        tail = self.offsets[last + 2:]
+        if shift and tail:
+            tail = _shifted(tail, -shift)
+        self.offsets[first + 1:] = tail
+
+    def replace(self, first, texts):
+        """Replace the texts of the rows starting at first
+
+        If the encoded length of the rows stays the same, only their bytes and offsets are patched.
+        Else the offsets of the following rows are moved once.
+
+        :param first: the first row
+        :type first: :class:`int`
+        :param texts: the new texts. None is stored as empty text.
+        :type texts: sequence of :class:`str` | None
+        :returns: None
+        :rtype: None
+        :raises: None
+        """
+        chunks = [(t or u'').encode('utf-8') for t in texts]
+        last = first + len(chunks) - 1
+        offsets = self.offsets
+        start, end = offsets[first], offsets[last + 1]
+        new = array(_OFFSET_TYPE)
+        pos = start
+        for chunk in chunks:
+            pos += len(chunk)
+            new.append(pos)
+        self.data[start:end] = b''.join(chunks)
+        offsets[first + 1:last + 2] = new
+        shift = pos - end
+        if shift and last + 2 < len(offsets):
+            offsets[last + 2:] = _shifted(offsets[last + 2:], shift)
+
+
+class FlatListModel(QtCore.QAbstractListModel):
+    """A single level model, that stores its columns in contiguous arrays.
+
+    Each row has a text, an optional tool tip and status tip and flag bits
+    (:data:`ENABLED`, :data:`CHECKABLE`, :data:`CHECKED`).
+    The tool tip and status tip columns are only allocated, once they are used.
+
+    :meth:`FlatListModel.append`, :meth:`FlatListModel.insert`, :meth:`FlatListModel.remove`,
+    :meth:`FlatListModel.update` and :meth:`FlatListModel.replace` change many rows
+    with one model signal, so a :class:`qmenuview.MenuView` handles them in one pass.
+    """
+
+    def __init__(self, texts=(), parent=None):
+        """Initialize a new model with the given texts
+
+        :param texts: the texts of the rows
+        :type texts: sequence of :class:`str`
+        :param parent: the parent object
+        :type parent: :class:`PySide.QtCore.QObject`
+        :raises: None
+        """
+        super(FlatListModel, self).__init__(parent)
+        self._texts = _TextColumn()
+        self._tooltips = None
+        self._statustips = None
+        self._flags = array('B')
+        Qt = QtCore.Qt
+        self._itemflags = []
+        """The item flags for every combination of flag bits"""
+        for bits in range(8):
+            flags = Qt.NoItemFlags
+            if bits & ENABLED:
+                flags |= Qt.ItemIsEnabled | Qt.ItemIsSelectable
+            if bits & CHECKABLE:
+                flags |= Qt.ItemIsUserCheckable
+            self._itemflags.append(flags)
+        self._getters = {_int(Qt.DisplayRole): self._get_text,
+                         _int(Qt.EditRole): self._get_text,
+                         _int(Qt.CheckStateRole): self._get_checkstate,
+                         _int(Qt.ToolTipRole): self._get_tooltip,
+                         _int(Qt.StatusTipRole): self._get_statustip}
+        """The data getters by role. A dictionary is faster than comparing the role with each enum."""
+        if texts:
+            self._insert(0, texts, None, None, None)
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        """Return the number of rows
+
+        :param parent: the parent index. Only the invalid root has rows.
+        :type parent: :class:`PySide.QtCore.QModelIndex`
+        :returns: the number of rows
+        :rtype: :class:`int`
+        :raises: None
+        """
+        if parent.isValid():
+            return 0
+        return len(self._flags)
+
+    def hasChildren(self, parent=QtCore.QModelIndex()):
+        """Return True, if the parent has rows
+
+        :class:`PySide.QtCore.QAbstractListModel` makes this method private,
+        but :class:`qmenuview.MenuView` calls it for every row.
+
+        :param parent: the parent index. Only the invalid root has rows.
+        :type parent: :class:`PySide.QtCore.QModelIndex`
+        :returns: True, if the parent has rows
+        :rtype: :class:`bool`
+        :raises: None
+        """
+        return not parent.isValid() and len(self._flags) > 0
+
+    def data(self, index, role=QtCore.Qt.DisplayRole):
+        """Return the data of the index for the given role
+
+        :param index: the index
+        :type index: :class:`PySide.QtCore.QModelIndex`
+        :param role: the data role
+        :type role: :data:`PySide.QtCore.Qt.ItemDataRole`
+        :returns: the data or None
+        :raises: None
+        """
+        row = index.row()
+        if not index.isValid() or index.column() or row >= len(self._flags):
+            return None
+        getter = self._getters.get(_int(role))
+        if getter is None:
+            return None
+        return getter(row)
+
+    def _get_text(self, row):
+        """Return the text of the row
+
+        :param row: the row
+        :type row: :class:`int`
+        :returns: the text
+        :rtype: :class:`str`
+        :raises: None
+        """
+        return self._texts.get(row)
+
+    def _get_checkstate(self, row):
+        """Return the check state of a checkable row
+
+        :param row: the row
+        :type row: :class:`int`
+        :returns: the check state or None, if the row is not checkable
+        :rtype: :data:`PySide.QtCore.Qt.CheckState` | None
+        :raises: None
+        """
+        bits = self._flags[row]
+        if not bits & CHECKABLE:
+            return None
+        return QtCore.Qt.Checked if bits & CHECKED else QtCore.Qt.Unchecked
+
+    def _get_tooltip(self, row):
+        """Return the tool tip of the row
+
+        :param row: the row
+        :type row: :class:`int`
+        :returns: the tool tip or None
+        :rtype: :class:`str` | None
+        :raises: None
+        """
+        return self._get_optional(self._tooltips, row)
+
+    def _get_statustip(self, row):
+        """Return the status tip of the row
+
+        :param row: the row
+        :type row: :class:`int`
+        :returns: the status tip or None
+        :rtype: :class:`str` | None
+        :raises: None
+        """
+        return self._get_optional(self._statustips, row)
+
+    @staticmethod
+    def _get_optional(column, row):
+        """Return the text of an optional column or None, if it is empty
+
+        :param column: the column or None, if it is not allocated
+        :type column: :class:`_TextColumn` | None
+        :param row: the row
+        :type row: :class:`int`
+        :returns: the text or None
+        :rtype: :class:`str` | None
+        :raises: None
+        """
+        if column is None:
+            return None
+        return column.get(row) or None
+
+    def flags(self, index):
+        """Return the item flags of the index
+
+        :param index: the index
+        :type index: :class:`PySide.QtCore.QModelIndex`
+        :returns: the item flags
+        :rtype: :data:`PySide.QtCore.Qt.ItemFlags`
+        :raises: None
+        """
+        if not index.isValid() or index.row() >= len(self._flags):
+            return QtCore.Qt.NoItemFlags
+        return self._itemflags[self._flags[index.row()] & (ENABLED | CHECKABLE)]
+
+    def setData(self, index, value, role=QtCore.Qt.EditRole):
+        """Set the text or the check state of the index
+
+        :param index: the index
+        :type index: :class:`PySide.QtCore.QModelIndex`
+        :param value: the new text or check state. Values, that are no text, are not set.
+        :param role: :data:`PySide.QtCore.Qt.EditRole`, :data:`PySide.QtCore.Qt.DisplayRole`
+                     or :data:`PySide.QtCore.Qt.CheckStateRole`
+        :type role: :data:`PySide.QtCore.Qt.ItemDataRole`
+        :returns: True, if the data was set
+        :rtype: :class:`bool`
+        :raises: None
+        """
+        if not index.isValid() or index.row() >= len(self._flags):
+            return False
+        Qt = QtCore.Qt
+        row = index.row()
+        if role == Qt.CheckStateRole:
+            checked = _int(value) == _int(Qt.Checked)
+            self._set_bits(row, [self._flags[row] & ~CHECKED | (CHECKED if checked else 0)])
+        elif role in (Qt.EditRole, Qt.DisplayRole):
+            if value is not None and not isinstance(value, _text_types):
+                return False
+            self._texts.replace(row, [value])
+        else:
+            return False
+        self.dataChanged.emit(index, index)
+        return True
+
+    def append(self, texts, tooltips=None, statustips=None, flags=None):
+        """Append rows with one signal
+
+        :param texts: the texts of the new rows
+        :type texts: sequence of :class:`str`
+        :param tooltips: the tool tips or None
+        :type tooltips: sequence of :class:`str` | None
+        :param statustips: the status tips or None
+        :type statustips: sequence of :class:`str` | None
+        :param flags: the flag bits of the rows. Default is :data:`ENABLED`.
+        :type flags: sequence of :class:`int` | None
+        :returns: None
+        :rtype: None
+        :raises: :class:`ValueError` if the sequences differ in length
+        """
+        self.insert(len(self._flags), texts, tooltips, statustips, flags)
+
+    def insert(self, row, texts, tooltips=None, statustips=None, flags=None):
+        """Insert rows before the given row with one signal
+
+        :param row: the row to insert before
+        :type row: :class:`int`
+        :param texts: the texts of the new rows
+        :type texts: sequence of :class:`str`
+        :param tooltips: the tool tips or None
+        :type tooltips: sequence of :class:`str` | None
+        :param statustips: the status tips or None
+        :type statustips: sequence of :class:`str` | None
+        :param flags: the flag bits of the rows. Default is :data:`ENABLED`.
+        :type flags: sequence of :class:`int` | None
+        :returns: None
+        :rtype: None
+        :raises: :class:`ValueError` if the sequences differ in length
+        :raises: :class:`IndexError` if the row is out of range
+        """
+        if not 0 <= row <= len(self._flags):
+            raise IndexError('row %s out of range' % row)
+        self._check_lengths(texts, tooltips, statustips, flags)
+        if not texts:
+            return
+        self.beginInsertRows(QtCore.QModelIndex(), row, row + len(texts) - 1)
+        self._insert(row, texts, tooltips, statustips, flags)
+        self.endInsertRows()
+
+    def remove(self, first, last):
+        """Remove the rows first til last with one signal
+
+        :param first: the first row
+        :type first: :class:`int`
+        :param last: the last row
+        :type last: :class:`int`
+        :returns: None
+        :rtype: None
+        :raises: :class:`IndexError` if the range is invalid
+        """
+        if not 0 <= first <= last < len(self._flags):
+            raise IndexError('rows %s to %s out of range' % (first, last))
+        self.beginRemoveRows(QtCore.QModelIndex(), first, last)
+        for column in (self._texts, self._tooltips, self._statustips):
+            if column is not None:
+                column.remove(first, last)
+        del self._flags[first:last + 1]
+        self.endRemoveRows()
+
+    def update(self, first, texts=None, tooltips=None, statustips=None, flags=None):
+        """Replace the data of the rows starting at first with one signal
+
+        Only the given columns are replaced. The number of rows stays the same.
+
+        :param first: the first row to update
+        :type first: :class:`int`
+        :param texts: the new texts or None
+        :type texts: sequence of :class:`str` | None
+        :param tooltips: the new tool tips or None
+        :type tooltips: sequence of :class:`str` | None
+        :param statustips: the new status tips or None
+        :type statustips: sequence of :class:`str` | None
+        :param flags: the new flag bits or None
+        :type flags: sequence of :class:`int` | None
+        :returns: None
+        :rtype: None
+        :raises: :class:`ValueError` if the sequences differ in length
+        :raises: :class:`IndexError` if the rows are out of range
+        """
+        count = self._check_lengths(texts, tooltips, statustips, flags)
+        if not count:
+            return
+        last = first + count - 1
+        if not 0 <= first <= last < len(self._flags):
+            raise IndexError('rows %s to %s out of range' % (first, last))
+        if texts is not None:
+            self._texts.replace(first, texts)
+        if tooltips is not None:
+            self._tooltips = self._allocate(self._tooltips)
+            self._tooltips.replace(first, tooltips)
+        if statustips is not None:
+            self._statustips = self._allocate(self._statustips)
+            self._statustips.replace(first, statustips)
+        if flags is not None:
+            self._set_bits(first, flags)
+        self.dataChanged.emit(self.index(first, 0), self.index(last, 0))
+
+    def replace(self, texts, tooltips=None, statustips=None, flags=None):
+        """Replace all rows with a reset
+
+        :param texts: the texts of the new rows
+        :type texts: sequence of :class:`str`
+        :param tooltips: the tool tips or None
+        :type tooltips: sequence of :class:`str` | None
+        :param statustips: the status tips or None
+        :type statustips: sequence of :class:`str` | None
+        :param flags: the flag bits of the rows. Default is :data:`ENABLED`.
+        :type flags: sequence of :class:`int` | None
+        :returns: None
+        :rtype: None
+        :raises: :class:`ValueError` if the sequences differ in length
+        """
+        self._check_lengths(texts, tooltips, statustips, flags)
+        self.beginResetModel()
+        self._texts = _TextColumn()
+        self._tooltips = None
+        self._statustips = None
+        self._flags = array('B')
+        self._insert(0, texts, tooltips, statustips, flags)
+        self.endResetModel()
+
+    @staticmethod
+    def _check_lengths(texts, *columns):
+        """Return the number of rows of the columns, that are not None
+
+        :returns: the number of rows
+        :rtype: :class:`int`
+        :raises: :class:`ValueError` if the columns differ in length
+        """
+        lengths = set(len(c) for c in (texts,) + columns if c is not None)
+        if len(lengths) > 1:
+            raise ValueError('the columns differ in length: %s' % sorted(lengths))
+        return lengths.pop() if lengths else 0
+
+    def _allocate(self, column):
+        """Return the optional column or a new one with empty texts for all rows
+
+        :param column: the optional column or None
+        :type column: :class:`_TextColumn` | None
+        :returns: the column
+        :rtype: :class:`_TextColumn`
+        :raises: None
+        """
+        if column is None:
+            column = _TextColumn()
+            column.offsets = array(_OFFSET_TYPE, [0] * (len(self._flags) + 1))
+        return column
+
+    def _insert(self, row, texts, tooltips, statustips, flags):
+        """Insert the rows into the arrays without a signal
+
+        :returns: None
+        :rtype: None
+        :raises: None
+        """
+        count = len(texts)
+        if tooltips is not None:
+            self._tooltips = self._allocate(self._tooltips)
+        if statustips is not None:
+            self._statustips = self._allocate(self._statustips)
+        self._texts.insert(row, texts)
+        for column, values in ((self._tooltips, tooltips), (self._statustips, statustips)):
+            if column is not None:
+                column.insert(row, values if values is not None else [None] * count)
+        self._flags[row:row] = array('B', flags if flags is not None else [ENABLED] * count)
+
+    def _set_bits(self, first, flags):
+        """Set the flag bits of the rows starting at first
+
+        :param first: the first row
+        :type first: :class:`int`
+        :param flags: the flag bits
+        :type flags: sequence of :class:`int`
+        :returns: None
+        :rtype: None
+        :raises: None
+        """
+        self._flags[first:first + len(flags)] = array('B', flags)
@@ -0,0 +1,288 @@
+import hashlib
+import os
+import threading
+
+from .qt import QtCore, QtGui
+
+__all__ = ['IconLoader', 'PendingIcon', 'shared_loader']
+
+try:
+    _path_types = basestring
+except NameError:  # python 3
+    _path_types = str
+
+if bytes is str:  # python 2, a str is a path
+    _data_types = (bytearray, QtCore.QByteArray)
+else:
+    _data_types = (bytes, bytearray, QtCore.QByteArray)
+
+_shared = None
+
+
+def shared_loader():
+    """Return the loader, that is shared by all views without an own loader
+
+    :returns: the shared loader
+    :rtype: :class:`IconLoader`
+    :raises: None
+    """
+    global _shared
+    if _shared is None:
+        _shared = IconLoader(QtCore.QCoreApplication.instance())
+    return _shared
+
+
+class PendingIcon(object):
+    """Icon data, that still has to be decoded by an :class:`IconLoader`.
+
+    It is returned by :meth:`qmenuview.MenuView._process_icondata` for file paths and byte buffers.
+    """
+
+    __slots__ = ('data',)
+
+    types = (_path_types,) + _data_types
+    """The data types, that are decoded asynchronously. See :meth:`PendingIcon.is_theme_name`."""
+
+    def __init__(self, data):
+        """Initialize a new pending icon for the given data
+
+        :param data: a file path or the encoded image
+        :type data: :class:`str` | :class:`bytes` | :class:`bytearray` | :class:`PySide.QtCore.QByteArray`
+        :raises: None
+        """
+        self.data = data
+
+    @staticmethod
+    def is_theme_name(data):
+        """Return True, if the data is the name of a theme icon and not a file path
+
+        Strings with a directory separator or an extension are file paths,
+        e.g. ``'icons/open.png'`` or ``':/open.svg'``. Other strings are theme names
+        like ``'document-open'``, that are looked up with :meth:`PySide.QtGui.QIcon.fromTheme`.
+
+        :param data: the data of the decoration role
+        :returns: True, if the data is a theme name
+        :rtype: :class:`bool`
+        :raises: None
+        """
+        if not isinstance(data, _path_types):
+            return False
+        return '/' not in data and os.sep not in data and not os.path.splitext(data)[1]
+
+
+class _DecodeTask(QtCore.QRunnable):
+    """Reads and decodes one image on a thread of the pool"""
+
+    def __init__(self, loader, key, path, data):
+        """Initialize a new task
+
+        :param loader: the loader, that gets the result
+        :type loader: :class:`IconLoader`
+        :param key: the key of the request
+        :param path: the file to read or None
+        :type path: :class:`str` | None
+        :param data: the encoded image, if there is no path
+        :type data: :class:`bytes` | None
+        :raises: None
+        """
+        super(_DecodeTask, self).__init__()
+        self._loader = loader
+        self._key = key
+        self._path = path
+        self._data = data
+
+    def run(self, ):
+        """Decode the image and send it to the loader
+
+        :returns: None
+        :rtype: None
+        :raises: None
+        """
+        data = self._data
+        if self._path is not None:
+            try:
+                with open(self._path, 'rb') as f:
+                    data = f.read()
+            except (IOError, OSError):
+                data = b''
+        digest = hashlib.sha1(data).hexdigest()
+        image = None
+        if not self._loader._is_cached(digest):
+            image = QtGui.QImage.fromData(QtCore.QByteArray(data))
+        self._loader._decoded.emit(self._key, digest, image)
+
+
+class IconLoader(QtCore.QObject):
+    """Decodes icons from file paths and byte buffers on a thread pool.
+
+    Until an icon is decoded, the action shows the shared :data:`IconLoader.placeholder`.
+    By default it is a transparent icon of the small icon size of the style,
+    so the text of the action does not move, when the icon arrives.
+    Images are decoded to a :class:`PySide.QtGui.QImage` on the pool.
+    The icon is created and set on the GUI thread.
+    Decoded icons are cached by the hash of their content,
+    so equal images from different paths or buffers share one icon.
+    """
+
+    _decoded = QtCore.Signal(object, object, object)
+    """Internal signal from the pool with the key, the content hash and the image"""
+
+    def __init__(self, parent=None, pool=None):
+        """Initialize a new loader
+
+        :param parent: the parent object
+        :type parent: :class:`PySide.QtCore.QObject`
+        :param pool: the pool for decoding. Default is the global instance.
+        :type pool: :class:`PySide.QtCore.QThreadPool` | None
+        :raises: None
+        """
+        super(IconLoader, self).__init__(parent)
+        self._placeholder = None
+        self._pool = pool or QtCore.QThreadPool.globalInstance()
+        self._icons = {}
+        """Map of content hashes to icons"""
+        self._lock = threading.Lock()
+        """Guards :data:`IconLoader._icons`, that the tasks check on the pool"""
+        self._paths = {}
+        """Map of file paths to content hashes"""
+        self._waiting = {}
+        """Map of keys of running decodes to the waiting actions and their setter names"""
+        self._requested = {}
+        """Map of actions to the key of their last request"""
+        self._decoded.connect(self._finish)
+
+    @property
+    def placeholder(self, ):
+        """Get the icon, that is shown until the real icon is decoded
+
+        The default is created on first use, because it needs a GUI application.
+
+        :returns: the placeholder
+        :rtype: :class:`PySide.QtGui.QIcon`
+        :raises: None
+        """
+        if self._placeholder is None:
+            app = QtCore.QCoreApplication.instance()
+            style = app.style() if isinstance(app, QtGui.QApplication) else None
+            size = style.pixelMetric(QtGui.QStyle.PM_SmallIconSize) if style is not None else 16
+            pixmap = QtGui.QPixmap(size, size)
+            pixmap.fill(QtCore.Qt.transparent)
+            self._placeholder = QtGui.QIcon(pixmap)
+        return self._placeholder
+
+    @placeholder.setter
+    def placeholder(self, icon):
+        """Set the icon, that is shown until the real icon is decoded
+
+        :param icon: the placeholder
+        :type icon: :class:`PySide.QtGui.QIcon`
+        :returns: None
+        :rtype: None
+        :raises: None
+        """
+        self._placeholder = icon
+
+    def load(self, action, data, setfunc='setIcon'):
+        """Set the icon for the data on the action
+
+        If the icon is cached, it is set right away.
+        Else the placeholder is set and the data is decoded on the pool.
+
+        :param action: the action to update
+        :type action: :class:`PySide.QtGui.QAction`
+        :param data: a file path or the encoded image
+        :type data: :class:`str` | :class:`bytes` | :class:`bytearray` | :class:`PySide.QtCore.QByteArray`
+        :param setfunc: the name of the setter of the action
+        :type setfunc: :class:`str`
+        :returns: None
+        :rtype: None
+        :raises: None
+        """
+        if isinstance(data, _path_types):
+            key, path, data = data, data, None
+            digest = self._paths.get(key)
+        else:
+            if isinstance(data, QtCore.QByteArray):
+                data = data.data()
+            data = bytes(data)
+            path = None
+            key = digest = hashlib.sha1(data).hexdigest()
+        icon = self._icons.get(digest)
+        if icon is not None:
+            self._requested.pop(action, None)
+            getattr(action, setfunc)(icon)
+            return
+        self._requested[action] = key
+        getattr(action, setfunc)(self.placeholder)
+        if key in self._waiting:
+            self._waiting[key].append((action, setfunc))
+            return
+        self._waiting[key] = [(action, setfunc)]
+        self._pool.start(_DecodeTask(self, key, path, data))
+
+    def pending(self, ):
+        """Return the number of actions, that wait for their icon
+
+        :returns: the number of waiting actions
+        :rtype: :class:`int`
+        :raises: None
+        """
+        return len(self._requested)
+
+    def clear(self, ):
+        """Forget all cached icons, e.g. after files changed on disk
+
+        :returns: None
+        :rtype: None
+        :raises: None
+        """
+        with self._lock:
+            self._icons.clear()
+        self._paths.clear()
+
+    def _is_cached(self, digest):
+        """Return True, if the icon of the content hash is cached
+
+        Called by the tasks on the pool.
+
+        :param digest: the hash of the content
+        :type digest: :class:`str`
+        :returns: True, if the icon is cached
+        :rtype: :class:`bool`
+        :raises: None
+        """
+        with self._lock:
+            return digest in self._icons
+
+    def _finish(self, key, digest, image):
+        """Create the icon of a decoded image and set it on the waiting actions
+
+        :param key: the key of the request
+        :param digest: the hash of the content
+        :type digest: :class:`str`
+        :param image: the decoded image or None, if the content was already decoded
+        :type image: :class:`PySide.QtGui.QImage` | None
+        :returns: None
+        :rtype: None
+        :raises: None
+        """
+        if key != digest:
+            self._paths[key] = digest
+        icon = self._icons.get(digest)
+        if icon is None:
+            if image is not None and not image.isNull():
+                icon = QtGui.QIcon(QtGui.QPixmap.fromImage(image))
+            else:
+                icon = QtGui.QIcon()
+            with self._lock:
+                self._icons[digest] = icon
+        for action, setfunc in self._waiting.pop(key, ()):
+            if self._requested.get(action) != key:
+                # the action got another icon in the meantime
+                continue
+            del self._requested[action]
+            try:
+                getattr(action, setfunc)(icon)
+            except RuntimeError:
+                # the action was deleted
+                pass
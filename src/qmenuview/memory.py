@@ -0,0 +1,383 @@
+"""Measure the memory footprint of :class:`qmenuview.MenuView` per action and per submenu
+
+For several tree sizes and shapes, a view is built with each option on and off.
+The growth of the Python heap (with :mod:`tracemalloc`, if available) and of the
+resident set size of the process is divided by the number of built actions and menus.
+The results are written as JSON and can be compared with the results of an older release::
+
+  python -m qmenuview.memory --sizes 1000 10000 --output memory.json
+  python -m qmenuview.memory --baseline memory-0.1.4.json --tolerance 0.1
+"""
+import argparse
+import collections
+import gc
+import json
+import os
+import platform
+import sys
+
+from .qt import QtCore, QtGui
+
+try:
+    import tracemalloc
+except ImportError:  # python 2
+    tracemalloc = None
+
+__all__ = ['OPTIONS', 'SHAPES', 'compare', 'measure', 'run']
+
+OPTIONS = collections.OrderedDict([
+    ('default', {}),
+    ('defer_data', {'defer_data': True}),
+    ('max_depth', {'max_depth': 1}),
+    ('max_loaded_menus', {'max_loaded_menus': 8}),
+    ('store', {}),
+])
+"""The measured options and the view attributes they set.
+``'store'`` uses a :class:`qmenuview.MenuStore` as source."""
+OPENED = ['max_loaded_menus']
+"""The options, for which every menu is opened once before the measurement.
+Menus are only unloaded, when other menus show."""
+SHAPES = collections.OrderedDict([('flat', None), ('wide', 32), ('deep', 4)])
+"""The tree shapes and the number of children per row. ``None`` puts all rows on the top level."""
+METRICS = ['python_per_action', 'rss_per_action', 'python_per_menu', 'rss_per_menu']
+"""The per node metrics, that are compared with a baseline"""
+
+
+def _rss():
+    """Return the resident set size of the process in bytes
+
+    :returns: the current size or the peak size, if the current one is not available. None on failure.
+    :rtype: :class:`int` | None
+    :raises: None
+    """
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (IOError, OSError, ValueError, AttributeError):
+        pass
+    try:
+        import resource
+    except ImportError:  # windows
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # linux reports kilobytes, mac bytes
+    return rss if sys.platform == 'darwin' else rss * 1024
+
+
+def _trim():
+    """Return freed heap memory to the system, so the resident set size does not include it
+
+    Only available with glibc. Otherwise memory freed by earlier measurements
+    may be reused and hide the growth.
+
+    :returns: None
+    :rtype: None
+    :raises: None
+    """
+    try:
+        import ctypes
+        ctypes.CDLL(None).malloc_trim(0)
+    except (ImportError, OSError, AttributeError, TypeError):
+        pass
+
+
+def _usage():
+    """Return the current Python heap and resident set size after a collection
+
+    :returns: the traced Python bytes or None and the resident set size or None
+    :rtype: :class:`tuple`
+    :raises: None
+    """
+    gc.collect()
+    _trim()
+    traced = tracemalloc.get_traced_memory()[0] if tracemalloc and tracemalloc.is_tracing() else None
+    return traced, _rss()
+
+
+def _model(rows, breadth):
+    """Return a model with the given number of rows
+
+    The rows are filled level by level with ``breadth`` children per row.
+
+    :param rows: the total number of rows
+    :type rows: :class:`int`
+    :param breadth: the number of children per row or None for a flat list
+    :type breadth: :class:`int` | None
+    :returns: the model
+    :rtype: :class:`PySide.QtGui.QStandardItemModel`
+    :raises: None
+    """
+    model = QtGui.QStandardItemModel()
+    queue = collections.deque([model.invisibleRootItem()])
+    count = 0
+    while count < rows:
+        parent = queue.popleft()
+        for i in range(min(breadth or rows, rows - count)):
+            item = QtGui.QStandardItem('row%s' % count)
+            item.setToolTip('tooltip%s' % count)
+            parent.appendRow(item)
+            queue.append(item)
+            count += 1
+    return model
+
+
+def _count(view):
+    """Return the number of built actions and submenus of the view
+
+    :param view: the view
+    :type view: :class:`qmenuview.MenuView`
+    :returns: the number of actions and menus
+    :rtype: :class:`tuple`
+    :raises: None
+    """
+    actions = menus = 0
+    stack = [view]
+    while stack:
+        menu = stack.pop()
+        for action in menu.actions():
+            actions += 1
+            if action.menu() is not None:
+                menus += 1
+                stack.append(action.menu())
+    return actions, menus
+
+
+def _open_all(view):
+    """Emit aboutToShow for every submenu of the view depth-first
+
+    The submenus are collected right after their menu showed.
+    The view never unloads the parents of a shown menu, so they stay valid.
+
+    :param view: the view
+    :type view: :class:`qmenuview.MenuView`
+    :returns: None
+    :rtype: None
+    :raises: None
+    """
+    stack = [a.menu() for a in reversed(view.actions()) if a.menu() is not None]
+    while stack:
+        menu = stack.pop()
+        menu.aboutToShow.emit()
+        stack.extend(a.menu() for a in reversed(menu.actions()) if a.menu() is not None)
+    QtCore.QCoreApplication.sendPostedEvents(None, QtCore.QEvent.DeferredDelete)
+
+
+def _delete(obj):
+    """Delete the Qt object and deliver the deferred deletes
+
+    :param obj: the object to delete
+    :type obj: :class:`PySide.QtCore.QObject`
+    :returns: None
+    :rtype: None
+    :raises: None
+    """
+    obj.deleteLater()
+    QtCore.QCoreApplication.sendPostedEvents(None, QtCore.QEvent.DeferredDelete)
+
+
+def measure(rows, shape='flat', option='default'):
+    """Measure the memory of a view for one size, shape and option
+
+    The model is created before the measurement and not included.
+    For the options in :data:`OPENED` all menus are opened after the view is built.
+
+    :param rows: the number of rows of the model
+    :type rows: :class:`int`
+    :param shape: one of :data:`SHAPES`
+    :type shape: :class:`str`
+    :param option: one of :data:`OPTIONS`
+    :type option: :class:`str`
+    :returns: a JSON compatible dictionary with the numbers of rows, actions and menus
+              and the bytes of the Python heap and the resident set size
+    :rtype: :class:`dict`
+    :raises: :class:`KeyError` for unknown shapes or options
+    """
+    from .store import MenuStore
+    from .view import MenuView
+    model = _model(rows, SHAPES[shape])
+    view = MenuView()
+    for attr, value in OPTIONS[option].items():
+        setattr(view, attr, value)
+    python, rss = _usage()
+    store = None
+    if option == 'store':
+        store = MenuStore(model)
+        view.source = store
+    else:
+        view.model = model
+    if option in OPENED:
+        _open_all(view)
+    afterpython, afterrss = _usage()
+    actions, menus = _count(view)
+    view.model = None
+    _delete(view)
+    if store is not None:
+        _delete(store)
+    return {'rows': rows, 'shape': shape, 'option': option,
+            'actions': actions, 'menus': menus,
+            'python': afterpython - python if python is not None else None,
+            'rss': afterrss - rss if rss is not None else None}
+
+
+def _per_node(flat, tree, key):
+    """Return the bytes per action and per menu for one metric
+
+    The bytes per action come from the flat list. They are subtracted
+    from the tree to get the bytes per menu.
+
+    :param flat: the measurement of the flat list
+    :type flat: :class:`dict`
+    :param tree: the measurement of a tree of the same size
+    :type tree: :class:`dict`
+    :param key: ``'python'`` or ``'rss'``
+    :type key: :class:`str`
+    :returns: the bytes per action and per menu or None
+    :rtype: :class:`tuple`
+    :raises: None
+    """
+    if flat[key] is None or not flat['actions']:
+        return None, None
+    peraction = float(flat[key]) / flat['actions']
+    if tree is None or tree[key] is None or not tree['menus']:
+        return peraction, None
+    return peraction, (tree[key] - peraction * tree['actions']) / tree['menus']
+
+
+def _median(measurements):
+    """Return the first measurement with the median bytes of all measurements
+
+    :param measurements: repeated measurements of the same combination
+    :type measurements: :class:`list` of :class:`dict`
+    :returns: the median measurement
+    :rtype: :class:`dict`
+    :raises: None
+    """
+    result = dict(measurements[0])
+    for key in ('python', 'rss'):
+        values = sorted(m[key] for m in measurements if m[key] is not None)
+        result[key] = values[len(values) // 2] if values else None
+    return result
+
+
+def run(sizes=(100, 1000), shapes=None, options=None, repeat=1):
+    """Measure all combinations and derive the bytes per action and per menu
+
+    The resident set size is noisy, because the allocator keeps memory.
+    Repeat the measurements to use the median.
+
+    :param sizes: the numbers of rows
+    :type sizes: sequence of :class:`int`
+    :param shapes: the tree shapes of the menus. Default are all :data:`SHAPES`.
+    :type shapes: :class:`list` of :class:`str` | None
+    :param options: the options. Default are all :data:`OPTIONS`.
+    :type options: :class:`list` of :class:`str` | None
+    :param repeat: the number of measurements per combination
+    :type repeat: :class:`int`
+    :returns: a JSON compatible dictionary with the environment, the raw measurements
+              and the per node metrics for every option and size
+    :rtype: :class:`dict`
+    :raises: None
+    """
+    shapes = shapes or list(SHAPES)
+    options = options or list(OPTIONS)
+    started = False
+    if tracemalloc and not tracemalloc.is_tracing():
+        tracemalloc.start()
+        started = True
+    try:
+        measurements = []
+        nodes = []
+        for option in options:
+            for rows in sizes:
+                results = dict((shape, _median([measure(rows, shape, option) for i in range(repeat)]))
+                               for shape in shapes)
+                measurements.extend(results[shape] for shape in shapes)
+                if 'flat' not in results:
+                    continue
+                for shape in shapes:
+                    if shape == 'flat':
+                        continue
+                    entry = {'option': option, 'rows': rows, 'shape': shape}
+                    for key in ('python', 'rss'):
+                        peraction, permenu = _per_node(results['flat'], results[shape], key)
+                        entry[key + '_per_action'] = peraction
+                        entry[key + '_per_menu'] = permenu
+                    nodes.append(entry)
+    finally:
+        if started:
+            tracemalloc.stop()
+    return {'python': platform.python_version(), 'qt': QtCore.qVersion(),
+            'tracemalloc': tracemalloc is not None, 'repeat': repeat,
+            'measurements': measurements, 'nodes': nodes}
+
+
+def compare(result, baseline, tolerance=0.1):
+    """Return the per node metrics, that grew more than the tolerance
+
+    :param result: the current result of :func:`run`
+    :type result: :class:`dict`
+    :param baseline: an older result of :func:`run`
+    :type baseline: :class:`dict`
+    :param tolerance: the allowed relative growth
+    :type tolerance: :class:`float`
+    :returns: a list of descriptions of the regressions
+    :rtype: :class:`list` of :class:`str`
+    :raises: None
+    """
+    def key(entry):
+        return entry['option'], entry['rows'], entry['shape']
+    old = dict((key(entry), entry) for entry in baseline.get('nodes', []))
+    regressions = []
+    for entry in result['nodes']:
+        before = old.get(key(entry))
+        if before is None:
+            continue
+        for metric in METRICS:
+            new, prev = entry.get(metric), before.get(metric)
+            if new is None or prev is None or prev <= 0:
+                continue
+            if new > prev * (1 + tolerance):
+                regressions.append('%s %s rows %s: %s %.0f -> %.0f bytes'
+                                   % (entry['option'], entry['shape'], entry['rows'], metric, prev, new))
+    return regressions
+
+
+def main(argv=None):
+    """Measure the memory per action and menu and write it as JSON
+
+    :param argv: the command line arguments
+    :type argv: :class:`list` | None
+    :returns: the exit code. 1 if there are regressions compared to the baseline.
+    :rtype: :class:`int`
+    :raises: None
+    """
+    parser = argparse.ArgumentParser(description=main.__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 1000, 10000], help='the numbers of rows')
+    parser.add_argument('--shapes', nargs='+', choices=list(SHAPES), help='the tree shapes')
+    parser.add_argument('--options', nargs='+', choices=list(OPTIONS), help='the view options')
+    parser.add_argument('--repeat', type=int, default=3, help='the measurements per combination')
+    parser.add_argument('--output', help='the JSON file for the result. Default is stdout.')
+    parser.add_argument('--baseline', help='a JSON result of an older release to compare with')
+    parser.add_argument('--tolerance', type=float, default=0.1, help='the allowed relative growth')
+    args = parser.parse_args(argv)
+    app = QtGui.QApplication.instance() or QtGui.QApplication(sys.argv[:1])
+    result = run(args.sizes, args.shapes, args.options, args.repeat)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(result, f, indent=2, sort_keys=True)
+    else:
+        json.dump(result, sys.stdout, indent=2, sort_keys=True)
+        sys.stdout.write('\n')
+    code = 0
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(result, json.load(f), args.tolerance)
+        for regression in regressions:
+            sys.stderr.write(regression + '\n')
+        code = 1 if regressions else 0
+    app.processEvents()
+    return code
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,155 @@
+import contextlib
+
+from .qt import QtCore, QtGui
+
+__all__ = ['BatchMenu', 'suspended_layout']
+
+
+class BatchMenu(QtGui.QMenu):
+    """A menu, that can suspend the recalculation of its geometry during bulk changes.
+
+    A visible :class:`PySide.QtGui.QMenu` resizes itself to its size hint
+    on every added, changed or removed action. The size hint measures all actions,
+    so a bulk update of an open menu gets quadratic.
+
+    The size hint of a batch menu is cached until an action or the font or style changes.
+    While the layout is suspended with :meth:`BatchMenu.suspend_layout`,
+    the cached size hint is returned and painting is disabled.
+    :meth:`BatchMenu.resume_layout` then recalculates the geometry once::
+
+      menu.suspend_layout()
+      try:
+          for action in actions:
+              menu.addAction(action)
+      finally:
+          menu.resume_layout()
+
+    Suspensions can be nested. See :func:`suspended_layout` for a with statement.
+    """
+
+    def __init__(self, *args, **kwargs):
+        """Initialize a new menu
+
+        Takes the same arguments as :class:`PySide.QtGui.QMenu`.
+
+        :raises: None
+        """
+        super(BatchMenu, self).__init__(*args, **kwargs)
+        self._suspended = 0
+        self._updates = True
+        self._pending = False
+        self._size_hint = None
+        self.relayout_count = 0
+        """The number of times the size hint was recalculated"""
+
+    def suspend_layout(self, ):
+        """Stop recalculating the geometry, until :meth:`BatchMenu.resume_layout` is called
+
+        :returns: None
+        :rtype: None
+        :raises: None
+        """
+        if not self._suspended:
+            self._updates = self.updatesEnabled()
+            self.setUpdatesEnabled(False)
+        self._suspended += 1
+
+    def resume_layout(self, ):
+        """Resume the recalculation of the geometry
+
+        If the actions changed while the layout was suspended,
+        the geometry of a visible menu is recalculated once.
+
+        :returns: None
+        :rtype: None
+        :raises: None
+        """
+        if not self._suspended:
+            return
+        self._suspended -= 1
+        if self._suspended:
+            return
+        self.setUpdatesEnabled(self._updates)
+        if self._pending:
+            self._pending = False
+            self._size_hint = None
+            if self.isVisible():
+                self.resize(self.sizeHint())
+                self.update()
+
+    def is_layout_suspended(self, ):
+        """Return True, if the layout is suspended
+
+        :returns: True, if suspended
+        :rtype: :class:`bool`
+        :raises: None
+        """
+        return self._suspended > 0
+
+    def sizeHint(self, ):
+        """Return the cached size hint
+
+        While the layout is suspended, the size hint from before the suspension is returned.
+
+        :returns: the size hint
+        :rtype: :class:`PySide.QtCore.QSize`
+        :raises: None
+        """
+        if self._size_hint is None:
+            self._size_hint = super(BatchMenu, self).sizeHint()
+            self.relayout_count += 1
+        return QtCore.QSize(self._size_hint)
+
+    def actionEvent(self, event):
+        """Invalidate the cached size hint, unless the layout is suspended
+
+        :param event: the action event
+        :type event: :class:`PySide.QtGui.QActionEvent`
+        :returns: None
+        :rtype: None
+        :raises: None
+        """
+        if self._suspended:
+            self._pending = True
+        else:
+            self._size_hint = None
+        super(BatchMenu, self).actionEvent(event)
+
+    def changeEvent(self, event):
+        """Invalidate the cached size hint, if the font or style changed
+
+        :param event: the change event
+        :type event: :class:`PySide.QtCore.QEvent`
+        :returns: None
+        :rtype: None
+        :raises: None
+        """
+        if event.type() in (QtCore.QEvent.FontChange, QtCore.QEvent.StyleChange):
+            if self._suspended:
+                self._pending = True
+            else:
+                self._size_hint = None
+        super(BatchMenu, self).changeEvent(event)
+
+
+@contextlib.contextmanager
+def suspended_layout(menu):
+    """Suspend the layout of the menu inside a with statement
+
+    Menus without :meth:`BatchMenu.suspend_layout`, e.g. from a custom
+    :meth:`qmenuview.MenuView.create_menu`, and None are ignored.
+
+    :param menu: the menu to suspend
+    :type menu: :class:`BatchMenu` | :class:`PySide.QtGui.QMenu` | None
+    :returns: a context manager
+    :raises: None
+    """
+    suspend = getattr(menu, 'suspend_layout', None)
+    if suspend is None:
+        yield
+        return
+    suspend()
+    try:
+        yield
+    finally:
+        menu.resume_layout()
@@ -0,0 +1,236 @@
+import collections
+import threading
+
+from .qt import QtCore
+
+from .snapshot import CHECKABLE, ENABLED
+
+__all__ = ['PlanNode', 'PlanBuilder', 'snapshot_model', 'plan_from_snapshot', 'plan_from_source']
+
+PlanNode = collections.namedtuple('PlanNode', ['values', 'flags', 'children', 'node'])
+"""An immutable node of a menu plan.
+
+``values`` is a tuple of ``(setfunc, value, convertfunc)``. If ``convertfunc`` is not None,
+the value still has to be converted on the GUI thread.
+``flags`` is a combination of :data:`qmenuview.snapshot.ENABLED` and :data:`qmenuview.snapshot.CHECKABLE`.
+``children`` is a tuple of child nodes and ``node`` the source node or None.
+"""
+
+GUI_SETFUNCS = ('setIcon',)
+"""Setter names, whose data is converted on the GUI thread, because the conversion creates GUI objects"""
+
+
+def _build_children(parent, children, make):
+    """Build the results for the descendants of parent bottom up with an explicit stack
+
+    The results of the children of an item are passed to ``make`` with the item,
+    so deep trees do not hit the recursion limit.
+
+    :param parent: the parent item
+    :param children: returns an iterable with the children of an item
+    :type children: callable
+    :param make: returns the result for an item and the tuple of the results of its children
+    :type make: callable
+    :returns: the results of the children of parent
+    :rtype: :class:`tuple`
+    :raises: None
+    """
+    stack = [(parent, iter(children(parent)), [])]
+    while True:
+        item, childiter, results = stack[-1]
+        for child in childiter:
+            stack.append((child, iter(children(child)), []))
+            break
+        else:
+            stack.pop()
+            if not stack:
+                return tuple(results)
+            stack[-1][2].append(make(item, tuple(results)))
+
+
+def snapshot_model(model, setdataargs, columns, checkedcolumn):
+    """Copy the raw data of the model to nested plain tuples
+
+    This runs on the GUI thread, but does not convert any data.
+    Each row becomes a tuple of ``(rawvalues, flags, children)``,
+    where ``rawvalues`` is aligned with ``setdataargs``.
+
+    :param model: the model to copy
+    :type model: :class:`PySide.QtCore.QAbstractItemModel`
+    :param setdataargs: the data arguments of the view
+    :type setdataargs: :class:`list` of :class:`qmenuview.SetDataArgs`
+    :param columns: the resolved column for each entry of ``setdataargs``
+    :type columns: :class:`list` of :class:`int`
+    :param checkedcolumn: the column of the checkable flag
+    :type checkedcolumn: :class:`int`
+    :returns: the root of the copy
+    :rtype: :class:`tuple`
+    :raises: None
+    """
+    roles = [args.role for args in setdataargs]
+
+    def children(parent):
+        if parent.isValid() and not model.hasChildren(parent):
+            return ()
+        return (model.index(row, 0, parent) for row in range(model.rowCount(parent)))
+
+    def copy(index, rows):
+        row = index.row()
+        values = []
+        for role, column in zip(roles, columns):
+            sibling = index.sibling(row, column) if column >= 0 else None
+            values.append(sibling.data(role) if sibling is not None and sibling.isValid() else None)
+        flags = 0
+        if index.flags() & QtCore.Qt.ItemIsEnabled:
+            flags |= ENABLED
+        if index.sibling(row, checkedcolumn).flags() & QtCore.Qt.ItemIsUserCheckable:
+            flags |= CHECKABLE
+        return (tuple(values), flags, rows)
+
+    return ((), ENABLED, _build_children(QtCore.QModelIndex(), children, copy))
+
+
+def _convert(rawvalues, setdataargs, guisetfuncs):
+    """Return the plan values for the raw values
+
+    :param rawvalues: the raw data aligned with setdataargs
+    :type rawvalues: sequence
+    :param setdataargs: the data arguments
+    :type setdataargs: :class:`list` of :class:`qmenuview.SetDataArgs`
+    :param guisetfuncs: setter names, that have to be converted on the GUI thread
+    :type guisetfuncs: container of :class:`str`
+    :returns: a tuple of ``(setfunc, value, convertfunc)``
+    :rtype: :class:`tuple`
+    :raises: None
+    """
+    values = []
+    for args, data in zip(setdataargs, rawvalues):
+        if data is None:
+            continue
+        if args.setfunc in guisetfuncs:
+            values.append((args.setfunc, data, args.convertfunc))
+        elif args.convertfunc:
+            values.append((args.setfunc, args.convertfunc(data), None))
+        else:
+            values.append((args.setfunc, data, None))
+    return tuple(values)
+
+
+def plan_from_snapshot(snapshot, setdataargs, guisetfuncs=GUI_SETFUNCS):
+    """Convert a copy of :func:`snapshot_model` to a plan
+
+    This is thread-safe and meant to run on a worker thread.
+
+    :param snapshot: the copy of the model data
+    :type snapshot: :class:`tuple`
+    :param setdataargs: the data arguments, that were used for the copy
+    :type setdataargs: :class:`list` of :class:`qmenuview.SetDataArgs`
+    :param guisetfuncs: setter names, that have to be converted on the GUI thread
+    :type guisetfuncs: container of :class:`str`
+    :returns: the root node of the plan
+    :rtype: :class:`PlanNode`
+    :raises: None
+    """
+    def plan(row, children):
+        rawvalues, flags = row[:2]
+        return PlanNode(_convert(rawvalues, setdataargs, guisetfuncs), flags, children, None)
+    return plan(snapshot, _build_children(snapshot, lambda row: row[2], plan))
+
+
+def plan_from_source(source, setdataargs, columns, guisetfuncs=GUI_SETFUNCS):
+    """Create a plan from a thread-safe tree source
+
+    This is meant to run on a worker thread. The source has to be thread-safe.
+    Like for :meth:`qmenuview.MenuView.set_node_data`, entries of ``setdataargs``
+    with a negative column are skipped.
+
+    :param source: the tree source. See :class:`qmenuview.source.TreeSource`.
+    :param setdataargs: the data arguments
+    :type setdataargs: :class:`list` of :class:`qmenuview.SetDataArgs`
+    :param columns: the resolved column for each entry of ``setdataargs``
+    :type columns: :class:`list` of :class:`int`
+    :param guisetfuncs: setter names, that have to be converted on the GUI thread
+    :type guisetfuncs: container of :class:`str`
+    :returns: the root node of the plan
+    :rtype: :class:`PlanNode`
+    :raises: None
+    """
+    active = [(args, column >= 0) for args, column in zip(setdataargs, columns)]
+    hasflags = hasattr(source, 'flags')
+
+    def plan(node, children):
+        rawvalues = [source.data(node, args.role) if use else None for args, use in active]
+        sourceflags = source.flags(node) if hasflags else QtCore.Qt.ItemIsEnabled
+        flags = 0
+        if sourceflags & QtCore.Qt.ItemIsEnabled:
+            flags |= ENABLED
+        if sourceflags & QtCore.Qt.ItemIsUserCheckable:
+            flags |= CHECKABLE
+        return PlanNode(_convert(rawvalues, setdataargs, guisetfuncs), flags, children, node)
+
+    root = getattr(source, 'root', None)
+    return PlanNode((), ENABLED, _build_children(root, source.children, plan), root)
+
+
+class PlanBuilder(QtCore.QObject):
+    """Computes a plan on a worker thread and emits it on the GUI thread.
+
+    The work is any callable without arguments, e.g. a partial of :func:`plan_from_source`.
+    :data:`PlanBuilder.finished` is emitted with the result.
+    If the work raises, :data:`PlanBuilder.failed` is emitted with the exception.
+    """
+
+    finished = QtCore.Signal(object)
+    """Signal for when the plan is ready"""
+    failed = QtCore.Signal(object)
+    """Signal for when the work raised an exception"""
+
+    def __init__(self, work, parent=None):
+        """Initialize a new builder for the given work
+
+        :param work: a callable, that returns the plan
+        :type work: callable
+        :param parent: the parent object
+        :type parent: :class:`PySide.QtCore.QObject`
+        :raises: None
+        """
+        super(PlanBuilder, self).__init__(parent)
+        self._work = work
+        self._thread = None
+
+    def start(self, ):
+        """Start the work on a new thread
+
+        :returns: None
+        :rtype: None
+        :raises: None
+        """
+        self._thread = threading.Thread(target=self._run)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def wait(self, timeout=None):
+        """Wait for the worker thread to finish
+
+        :param timeout: the timeout in seconds or None
+        :type timeout: :class:`float` | None
+        :returns: None
+        :rtype: None
+        :raises: None
+        """
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _run(self, ):
+        """Run the work and emit the result
+
+        :returns: None
+        :rtype: None
+        :raises: None
+        """
+        try:
+            plan = self._work()
+        except Exception as e:
+            self.failed.emit(e)
+            return
+        self.finished.emit(plan)
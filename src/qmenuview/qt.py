@@ -0,0 +1,94 @@
+"""The Qt binding of qmenuview
+
+All modules import Qt from here instead of a binding::
+
+  from .qt import QtCore, QtGui
+
+PySide, PySide2 and PySide6 are supported. The binding is chosen in this order:
+
+  1. the binding in the environment variable ``QT_API``, e.g. ``pyside6``
+  2. a binding, that the application already imported
+  3. the first installed binding of :data:`BINDINGS`
+
+PySide2 and PySide6 moved the widgets to ``QtWidgets``.
+Their ``QtGui`` is merged with ``QtWidgets`` here, so the code can use the PySide names,
+e.g. ``QtGui.QMenu``.
+
+Importing this module imports Qt. The package :mod:`qmenuview` only imports it,
+when a class is used, that needs Qt.
+"""
+import importlib
+import os
+import sys
+import types
+
+__all__ = ['BINDING', 'BINDINGS', 'QtCore', 'QtGui', 'load']
+
+BINDINGS = ['PySide', 'PySide2', 'PySide6']
+"""The supported bindings in the order of preference"""
+
+
+def _choose():
+    """Return the name of the binding to use
+
+    :returns: the name of the binding
+    :rtype: :class:`str`
+    :raises: :class:`ImportError` if no binding is installed
+    """
+    names = dict((name.lower(), name) for name in BINDINGS)
+    wanted = os.environ.get('QT_API', '').lower()
+    if wanted:
+        if wanted not in names:
+            raise ImportError('QT_API %r is not one of %s' % (wanted, ', '.join(BINDINGS)))
+        return names[wanted]
+    for name in BINDINGS:
+        if name in sys.modules:
+            return name
+    for name in BINDINGS:
+        try:
+            importlib.import_module(name)
+        except ImportError:
+            continue
+        return name
+    raise ImportError('No Qt binding found. Install one of %s' % ', '.join(BINDINGS))
+
+
+BINDING = _choose()
+"""The name of the used binding"""
+
+
+def load(name):
+    """Import and return the Qt module of the binding, e.g. ``'QtNetwork'``
+
+    Use this for modules, that only some features need.
+
+    :param name: the name of the Qt module
+    :type name: :class:`str`
+    :returns: the module
+    :rtype: :class:`types.ModuleType`
+    :raises: :class:`ImportError` if the binding does not have the module
+    """
+    return importlib.import_module('%s.%s' % (BINDING, name))
+
+
+def _gui():
+    """Return QtGui of the binding with the widget classes
+
+    :returns: the module
+    :rtype: :class:`types.ModuleType`
+    :raises: :class:`ImportError` if the binding has no gui module
+    """
+    gui = load('QtGui')
+    if BINDING == 'PySide':
+        return gui
+    merged = types.ModuleType(__name__ + '.QtGui', gui.__doc__)
+    # newer bindings create their classes on first access, so vars would miss them
+    for module in (gui, load('QtWidgets')):
+        for name in dir(module):
+            if not name.startswith('__'):
+                setattr(merged, name, getattr(module, name))
+    return merged
+
+
+QtCore = load('QtCore')
+QtGui = _gui()
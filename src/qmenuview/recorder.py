@@ -0,0 +1,552 @@
+"""Record the signal traffic of a model and replay it on a fresh view
+
+A :class:`Recorder` attaches to the model of a :class:`qmenuview.MenuView` and writes
+every structural signal with a snapshot of the affected rows and a timestamp
+to a gzip compressed file of JSON lines::
+
+  with Recorder(view, 'menu.qmvr'):
+      app.exec_()
+
+:func:`replay` rebuilds the recorded model as :class:`ReplayModel`, drives a new view
+through the same sequence of signals and measures the time of every handler of the view.
+From the command line::
+
+  python -m qmenuview.recorder menu.qmvr
+"""
+import argparse
+import gzip
+import inspect
+import json
+import sys
+import time
+
+from .qt import QtCore, QtGui
+
+from .serialize import index_path, plain_value
+
+__all__ = ['Recorder', 'ReplayModel', 'ReplayResult', 'read_recording', 'replay']
+
+FORMAT = 'qmenuview-recording'
+"""The format name in the header of a recording"""
+VERSION = 1
+"""The version of the recording format"""
+
+Qt = QtCore.Qt
+ROLES = [Qt.DisplayRole, Qt.DecorationRole, Qt.ToolTipRole, Qt.StatusTipRole,
+         Qt.WhatsThisRole, Qt.CheckStateRole]
+"""The recorded data roles"""
+FLAGS = [Qt.ItemIsSelectable, Qt.ItemIsEnabled, Qt.ItemIsUserCheckable]
+"""The recorded item flags"""
+HANDLERS = ['reset', 'insert_menus', 'remove_menus', 'update_menus']
+"""The handlers of the view, that are timed during a replay"""
+
+
+def _flagbits(flags):
+    """Return the recorded item flags as bitfield
+
+    :param flags: the item flags
+    :type flags: :data:`PySide.QtCore.Qt.ItemFlags`
+    :returns: one bit per entry of :data:`FLAGS`
+    :rtype: :class:`int`
+    :raises: None
+    """
+    return sum(1 << i for i, f in enumerate(FLAGS) if flags & f)
+
+
+def _rows(model, parent, first, last):
+    """Return the snapshot of the rows first til last under parent
+
+    Each row is a list of the values per column and role,
+    the flag bits per column and the snapshots of the children.
+
+    :param model: the model
+    :type model: :class:`PySide.QtCore.QAbstractItemModel`
+    :param parent: the parent index
+    :type parent: :class:`PySide.QtCore.QModelIndex`
+    :param first: the first row
+    :type first: :class:`int`
+    :param last: the last row
+    :type last: :class:`int`
+    :returns: the list of rows
+    :rtype: :class:`list`
+    :raises: None
+    """
+    columns = model.columnCount(parent)
+    rows = []
+    for row in range(first, last + 1):
+        values = []
+        flags = []
+        for column in range(columns):
+            index = model.index(row, column, parent)
+            values.append([plain_value(index.data(role)) for role in ROLES])
+            flags.append(_flagbits(index.flags()))
+        index = model.index(row, 0, parent)
+        children = _rows(model, index, 0, model.rowCount(index) - 1)
+        rows.append([values, flags, children])
+    return rows
+
+
+class Recorder(QtCore.QObject):
+    """Records the signals of the model of a view to a file.
+
+    The file is a gzip compressed file of JSON lines. The first line is a header
+    with a snapshot of the whole model. Every other line is one event::
+
+      [seconds since start, signal name, arguments...]
+
+    Recording starts with :meth:`Recorder.start` and ends with :meth:`Recorder.stop`.
+    The recorder can also be used as context manager.
+    """
+
+    def __init__(self, view, path, parent=None):
+        """Initialize a new recorder for the model of the view
+
+        :param view: the view, whose model is recorded
+        :type view: :class:`qmenuview.MenuView`
+        :param path: the file path
+        :type path: :class:`str`
+        :param parent: the parent object
+        :type parent: :class:`PySide.QtCore.QObject`
+        :raises: None
+        """
+        super(Recorder, self).__init__(parent)
+        self._view = view
+        self._path = path
+        self._model = None
+        self._file = None
+        self._start = 0
+        self.count = 0
+        """The number of recorded events"""
+
+    def __enter__(self, ):
+        self.start()
+        return self
+
+    def __exit__(self, *args):
+        self.stop()
+
+    def _signalmap(self, ):
+        """Return the signals of the model and their handlers
+
+        :returns: a map of signal names to handlers
+        :rtype: :class:`dict`
+        :raises: None
+        """
+        return {'modelReset': self._model_reset,
+                'rowsInserted': self._rows_inserted,
+                'rowsAboutToBeRemoved': self._rows_about_to_be_removed,
+                'rowsMoved': self._rows_moved,
+                'dataChanged': self._data_changed}
+
+    def start(self, ):
+        """Write the header and start recording the current model of the view
+
+        :returns: None
+        :rtype: None
+        :raises: :class:`ValueError` if the view has no model.
+                 :class:`IOError` if the file can not be written.
+        """
+        model = self._view.model
+        if model is None:
+            raise ValueError("The view has no model to record.")
+        self._model = model
+        self._file = gzip.open(self._path, 'wb')
+        self._start = time.time()
+        self.count = 0
+        self._write({'format': FORMAT, 'version': VERSION,
+                     'columns': model.columnCount(QtCore.QModelIndex()),
+                     'tree': self._tree()})
+        for signal, handler in self._signalmap().items():
+            getattr(model, signal).connect(handler)
+
+    def stop(self, ):
+        """Stop recording and close the file
+
+        :returns: None
+        :rtype: None
+        :raises: None
+        """
+        if self._file is None:
+            return
+        for signal, handler in self._signalmap().items():
+            getattr(self._model, signal).disconnect(handler)
+        self._file.close()
+        self._file = None
+        self._model = None
+
+    def _tree(self, ):
+        """Return the snapshot of all rows of the model
+
+        :returns: the snapshot of the top level rows
+        :rtype: :class:`list`
+        :raises: None
+        """
+        m = self._model
+        root = QtCore.QModelIndex()
+        return _rows(m, root, 0, m.rowCount(root) - 1)
+
+    def _write(self, obj):
+        """Write one line to the file
+
+        :param obj: the JSON compatible object
+        :returns: None
+        :rtype: None
+        :raises: None
+        """
+        line = json.dumps(obj, separators=(',', ':')) + '\n'
+        self._file.write(line.encode('utf-8'))
+
+    def _event(self, name, *args):
+        """Write an event with a timestamp
+
+        :param name: the name of the signal
+        :type name: :class:`str`
+        :returns: None
+        :rtype: None
+        :raises: None
+        """
+        self._write([round(time.time() - self._start, 6), name] + list(args))
+        self.count += 1
+
+    def _model_reset(self, ):
+        self._event('modelReset', self._tree())
+
+    def _rows_inserted(self, parent, first, last):
+        self._event('rowsInserted', index_path(parent), first, last,
+                    _rows(self._model, parent, first, last))
+
+    def _rows_about_to_be_removed(self, parent, first, last):
+        self._event('rowsAboutToBeRemoved', index_path(parent), first, last)
+
+    def _rows_moved(self, parent, start, end, destination, row):
+        self._event('rowsMoved', index_path(parent), start, end, index_path(destination), row)
+
+    def _data_changed(self, topLeft, bottomRight, *args):
+        parent = topLeft.parent()
+        values = []
+        for row in range(topLeft.row(), bottomRight.row() + 1):
+            columns = []
+            for column in range(topLeft.column(), bottomRight.column() + 1):
+                index = self._model.index(row, column, parent)
+                columns.append([[plain_value(index.data(role)) for role in ROLES],
+                                _flagbits(index.flags())])
+            values.append(columns)
+        self._event('dataChanged', index_path(parent), topLeft.row(), topLeft.column(),
+                    bottomRight.row(), bottomRight.column(), values)
+
+
+class _Node(object):
+    """A row of a :class:`ReplayModel`"""
+
+    __slots__ = ('parent', 'children', 'values', 'flags')
+
+    def __init__(self, parent, values=(), flags=()):
+        self.parent = parent
+        self.children = []
+        self.values = [dict(zip(ROLES, v)) for v in values]
+        """A dictionary of roles to data per column"""
+        self.flags = list(flags)
+        """The flag bits per column"""
+
+
+class ReplayModel(QtCore.QAbstractItemModel):
+    """A read only tree model, that replays recorded events.
+
+    Each event emits exactly the signals of the original model.
+    """
+
+    def __init__(self, columns, tree, parent=None):
+        """Initialize a new model with the snapshot of a recording
+
+        :param columns: the number of columns
+        :type columns: :class:`int`
+        :param tree: the snapshot of the top level rows
+        :type tree: :class:`list`
+        :param parent: the parent object
+        :type parent: :class:`PySide.QtCore.QObject`
+        :raises: None
+        """
+        super(ReplayModel, self).__init__(parent)
+        self._columns = columns
+        self._root = self._build(None, tree)
+
+    def _build(self, parent, rows):
+        """Return a node with children for the snapshot rows
+
+        :param parent: the node to build or None for a new root
+        :type parent: :class:`_Node` | None
+        :param rows: the snapshot of the rows
+        :type rows: :class:`list`
+        :returns: the node
+        :rtype: :class:`_Node`
+        :raises: None
+        """
+        if parent is None:
+            parent = _Node(None)
+        for values, flags, children in rows:
+            child = _Node(parent, values, flags)
+            self._build(child, children)
+            parent.children.append(child)
+        return parent
+
+    def _node(self, index):
+        if index.isValid():
+            return index.internalPointer()
+        return self._root
+
+    def _index(self, path):
+        """Return the index of the path of rows
+
+        :param path: the rows from the root
+        :type path: :class:`list` of :class:`int`
+        :returns: the index
+        :rtype: :class:`PySide.QtCore.QModelIndex`
+        :raises: None
+        """
+        index = QtCore.QModelIndex()
+        for row in path:
+            index = self.index(row, 0, index)
+        return index
+
+    def index(self, row, column, parent=QtCore.QModelIndex()):
+        node = self._node(parent)
+        if 0 <= row < len(node.children) and 0 <= column < self._columns:
+            return self.createIndex(row, column, node.children[row])
+        return QtCore.QModelIndex()
+
+    def parent(self, index):
+        node = index.internalPointer() if index.isValid() else None
+        if node is None or node.parent is self._root:
+            return QtCore.QModelIndex()
+        p = node.parent
+        return self.createIndex(p.parent.children.index(p), 0, p)
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        if parent.column() > 0:
+            return 0
+        return len(self._node(parent).children)
+
+    def columnCount(self, parent=QtCore.QModelIndex()):
+        return self._columns
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        values = index.internalPointer().values
+        if index.column() < len(values):
+            return values[index.column()].get(role)
+
+    def flags(self, index):
+        flags = Qt.NoItemFlags
+        if not index.isValid():
+            return flags
+        nodeflags = index.internalPointer().flags
+        bits = nodeflags[index.column()] if index.column() < len(nodeflags) else 0
+        for i, f in enumerate(FLAGS):
+            if bits & (1 << i):
+                flags |= f
+        return flags
+
+    def apply(self, event):
+        """Apply a recorded event and emit its signals
+
+        :param event: the event without timestamp, e.g. ``['rowsInserted', path, first, last, rows]``
+        :type event: :class:`list`
+        :returns: None
+        :rtype: None
+        :raises: :class:`ValueError` for unknown events
+        """
+        name, args = event[0], event[1:]
+        if name == 'modelReset':
+            self.beginResetModel()
+            self._root = self._build(None, args[0])
+            self.endResetModel()
+        elif name == 'rowsInserted':
+            path, first, last, rows = args
+            parent = self._index(path)
+            node = self._node(parent)
+            self.beginInsertRows(parent, first, last)
+            new = self._build(_Node(None), rows).children
+            for child in new:
+                child.parent = node
+            node.children[first:first] = new
+            self.endInsertRows()
+        elif name == 'rowsAboutToBeRemoved':
+            path, first, last = args
+            parent = self._index(path)
+            self.beginRemoveRows(parent, first, last)
+            del self._node(parent).children[first:last + 1]
+            self.endRemoveRows()
+        elif name == 'rowsMoved':
+            path, start, end, destpath, row = args
+            parent = self._index(path)
+            dest = self._index(destpath)
+            if not self.beginMoveRows(parent, start, end, dest, row):
+                return
+            source, target = self._node(parent), self._node(dest)
+            moved = source.children[start:end + 1]
+            if source is target and row > end:
+                row -= len(moved)
+            del source.children[start:end + 1]
+            for child in moved:
+                child.parent = target
+            target.children[row:row] = moved
+            self.endMoveRows()
+        elif name == 'dataChanged':
+            path, top, left, bottom, right, values = args
+            parent = self._index(path)
+            node = self._node(parent)
+            for row, columns in zip(range(top, bottom + 1), values):
+                child = node.children[row]
+                for column, (data, flags) in zip(range(left, right + 1), columns):
+                    child.values[column] = dict(zip(ROLES, data))
+                    child.flags[column] = flags
+            self.dataChanged.emit(self.index(top, left, parent), self.index(bottom, right, parent))
+        else:
+            raise ValueError("Unknown event %s" % name)
+
+
+class ReplayResult(object):
+    """The timings of a replay"""
+
+    def __init__(self, ):
+        self.events = 0
+        """The number of replayed events"""
+        self.build = 0.0
+        """The seconds for building the view from the recorded snapshot"""
+        self.total = 0.0
+        """The seconds for all events including the model"""
+        self.handlers = dict((name, []) for name in HANDLERS)
+        """A map of handler names to the list of the seconds per call"""
+
+    def summary(self, ):
+        """Return the number of calls, the total, maximum and mean seconds per handler
+
+        :returns: a JSON compatible dictionary
+        :rtype: :class:`dict`
+        :raises: None
+        """
+        handlers = {}
+        for name, times in self.handlers.items():
+            total = sum(times)
+            handlers[name] = {'calls': len(times), 'total': total,
+                              'max': max(times) if times else 0.0,
+                              'mean': total / len(times) if times else 0.0}
+        return {'events': self.events, 'build': self.build, 'total': self.total, 'handlers': handlers}
+
+
+try:
+    _getargspec = inspect.getfullargspec
+except AttributeError:  # python 2
+    _getargspec = inspect.getargspec
+
+
+def _timed(func, times):
+    """Return a wrapper of func, that appends the duration of each call to times
+
+    Surplus arguments of the signal are dropped like for a connected method.
+
+    :param func: the bound method to wrap
+    :type func: callable
+    :param times: the list for the durations
+    :type times: :class:`list`
+    :returns: the wrapper
+    :rtype: callable
+    :raises: None
+    """
+    spec = _getargspec(func)
+    # newer bindings pass more arguments, e.g. the roles of dataChanged
+    count = None if spec.varargs else len(spec.args) - 1
+
+    def wrapper(*args):
+        start = time.time()
+        try:
+            return func(*args[:count])
+        finally:
+            times.append(time.time() - start)
+    return wrapper
+
+
+def read_recording(path):
+    """Return the header and the events of a recording
+
+    :param path: the file path
+    :type path: :class:`str`
+    :returns: the header dictionary and the list of events
+    :rtype: :class:`tuple`
+    :raises: :class:`ValueError` if the file is no recording
+    """
+    with gzip.open(path, 'rb') as f:
+        lines = [json.loads(line.decode('utf-8')) for line in f]
+    if not lines or not isinstance(lines[0], dict) or lines[0].get('format') != FORMAT \
+            or lines[0].get('version') != VERSION:
+        raise ValueError("%s is not a recording of version %s" % (path, VERSION))
+    return lines[0], lines[1:]
+
+
+def replay(path, view=None):
+    """Replay a recording on a view and time the handlers of the view
+
+    The events are replayed as fast as possible. The recorded timestamps are ignored.
+
+    :param path: the file path of a recording
+    :type path: :class:`str`
+    :param view: the view to use. Default is a new :class:`qmenuview.MenuView`.
+                 Configure columns etc. before the replay.
+    :type view: :class:`qmenuview.MenuView` | None
+    :returns: the timings
+    :rtype: :class:`ReplayResult`
+    :raises: :class:`ValueError` if the file is no recording
+    """
+    from .view import MenuView
+    header, events = read_recording(path)
+    if view is None:
+        view = MenuView()
+    result = ReplayResult()
+    times = dict((name, []) for name in HANDLERS)
+    for name in HANDLERS:
+        # the instance attributes are connected instead of the methods
+        setattr(view, name, _timed(getattr(view, name), times[name]))
+    try:
+        model = ReplayModel(header['columns'], header['tree'])
+        start = time.time()
+        view.model = model
+        result.build = time.time() - start
+        for name in HANDLERS:
+            del times[name][:]
+        start = time.time()
+        for event in events:
+            model.apply(event[1:])
+        result.total = time.time() - start
+        result.events = len(events)
+        for name in HANDLERS:
+            result.handlers[name] = list(times[name])
+        view.model = None
+    finally:
+        for name in HANDLERS:
+            delattr(view, name)
+    return result
+
+
+def main(argv=None):
+    """Replay a recording headless and print the timings as JSON
+
+    :param argv: the command line arguments
+    :type argv: :class:`list` | None
+    :returns: the exit code
+    :rtype: :class:`int`
+    :raises: None
+    """
+    parser = argparse.ArgumentParser(description=main.__doc__.splitlines()[0])
+    parser.add_argument('recording', help='the file written by a Recorder')
+    args = parser.parse_args(argv)
+    app = QtGui.QApplication.instance() or QtGui.QApplication(sys.argv[:1])
+    result = replay(args.recording)
+    json.dump(result.summary(), sys.stdout, indent=2, sort_keys=True)
+    sys.stdout.write('\n')
+    app.processEvents()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,859 @@
+"""Menus from a tree in another process, served over a local socket
+
+A :class:`RemoteSource` is a source for :class:`qmenuview.MenuView`, that fetches
+whole child levels with all needed roles in one request, instead of one round trip per
+``rowCount``, ``index`` or ``data`` call. The levels are cached. Changes are pushed
+by the server and mapped onto :meth:`qmenuview.MenuView.insert_nodes`,
+:meth:`qmenuview.MenuView.remove_nodes` and :meth:`qmenuview.MenuView.update_nodes`.
+:class:`ModelServer` serves any :class:`PySide.QtCore.QAbstractItemModel`.
+It is the reference for the protocol and a stand-in server for tests::
+
+  server = ModelServer(model)
+  server.listen('menus')
+  ...
+  source = RemoteSource()
+  source.connect_to_server('menus')
+  view.source = source
+
+Messages are JSON objects, one per line. The client requests the children of the node at a path
+of rows. ``depth`` is the number of levels to include::
+
+  {"id": 1, "op": "children", "path": [0, 2], "roles": [0, 3], "depth": 1}
+
+The server answers with the rows or an error. It echoes the path, because rows
+may have been inserted or removed before the server read the request.
+The client drops answers, whose path does not lead to the requested node anymore,
+and requests the children again::
+
+  {"id": 1, "path": [0, 2], "rows": [ROW, ...]}
+  {"id": 1, "path": [0, 2], "error": "invalid path"}
+
+A row has the data of the requested roles, the number of children and
+the children, if they are within the depth::
+
+  {"data": {"0": "Open", "3": "Open a file"}, "enabled": true, "checkable": false,
+   "count": 2, "children": [ROW, ...]}
+
+The server pushes changes with the new rows, so the client needs no further request.
+The rows contain the roles of the last request of the client::
+
+  {"push": "inserted", "path": [0], "first": 3, "rows": [ROW, ...]}
+  {"push": "removed", "path": [0], "first": 3, "last": 4}
+  {"push": "changed", "path": [0], "first": 3, "rows": [ROW, ...]}
+  {"push": "invalidate", "path": []}
+"""
+import functools
+import json
+
+from .qt import QtCore, load
+
+from .serialize import index_path, plain_value
+
+QtNetwork = load('QtNetwork')
+
+__all__ = ['ModelServer', 'RemoteNode', 'RemoteSource']
+
+ROLES = [QtCore.Qt.DisplayRole, QtCore.Qt.DecorationRole, QtCore.Qt.ToolTipRole,
+         QtCore.Qt.CheckStateRole, QtCore.Qt.WhatsThisRole, QtCore.Qt.StatusTipRole]
+"""The default roles, that are fetched"""
+
+
+def _encode(message):
+    """Return the message as line of UTF-8 encoded JSON
+
+    :param message: the message
+    :type message: :class:`dict`
+    :returns: the encoded line
+    :rtype: :class:`bytes`
+    :raises: None
+    """
+    return (json.dumps(message) + '\n').encode('utf-8')
+
+
+def _read_messages(socket):
+    """Return the complete messages, that are available on the socket
+
+    :param socket: the socket to read
+    :type socket: :class:`PySide.QtNetwork.QLocalSocket`
+    :returns: the decoded messages
+    :rtype: :class:`list` of :class:`dict`
+    :raises: :class:`ValueError` for invalid JSON
+    """
+    messages = []
+    while socket.canReadLine():
+        messages.append(json.loads(socket.readLine().data().decode('utf-8')))
+    return messages
+
+
+class RemoteNode(object):
+    """A cached node of a :class:`RemoteSource`"""
+
+    __slots__ = ('parent', 'children', 'data', 'enabled', 'checkable', 'count')
+
+    def __init__(self, parent):
+        """Initialize a new node without data
+
+        :param parent: the parent node or None for the root
+        :type parent: :class:`RemoteNode` | None
+        :raises: None
+        """
+        self.parent = parent
+        """The parent node"""
+        self.children = None
+        """The list of child nodes or None, if they were not fetched yet"""
+        self.data = {}
+        """Map of roles as integer to the data"""
+        self.enabled = True
+        """True, if the node is enabled"""
+        self.checkable = False
+        """True, if the node is checkable"""
+        self.count = 0
+        """The number of children on the server"""
+
+
+class RemoteSource(QtCore.QObject):
+    """A source for :class:`qmenuview.MenuView`, that fetches a tree from a :class:`ModelServer`.
+
+    Fetches are asynchronous. Until the children of a node arrived, it has no children.
+    Then they are inserted into the subscribed views.
+    Only nodes with children on the server are fetched, one level per request.
+    Set :data:`RemoteSource.fetch_depth` to fetch more levels at once.
+
+    The roles of :data:`RemoteSource.roles` and the roles of the
+    :data:`qmenuview.MenuView.setdataargs` of the subscribed views are fetched.
+    """
+
+    fetched = QtCore.Signal(object)
+    """Signal for when the children of a node arrived. Emits the node."""
+    error = QtCore.Signal(str)
+    """Signal for when the server reported an error or the connection failed"""
+
+    def __init__(self, parent=None):
+        """Initialize a new source, that is not connected
+
+        :param parent: the parent object
+        :type parent: :class:`PySide.QtCore.QObject`
+        :raises: None
+        """
+        super(RemoteSource, self).__init__(parent)
+        self.roles = list(ROLES)
+        """The roles to fetch"""
+        self.fetch_depth = 1
+        """The number of levels to fetch per request. Default 1"""
+        self.requests = 0
+        """The number of sent requests"""
+        self._root = RemoteNode(None)
+        self._views = []
+        self._unsubscribers = {}
+        """Map of subscribed views to the slots connected to their destroyed signal"""
+        self._requests = {}
+        """Map of request ids to the node, whose children are requested"""
+        self._outbox = []
+        """Messages, that wait for the connection"""
+        self._ids = 0
+        self._socket = QtNetwork.QLocalSocket(self)
+        self._socket.readyRead.connect(self._read)
+        self._socket.connected.connect(self._flush)
+        self._socket.disconnected.connect(self._disconnected)
+        # newer bindings renamed the signal
+        errorsignal = getattr(self._socket, 'errorOccurred', None) or self._socket.error
+        errorsignal.connect(self._socket_error)
+
+    def connect_to_server(self, name):
+        """Connect to the server with the given name
+
+        Requests, that are made before the connection is established, are sent afterwards.
+
+        :param name: the name of the server
+        :type name: :class:`str`
+        :returns: None
+        :rtype: None
+        :raises: None
+        """
+        self._socket.connectToServer(name)
+
+    def disconnect_from_server(self, ):
+        """Close the connection
+
+        :returns: None
+        :rtype: None
+        :raises: None
+        """
+        self._socket.disconnectFromServer()
+
+    @property
+    def root(self, ):
+        """Get the root node
+
+        :returns: the invisible root node
+        :rtype: :class:`RemoteNode`
+        :raises: None
+        """
+        return self._root
+
+    def subscribe(self, view):
+        """Add a view, that gets notified about changes
+
+        Roles of the view, that are not fetched yet, are added to :data:`RemoteSource.roles`.
+        The cache is invalidated then. A view, that is already subscribed, is not added again.
+
+        :param view: the view to notify
+        :type view: :class:`qmenuview.MenuView`
+        :returns: None
+        :rtype: None
+        :raises: None
+        """
+        if view in self._unsubscribers:
+            return
+        self._views.append(view)
+        slot = functools.partial(self.unsubscribe, view)
+        self._unsubscribers[view] = slot
+        view.destroyed.connect(slot)
+        known = [plain_value(r) for r in self.roles]
+        missing = [args.role for args in view.setdataargs if plain_value(args.role) not in known]
+        if missing:
+            self.roles.extend(missing)
+            # answers in flight lack the new roles as well
+            if self._root.children is not None or self._requests:
+                self.invalidate()
+
+    def unsubscribe(self, view, *args):
+        """Remove a view, so it does not get notified anymore
+
+        :param view: the view to remove
+        :type view: :class:`qmenuview.MenuView`
+        :returns: None
+        :rtype: None
+        :raises: None
+        """
+        self._views = [v for v in self._views if v is not view]
+        slot = self._unsubscribers.pop(view, None)
+        if slot is not None and not args:
+            # args are only given by the destroyed signal, then the connection is gone anyway
+            view.destroyed.disconnect(slot)
+
+    @property
+    def views(self, ):
+        """Get the subscribed views
+
+        :returns: a list of views
+        :rtype: :class:`list` of :class:`qmenuview.MenuView`
+        :raises: None
+        """
+        return list(self._views)
+
+    def children(self, node):
+        """Return the cached children of the node
+
+        If they are not cached, they are requested and an empty tuple is returned.
+
+        :param node: the node to query
+        :type node: :class:`RemoteNode`
+        :returns: the child nodes
+        :rtype: :class:`list` of :class:`RemoteNode` | :class:`tuple`
+        :raises: None
+        """
+        if node.children is None:
+            self._fetch(node)
+            return ()
+        return node.children
+
+    def data(self, node, role):
+        """Return the cached data of the node for the given role
+
+        :param node: the node to query
+        :type node: :class:`RemoteNode`
+        :param role: the data role
+        :type role: :data:`PySide.QtCore.Qt.ItemDataRole`
+        :returns: the data or None
+        :raises: None
+        """
+        return node.data.get(plain_value(role))
+
+    def flags(self, node):
+        """Return the item flags of the given node
+
+        :param node: the node to query
+        :type node: :class:`RemoteNode`
+        :returns: the item flags for the enabled and checkable state
+        :rtype: :data:`PySide.QtCore.Qt.ItemFlags`
+        :raises: None
+        """
+        flags = QtCore.Qt.NoItemFlags
+        if node.enabled:
+            flags |= QtCore.Qt.ItemIsEnabled
+        if node.checkable:
+            flags |= QtCore.Qt.ItemIsUserCheckable
+        return flags
+
+    def get_path(self, node):
+        """Return the rows from the root to the node
+
+        :param node: the node
+        :type node: :class:`RemoteNode`
+        :returns: the list of rows. The root gives an empty list.
+        :rtype: :class:`list` of :class:`int`
+        :raises: :class:`ValueError` if the node is not in the tree anymore
+        """
+        rows = []
+        while node.parent is not None:
+            rows.append(node.parent.children.index(node))
+            node = node.parent
+        rows.reverse()
+        return rows
+
+    def _live_path(self, node):
+        """Return the rows from the root to the node or None, if it is not in the tree anymore
+
+        :param node: the node
+        :type node: :class:`RemoteNode`
+        :returns: the list of rows or None
+        :rtype: :class:`list` of :class:`int` | None
+        :raises: None
+        """
+        rows = []
+        while node.parent is not None:
+            siblings = node.parent.children
+            if not siblings:
+                return None
+            try:
+                rows.append(siblings.index(node))
+            except ValueError:
+                return None
+            node = node.parent
+        if node is not self._root:
+            return None
+        rows.reverse()
+        return rows
+
+    def get_node(self, path):
+        """Return the cached node at the given path
+
+        :param path: the rows from the root
+        :type path: :class:`list` of :class:`int`
+        :returns: the node or None, if it is not cached
+        :rtype: :class:`RemoteNode` | None
+        :raises: None
+        """
+        node = self._root
+        for row in path:
+            if not node.children or not 0 <= row < len(node.children):
+                return None
+            node = node.children[row]
+        return node
+
+    def invalidate(self, node=None):
+        """Drop the cached children of the node and fetch them again
+
+        :param node: the node. None invalidates the whole tree and resets the views.
+        :type node: :class:`RemoteNode` | None
+        :returns: None
+        :rtype: None
+        :raises: None
+        """
+        if node is None or node is self._root:
+            self._root = RemoteNode(None)
+            for view in self._views:
+                view.reset()
+            return
+        if node.children:
+            for view in self._views:
+                view.remove_nodes(node, 0, len(node.children) - 1)
+        node.children = None
+        self._fetch(node)
+
+    def _fetch(self, node):
+        """Request the children of the node, if they are not requested already
+
+        :param node: the node
+        :type node: :class:`RemoteNode`
+        :returns: None
+        :rtype: None
+        :raises: None
+        """
+        if any(n is node for n in self._requests.values()):
+            return
+        self._ids += 1
+        self._requests[self._ids] = node
+        self.requests += 1
+        self._send({'id': self._ids, 'op': 'children', 'path': self.get_path(node),
+                    'roles': [plain_value(r) for r in self.roles], 'depth': self.fetch_depth})
+
+    def _send(self, message):
+        """Send the message or queue it until the connection is established
+
+        :param message: the message
+        :type message: :class:`dict`
+        :returns: None
+        :rtype: None
+        :raises: None
+        """
+        if self._socket.state() != QtNetwork.QLocalSocket.ConnectedState:
+            self._outbox.append(message)
+            return
+        self._socket.write(_encode(message))
+        self._socket.flush()
+
+    def _flush(self, ):
+        """Send the queued messages
+
+        :returns: None
+        :rtype: None
+        :raises: None
+        """
+        outbox, self._outbox = self._outbox, []
+        for message in outbox:
+            self._send(message)
+
+    def _disconnected(self, ):
+        """Queue the open requests again, so they are sent on the next connection
+
+        The answers to the sent requests are lost with the connection.
+
+        :returns: None
+        :rtype: None
+        :raises: None
+        """
+        nodes = list(self._requests.values())
+        self._requests.clear()
+        self._outbox = []
+        for node in nodes:
+            if self._live_path(node) is not None:
+                self._fetch(node)
+
+    def _socket_error(self, *args):
+        """Emit the error of the socket
+
+        :returns: None
+        :rtype: None
+        :raises: None
+        """
+        self.error.emit(self._socket.errorString())
+
+    def _read(self, ):
+        """Handle the responses and pushes
+
+        :returns: None
+        :rtype: None
+        :raises: None
+        """
+        try:
+            messages = _read_messages(self._socket)
+        except ValueError as e:
+            self.error.emit('invalid message: %s' % e)
+            return
+        for message in messages:
+            if 'id' in message:
+                self._response(message)
+                continue
+            handler = getattr(self, '_push_%s' % message.get('push'), None)
+            if handler is None:
+                self.error.emit('unknown message: %r' % message)
+            else:
+                handler(message)
+
+    def _response(self, message):
+        """Insert the fetched children into the views
+
+        :param message: the response
+        :type message: :class:`dict`
+        :returns: None
+        :rtype: None
+        :raises: None
+        """
+        node = self._requests.pop(message['id'], None)
+        if node is None:
+            return
+        path = self._live_path(node)
+        if path is None:
+            # the node was removed or invalidated meanwhile
+            return
+        if message.get('path') != path:
+            # rows before the node changed, the answer belongs to another node
+            self._fetch(node)
+            return
+        if 'error' in message:
+            self.error.emit(message['error'])
+            return
+        if node.children is not None:
+            # a push delivered the children meanwhile
+            return
+        node.children = self._create_nodes(node, message['rows'])
+        node.count = len(node.children)
+        if node.children:
+            for view in self._views:
+                view.insert_nodes(node, 0, node.count - 1)
+        self.fetched.emit(node)
+
+    def _create_nodes(self, parent, rows):
+        """Return new nodes for the encoded rows
+
+        :param parent: the parent node
+        :type parent: :class:`RemoteNode`
+        :param rows: the encoded rows
+        :type rows: :class:`list` of :class:`dict`
+        :returns: the new nodes
+        :rtype: :class:`list` of :class:`RemoteNode`
+        :raises: None
+        """
+        nodes = []
+        for row in rows:
+            node = RemoteNode(parent)
+            self._set_data(node, row)
+            if 'children' in row:
+                node.children = self._create_nodes(node, row['children'])
+            elif not node.count:
+                node.children = []
+            nodes.append(node)
+        return nodes
+
+    @staticmethod
+    def _set_data(node, row):
+        """Store the data of the encoded row on the node
+
+        :param node: the node to update
+        :type node: :class:`RemoteNode`
+        :param row: the encoded row
+        :type row: :class:`dict`
+        :returns: None
+        :rtype: None
+        :raises: None
+        """
+        node.data = dict((int(role), value) for role, value in row.get('data', {}).items())
+        node.enabled = row.get('enabled', True)
+        node.checkable = row.get('checkable', False)
+        node.count = row.get('count', 0)
+
+    def _push_inserted(self, message):
+        """Insert the pushed rows into the cache and the views
+
+        :param message: the push
+        :type message: :class:`dict`
+        :returns: None
+        :rtype: None
+        :raises: None
+        """
+        parent = self.get_node(message['path'])
+        if parent is None:
+            return
+        rows = message['rows']
+        if parent.children is None:
+            parent.count += len(rows)
+            return
+        first = message['first']
+        parent.children[first:first] = self._create_nodes(parent, rows)
+        parent.count = len(parent.children)
+        for view in self._views:
+            view.insert_nodes(parent, first, first + len(rows) - 1)
+
+    def _push_removed(self, message):
+        """Remove the rows from the views and the cache
+
+        :param message: the push
+        :type message: :class:`dict`
+        :returns: None
+        :rtype: None
+        :raises: None
+        """
+        parent = self.get_node(message['path'])
+        if parent is None:
+            return
+        first, last = message['first'], message['last']
+        if parent.children is None:
+            parent.count -= last - first + 1
+            return
+        for view in self._views:
+            view.remove_nodes(parent, first, last)
+        del parent.children[first:last + 1]
+        parent.count = len(parent.children)
+
+    def _push_changed(self, message):
+        """Update the data of the rows in the cache and the views
+
+        Nodes, which got children, are fetched.
+
+        :param message: the push
+        :type message: :class:`dict`
+        :returns: None
+        :rtype: None
+        :raises: None
+        """
+        parent = self.get_node(message['path'])
+        if parent is None or parent.children is None:
+            return
+        first = message['first']
+        fetch = []
+        for row, encoded in enumerate(message['rows'], first):
+            node = parent.children[row]
+            self._set_data(node, encoded)
+            if node.count and node.children == []:
+                node.children = None
+                fetch.append(node)
+        for view in self._views:
+            view.update_nodes(parent, first, first + len(message['rows']) - 1)
+        for node in fetch:
+            self._fetch(node)
+
+    def _push_invalidate(self, message):
+        """Drop the cached children of the node at the path and fetch them again
+
+        :param message: the push
+        :type message: :class:`dict`
+        :returns: None
+        :rtype: None
+        :raises: None
+        """
+        node = self.get_node(message['path'])
+        if node is not None:
+            self.invalidate(node)
+
+
+class ModelServer(QtCore.QObject):
+    """Serves a model to :class:`RemoteSource` clients over a local socket
+
+    Changes of the model are pushed to all clients.
+    Moves and layout changes invalidate the whole tree.
+    """
+
+    def __init__(self, model, parent=None):
+        """Initialize a new server for the given model
+
+        :param model: the model to serve
+        :type model: :class:`PySide.QtCore.QAbstractItemModel`
+        :param parent: the parent object
+        :type parent: :class:`PySide.QtCore.QObject`
+        :raises: None
+        """
+        super(ModelServer, self).__init__(parent)
+        self._model = model
+        self._clients = {}
+        """Map of sockets to the roles of their last request"""
+        self._server = QtNetwork.QLocalServer(self)
+        self._server.newConnection.connect(self._accept)
+        model.rowsInserted.connect(self._rows_inserted)
+        model.rowsRemoved.connect(self._rows_removed)
+        model.dataChanged.connect(self._data_changed)
+        for signal in (model.modelReset, model.layoutChanged, model.rowsMoved):
+            signal.connect(self._invalidate)
+
+    def listen(self, name):
+        """Listen for clients on the given name
+
+        A stale server with the same name, e.g. from a crashed process, is removed.
+
+        :param name: the name of the server
+        :type name: :class:`str`
+        :returns: True, if the server listens
+        :rtype: :class:`bool`
+        :raises: None
+        """
+        QtNetwork.QLocalServer.removeServer(name)
+        return self._server.listen(name)
+
+    def close(self, ):
+        """Stop listening and disconnect all clients
+
+        :returns: None
+        :rtype: None
+        :raises: None
+        """
+        self._server.close()
+        for socket in list(self._clients):
+            socket.disconnectFromServer()
+        self._clients.clear()
+
+    @property
+    def clients(self, ):
+        """Get the number of connected clients
+
+        :returns: the number of clients
+        :rtype: :class:`int`
+        :raises: None
+        """
+        return len(self._clients)
+
+    def _accept(self, ):
+        """Accept the pending connections
+
+        :returns: None
+        :rtype: None
+        :raises: None
+        """
+        while self._server.hasPendingConnections():
+            socket = self._server.nextPendingConnection()
+            self._clients[socket] = [plain_value(r) for r in ROLES]
+            socket.readyRead.connect(functools.partial(self._read, socket))
+            socket.disconnected.connect(functools.partial(self._drop, socket))
+
+    def _drop(self, socket):
+        """Forget the disconnected client
+
+        :param socket: the socket of the client
+        :type socket: :class:`PySide.QtNetwork.QLocalSocket`
+        :returns: None
+        :rtype: None
+        :raises: None
+        """
+        if self._clients.pop(socket, None) is not None:
+            socket.deleteLater()
+
+    def _read(self, socket):
+        """Answer the requests of the client
+
+        :param socket: the socket of the client
+        :type socket: :class:`PySide.QtNetwork.QLocalSocket`
+        :returns: None
+        :rtype: None
+        :raises: None
+        """
+        try:
+            messages = _read_messages(socket)
+        except ValueError:
+            socket.write(_encode({'id': None, 'error': 'invalid message'}))
+            return
+        for message in messages:
+            socket.write(_encode(self._answer(socket, message)))
+        socket.flush()
+
+    def _answer(self, socket, message):
+        """Return the response to the request
+
+        :param socket: the socket of the client
+        :type socket: :class:`PySide.QtNetwork.QLocalSocket`
+        :param message: the request
+        :type message: :class:`dict`
+        :returns: the response
+        :rtype: :class:`dict`
+        :raises: None
+        """
+        path = message.get('path', [])
+        answer = {'id': message.get('id'), 'path': path}
+        if message.get('op') != 'children':
+            answer['error'] = 'unknown operation %r' % message.get('op')
+            return answer
+        roles = message.get('roles') or self._clients[socket]
+        self._clients[socket] = roles
+        parent = self._get_index(path)
+        if parent is None:
+            answer['error'] = 'invalid path %r' % path
+            return answer
+        depth = message.get('depth', 1)
+        answer['rows'] = [self._encode_row(self._model.index(row, 0, parent), roles, depth)
+                          for row in range(self._model.rowCount(parent))]
+        return answer
+
+    def _get_index(self, path):
+        """Return the index at the path
+
+        :param path: the rows from the root
+        :type path: :class:`list` of :class:`int`
+        :returns: the index or None, if the path is invalid
+        :rtype: :class:`PySide.QtCore.QModelIndex` | None
+        :raises: None
+        """
+        index = QtCore.QModelIndex()
+        for row in path:
+            if not 0 <= row < self._model.rowCount(index):
+                return None
+            index = self._model.index(row, 0, index)
+        return index
+
+    def _encode_row(self, index, roles, depth):
+        """Return the row of the index with the data of the roles
+
+        :param index: the index of the row
+        :type index: :class:`PySide.QtCore.QModelIndex`
+        :param roles: the roles as integers
+        :type roles: :class:`list` of :class:`int`
+        :param depth: the number of levels to encode. 1 encodes no children.
+        :type depth: :class:`int`
+        :returns: the encoded row
+        :rtype: :class:`dict`
+        :raises: None
+        """
+        data = {}
+        for role in roles:
+            value = plain_value(index.data(role))
+            if value is not None:
+                data[str(role)] = value
+        flags = index.flags()
+        count = self._model.rowCount(index)
+        row = {'data': data, 'enabled': bool(flags & QtCore.Qt.ItemIsEnabled),
+               'checkable': bool(flags & QtCore.Qt.ItemIsUserCheckable), 'count': count}
+        if depth > 1 and count:
+            row['children'] = [self._encode_row(self._model.index(r, 0, index), roles, depth - 1)
+                               for r in range(count)]
+        return row
+
+    def _push(self, message, rows=None):
+        """Send the message to all clients
+
+        :param message: the push
+        :type message: :class:`dict`
+        :param rows: the parent index and the range of rows to encode for each client or None
+        :type rows: :class:`tuple` | None
+        :returns: None
+        :rtype: None
+        :raises: None
+        """
+        for socket, roles in self._clients.items():
+            if rows is not None:
+                parent, first, last = rows
+                message['rows'] = [self._encode_row(self._model.index(r, 0, parent), roles, 1)
+                                   for r in range(first, last + 1)]
+            socket.write(_encode(message))
+            socket.flush()
+
+    def _rows_inserted(self, parent, first, last):
+        """Push the inserted rows
+
+        :param parent: the parent index
+        :type parent: :class:`PySide.QtCore.QModelIndex`
+        :param first: the first row
+        :type first: :class:`int`
+        :param last: the last row
+        :type last: :class:`int`
+        :returns: None
+        :rtype: None
+        :raises: None
+        """
+        self._push({'push': 'inserted', 'path': index_path(parent), 'first': first}, (parent, first, last))
+
+    def _rows_removed(self, parent, first, last):
+        """Push the removed rows
+
+        :param parent: the parent index
+        :type parent: :class:`PySide.QtCore.QModelIndex`
+        :param first: the first row
+        :type first: :class:`int`
+        :param last: the last row
+        :type last: :class:`int`
+        :returns: None
+        :rtype: None
+        :raises: None
+        """
+        self._push({'push': 'removed', 'path': index_path(parent), 'first': first, 'last': last})
+
+    def _data_changed(self, topLeft, bottomRight, *args):
+        """Push the changed rows
+
+        :param topLeft: the top left changed index
+        :type topLeft: :class:`PySide.QtCore.QModelIndex`
+        :param bottomRight: the bottom right changed index
+        :type bottomRight: :class:`PySide.QtCore.QModelIndex`
+        :returns: None
+        :rtype: None
+        :raises: None
+        """
+        parent = topLeft.parent()
+        self._push({'push': 'changed', 'path': index_path(parent), 'first': topLeft.row()},
+                   (parent, topLeft.row(), bottomRight.row()))
+
+    def _invalidate(self, *args):
+        """Push the invalidation of the whole tree
+
+        :returns: None
+        :rtype: None
+        :raises: None
+        """
+        self._push({'push': 'invalidate', 'path': []})
@@ -0,0 +1,47 @@
+"""Convert model data and indizes to JSON compatible values
+
+Shared by :mod:`qmenuview.recorder` and :mod:`qmenuview.remote`.
+This module does not import Qt.
+"""
+
+__all__ = ['index_path', 'plain_value']
+
+try:
+    _string_types = basestring
+except NameError:  # python 3
+    _string_types = str
+
+
+def plain_value(value):
+    """Return the value as JSON compatible type
+
+    Enums are converted to integers. Other data, e.g. icons, is dropped.
+
+    :param value: the data of a role
+    :returns: the plain value or None
+    :raises: None
+    """
+    if value is None or isinstance(value, (_string_types, bool, int, float)):
+        return value
+    try:
+        # python enums of newer bindings keep the number in value
+        return int(getattr(value, 'value', value))
+    except (TypeError, ValueError):
+        return None
+
+
+def index_path(index):
+    """Return the rows from the root to the index
+
+    :param index: the index
+    :type index: :class:`PySide.QtCore.QModelIndex`
+    :returns: the list of rows. The root gives an empty list.
+    :rtype: :class:`list` of :class:`int`
+    :raises: None
+    """
+    rows = []
+    while index.isValid():
+        rows.append(index.row())
+        index = index.parent()
+    rows.reverse()
+    return rows
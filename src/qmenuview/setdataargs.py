@@ -0,0 +1,28 @@
+"""The container for the attributes, that a :class:`qmenuview.MenuView` sets on its actions
+
+This module does not import Qt, so tools can inspect and create the configuration cheaply.
+"""
+
+__all__ = ['SetDataArgs']
+
+
+class SetDataArgs(object):
+    """A container of arguments for setting attributes on an action.
+
+    The data is queried from the model with ``role``. Then converted with ``convertfunc``.
+    Then ``setfunc`` is used for setting the attribute on the action.
+    ``convertfunc`` can be ``None``.
+
+    If column is a string, the attribute of the view with that name will be used as column.
+    """
+
+    def __init__(self, setfunc, column, role, convertfunc):
+        """Initialize a new container
+
+        :raises: None
+        """
+        super(SetDataArgs, self).__init__()
+        self.setfunc = setfunc
+        self.column = column
+        self.role = role
+        self.convertfunc = convertfunc
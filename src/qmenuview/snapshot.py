@@ -0,0 +1,202 @@
+import mmap
+import struct
+
+__all__ = ['Snapshot', 'write_snapshot']
+
+MAGIC = b'QMVS'
+"""The magic bytes at the start of a snapshot file"""
+VERSION = 1
+"""The version of the snapshot format"""
+
+ENABLED = 1
+"""Record flag for enabled actions"""
+CHECKABLE = 2
+"""Record flag for checkable actions"""
+CHECKED = 4
+"""Record flag for checked actions"""
+MENU = 8
+"""Record flag for actions with a menu"""
+
+_HEADER = struct.Struct('<4sHII')
+"""magic, version, number of records, number of strings"""
+_RECORD = struct.Struct('<BIIIIII')
+"""flags, number of children, text, tooltip, statustip, whatsthis, icon key.
+The strings are indizes into the string table."""
+_OFFSET = struct.Struct('<I')
+
+
+def write_snapshot(menu, path, iconkey=None, exclude=()):
+    """Write the action tree of the menu to a compact binary file
+
+    The file starts with a header, followed by one fixed size record per action
+    in pre-order. The first record is the menu itself. Each record stores the flags,
+    the number of children and indizes into a table of unique strings
+    for the text, tooltip, statustip, whatsThis and icon key.
+
+    :param menu: the menu to save
+    :type menu: :class:`PySide.QtGui.QMenu`
+    :param path: the file path
+    :type path: :class:`str`
+    :param iconkey: a callable, that returns a string key for the icon of an action.
+                    Default is the theme name of the icon.
+    :type iconkey: callable | None
+    :param exclude: actions that are not saved
+    :type exclude: container of :class:`PySide.QtGui.QAction`
+    :returns: None
+    :rtype: None
+    :raises: :class:`IOError`
+    """
+    if iconkey is None:
+        iconkey = _theme_name
+    strings = {'': 0}
+    records = bytearray()
+    count = 0
+
+    def string(s):
+        return strings.setdefault(s, len(strings))
+
+    def children(m):
+        return [a for a in m.actions() if a not in exclude]
+
+    stack = [(menu.menuAction(), True)]
+    while stack:
+        action, isroot = stack.pop()
+        submenu = action.menu()
+        kids = children(submenu) if submenu is not None else []
+        flags = 0
+        if action.isEnabled():
+            flags |= ENABLED
+        if action.isCheckable():
+            flags |= CHECKABLE
+        if action.isChecked():
+            flags |= CHECKED
+        if submenu is not None:
+            flags |= MENU
+        if isroot:
+            texts = ('', '', '', '', '')
+        else:
+            texts = (action.text(), action.toolTip(), action.statusTip(),
+                     action.whatsThis(), iconkey(action) or '')
+        records.extend(_RECORD.pack(flags, len(kids), *[string(t) for t in texts]))
+        count += 1
+        stack.extend((a, False) for a in reversed(kids))
+
+    table = sorted(strings, key=strings.get)
+    blobs = [t.encode('utf-8') for t in table]
+    offsets = bytearray()
+    offset = 0
+    for blob in blobs:
+        offsets.extend(_OFFSET.pack(offset))
+        offset += len(blob)
+    offsets.extend(_OFFSET.pack(offset))
+    with open(path, 'wb') as f:
+        f.write(_HEADER.pack(MAGIC, VERSION, count, len(table)))
+        f.write(records)
+        f.write(offsets)
+        f.write(b''.join(blobs))
+
+
+def _theme_name(action):
+    """Return the theme name of the icon of the action
+
+    :param action: the action to query
+    :type action: :class:`PySide.QtGui.QAction`
+    :returns: the theme name of the icon
+    :rtype: :class:`str`
+    :raises: None
+    """
+    return action.icon().name()
+
+
+class Snapshot(object):
+    """A memory-mapped snapshot file, written by :func:`write_snapshot`.
+
+    The records are read lazily from the mapped file.
+    Use it as context manager or call :meth:`Snapshot.close`.
+    """
+
+    def __init__(self, path):
+        """Open the snapshot at the given path
+
+        :param path: the file path
+        :type path: :class:`str`
+        :raises: :class:`ValueError` if the file is no valid snapshot.
+        """
+        super(Snapshot, self).__init__()
+        self._file = open(path, 'rb')
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # an empty file can not be mapped
+            self._file.close()
+            raise ValueError("%s is not a snapshot" % path)
+        if len(self._map) < _HEADER.size:
+            self.close()
+            raise ValueError("%s is not a snapshot" % path)
+        magic, version, count, stringcount = _HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError("%s is not a snapshot of version %s" % (path, VERSION))
+        self._count = count
+        self._stringcount = stringcount
+        self._offsets = _HEADER.size + count * _RECORD.size
+        self._blob = self._offsets + (stringcount + 1) * _OFFSET.size
+        self._strings = {}
+
+    def __len__(self, ):
+        """Return the number of records including the root record
+
+        :returns: the number of records
+        :rtype: :class:`int`
+        :raises: None
+        """
+        return self._count
+
+    def __enter__(self, ):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self, ):
+        """Close the mapped file
+
+        :returns: None
+        :rtype: None
+        :raises: None
+        """
+        self._map.close()
+        self._file.close()
+
+    def string(self, i):
+        """Return the string with the given index of the string table
+
+        :param i: the index of the string
+        :type i: :class:`int`
+        :returns: the decoded string
+        :rtype: :class:`str`
+        :raises: :class:`IndexError`
+        """
+        if i in self._strings:
+            return self._strings[i]
+        if not 0 <= i < self._stringcount:
+            raise IndexError(i)
+        start, = _OFFSET.unpack_from(self._map, self._offsets + i * _OFFSET.size)
+        end, = _OFFSET.unpack_from(self._map, self._offsets + (i + 1) * _OFFSET.size)
+        s = self._map[self._blob + start:self._blob + end].decode('utf-8')
+        self._strings[i] = s
+        return s
+
+    def record(self, i):
+        """Return the record with the given index
+
+        :param i: the index of the record in pre-order. 0 is the root.
+        :type i: :class:`int`
+        :returns: flags, number of children, text, tooltip, statustip, whatsThis, icon key
+        :rtype: :class:`tuple`
+        :raises: :class:`IndexError`
+        """
+        if not 0 <= i < self._count:
+            raise IndexError(i)
+        values = _RECORD.unpack_from(self._map, _HEADER.size + i * _RECORD.size)
+        return values[:2] + tuple(self.string(s) for s in values[2:])
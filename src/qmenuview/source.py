@@ -0,0 +1,150 @@
+from .qt import QtCore
+
+__all__ = ['TreeSource', 'NestedSource']
+
+try:
+    _string_types = basestring
+except NameError:  # python 3
+    _string_types = str
+
+
+class TreeSource(object):
+    """Base class for native tree sources of a :class:`qmenuview.MenuView`.
+
+    A tree source is a lightweight alternative to a :class:`PySide.QtCore.QAbstractItemModel`.
+    The view queries the children of a node with :meth:`TreeSource.children` and
+    the data with :meth:`TreeSource.data`. No :class:`PySide.QtCore.QModelIndex` is allocated.
+
+    Any object with a ``children(node)`` and ``data(node, role)`` method can be used
+    as source. ``root`` and ``flags(node)`` are optional.
+
+    Nodes, which have children, have to be distinct objects, because the view
+    uses their identity to find the menu of a node.
+    """
+
+    def __init__(self, root=None):
+        """Initialize a new source with the given root node
+
+        :param root: the invisible root node. Its children are the top level actions.
+        :raises: None
+        """
+        super(TreeSource, self).__init__()
+        self.root = root
+        """The invisible root node"""
+
+    def children(self, node):
+        """Return the sequence of child nodes of the given node
+
+        :param node: the node to query
+        :returns: the child nodes
+        :rtype: sequence
+        :raises: :class:`NotImplementedError`
+        """
+        raise NotImplementedError
+
+    def data(self, node, role):
+        """Return the data of the node for the given role
+
+        :param node: the node to query
+        :param role: the data role
+        :type role: :data:`PySide.QtCore.Qt.ItemDataRole`
+        :returns: the data or None
+        :raises: None
+        """
+        return None
+
+    def flags(self, node):
+        """Return the item flags of the given node
+
+        :param node: the node to query
+        :returns: the item flags. Default is enabled.
+        :rtype: :data:`PySide.QtCore.Qt.ItemFlags`
+        :raises: None
+        """
+        return QtCore.Qt.ItemIsEnabled
+
+
+class NestedSource(TreeSource):
+    """A source for nested python lists and dicts.
+
+    The root is a list of nodes. A node is either a string, which will be a plain action
+    with that text, or a dictionary with any of these keys:
+
+      - ``text``, ``icon``, ``tooltip``, ``checked``, ``whatsthis``, ``statustip``:
+        the data for the corresponding role.
+      - ``enabled``: False to disable the action. Default True.
+      - ``checkable``: True to make the action checkable.
+        Default is True, if there is a ``checked`` key.
+      - ``children``: a list of child nodes.
+
+    Item data roles can be used as keys as well.
+    The root can also be a dictionary with a ``children`` key.
+
+    Example::
+
+      source = NestedSource(['Open', {'text': 'Recent', 'children': ['a.txt', 'b.txt']}])
+    """
+
+    rolekeys = {QtCore.Qt.DisplayRole: 'text',
+                QtCore.Qt.DecorationRole: 'icon',
+                QtCore.Qt.ToolTipRole: 'tooltip',
+                QtCore.Qt.CheckStateRole: 'checked',
+                QtCore.Qt.WhatsThisRole: 'whatsthis',
+                QtCore.Qt.StatusTipRole: 'statustip'}
+    """Map of item data roles to the dictionary keys of a node"""
+
+    def children(self, node):
+        """Return the list of child nodes of the given node
+
+        :param node: the node to query
+        :type node: :class:`list` | :class:`dict` | :class:`str`
+        :returns: the child nodes
+        :rtype: :class:`list`
+        :raises: None
+        """
+        if isinstance(node, dict):
+            return node.get('children', ())
+        if isinstance(node, (list, tuple)):
+            return node
+        return ()
+
+    def data(self, node, role):
+        """Return the data of the node for the given role
+
+        :param node: the node to query
+        :type node: :class:`dict` | :class:`str`
+        :param role: the data role
+        :type role: :data:`PySide.QtCore.Qt.ItemDataRole`
+        :returns: the data or None
+        :raises: None
+        """
+        if isinstance(node, _string_types):
+            return node if role == QtCore.Qt.DisplayRole else None
+        if not isinstance(node, dict):
+            return None
+        key = self.rolekeys.get(role)
+        if key == 'checked':
+            if key not in node:
+                return None
+            return QtCore.Qt.Checked if node[key] else QtCore.Qt.Unchecked
+        if key in node:
+            return node[key]
+        return node.get(role)
+
+    def flags(self, node):
+        """Return the item flags of the given node
+
+        :param node: the node to query
+        :type node: :class:`dict` | :class:`str`
+        :returns: the item flags
+        :rtype: :data:`PySide.QtCore.Qt.ItemFlags`
+        :raises: None
+        """
+        if not isinstance(node, dict):
+            return QtCore.Qt.ItemIsEnabled
+        flags = QtCore.Qt.NoItemFlags
+        if node.get('enabled', True):
+            flags |= QtCore.Qt.ItemIsEnabled
+        if node.get('checkable', 'checked' in node):
+            flags |= QtCore.Qt.ItemIsUserCheckable
+        return flags
@@ -0,0 +1,397 @@
+import functools
+
+from .qt import QtCore
+
+from .columns import DataColumns
+from .view import MenuView
+
+__all__ = ['MenuStore', 'StoreNode']
+
+
+class StoreNode(object):
+    """A node of a :class:`MenuStore`, that mirrors one row of the model.
+
+    The node holds the converted data of the row, so it can be applied
+    to the actions of all views without querying the model again.
+    """
+
+    __slots__ = ('parent', 'children', 'values', 'flags')
+
+    def __init__(self, parent):
+        """Initialize a new node
+
+        :param parent: the parent node or None for the root
+        :type parent: :class:`StoreNode` | None
+        :raises: None
+        """
+        self.parent = parent
+        """The parent node"""
+        self.children = []
+        """The list of child nodes"""
+        self.values = ()
+        """A sequence of pairs of action setter names and converted values"""
+        self.flags = QtCore.Qt.ItemIsEnabled
+        """The item flags for the enabled and checkable state"""
+
+
+class MenuStore(QtCore.QObject, DataColumns):
+    """A shared backing store for multiple :class:`qmenuview.MenuView` instances on one model.
+
+    The store listens to the signals of the model once. It keeps a tree of :class:`StoreNode`
+    and converts the data of each row once. Views use the store as source::
+
+      store = MenuStore(model)
+      menubarview.source = store
+      trayview.source = store
+
+    Every model signal is processed once and then fanned out to the subscribed views
+    with :meth:`qmenuview.MenuView.insert_nodes`, :meth:`qmenuview.MenuView.remove_nodes`
+    and :meth:`qmenuview.MenuView.update_nodes`.
+    The views emit :data:`qmenuview.MenuView.node_triggered` etc. with the store nodes.
+    Use :meth:`MenuStore.get_index` to get the index of a node.
+
+    The columns and :data:`MenuStore.setdataargs` are the same as the ones of :class:`qmenuview.MenuView`,
+    see :class:`qmenuview.columns.DataColumns`. Changing them takes effect on the next reset.
+    """
+
+    def __init__(self, model=None, parent=None):
+        """Initialize a new store for the given model
+
+        :param model: the model to mirror
+        :type model: :class:`PySide.QtCore.QAbstractItemModel` | None
+        :param parent: the parent object
+        :type parent: :class:`PySide.QtCore.QObject`
+        :raises: None
+        """
+        super(MenuStore, self).__init__(parent)
+        self._init_data_columns()
+        self._model = None
+        self._root = StoreNode(None)
+        self._views = []
+        self._unsubscribers = {}
+        """Map of subscribed views to the slots connected to their destroyed signal"""
+        self.model = model
+
+    @property
+    def root(self, ):
+        """Get the root node
+
+        :returns: the invisible root node
+        :rtype: :class:`StoreNode`
+        :raises: None
+        """
+        return self._root
+
+    @property
+    def model(self, ):
+        """Get the model
+
+        :returns: the current model
+        :rtype: :class:`PySide.QtCore.QAbstractItemModel`
+        :raises: None
+        """
+        return self._model
+
+    @model.setter
+    def model(self, model):
+        """Set the model and reset all views
+
+        :param model: the model to set
+        :type model: :class:`PySide.QtCore.QAbstractItemModel`
+        :returns: None
+        :rtype: None
+        :raises: None
+        """
+        signalmap = {"modelReset": self.reset,
+                     "rowsInserted": self._insert_rows,
+                     "rowsAboutToBeRemoved": self._remove_rows,
+                     "dataChanged": self._update_rows}
+        if self._model:
+            for signal, callback in signalmap.items():
+                getattr(self._model, signal).disconnect(callback)
+        self._model = model
+        if model:
+            for signal, callback in signalmap.items():
+                getattr(model, signal).connect(callback)
+        self.reset()
+
+    def subscribe(self, view):
+        """Add a view, that gets notified about changes
+
+        This is called, when the store is set as source of the view.
+        A view, that is already subscribed, is not added again.
+
+        :param view: the view to notify
+        :type view: :class:`qmenuview.MenuView`
+        :returns: None
+        :rtype: None
+        :raises: None
+        """
+        if view in self._unsubscribers:
+            return
+        self._views.append(view)
+        slot = functools.partial(self.unsubscribe, view)
+        self._unsubscribers[view] = slot
+        view.destroyed.connect(slot)
+
+    def unsubscribe(self, view, *args):
+        """Remove a view, so it does not get notified anymore
+
+        :param view: the view to remove
+        :type view: :class:`qmenuview.MenuView`
+        :returns: None
+        :rtype: None
+        :raises: None
+        """
+        self._views = [v for v in self._views if v is not view]
+        slot = self._unsubscribers.pop(view, None)
+        if slot is not None and not args:
+            # args are only given by the destroyed signal, then the connection is gone anyway
+            view.destroyed.disconnect(slot)
+
+    @property
+    def views(self, ):
+        """Get the subscribed views
+
+        :returns: a list of views
+        :rtype: :class:`list` of :class:`qmenuview.MenuView`
+        :raises: None
+        """
+        return list(self._views)
+
+    def reset(self, ):
+        """Rebuild all nodes from the model and reset all views
+
+        :returns: None
+        :rtype: None
+        :raises: None
+        """
+        self._root = StoreNode(None)
+        if self._model:
+            self._build(self._root, QtCore.QModelIndex())
+        for view in self._views:
+            view.reset()
+
+    def _build(self, node, index):
+        """Create the nodes for all children of the given index
+
+        :param node: the node of index
+        :type node: :class:`StoreNode`
+        :param index: the index to build the children of
+        :type index: :class:`PySide.QtCore.QModelIndex`
+        :returns: None
+        :rtype: None
+        :raises: None
+        """
+        m = self._model
+        stack = [(node, index)]
+        while stack:
+            node, index = stack.pop()
+            for row in range(m.rowCount(index)):
+                childindex = m.index(row, 0, index)
+                child = self._create_node(node, childindex)
+                node.children.append(child)
+                if m.hasChildren(childindex):
+                    stack.append((child, childindex))
+
+    def _create_node(self, parent, index):
+        """Create a node with the converted data of the index
+
+        :param parent: the parent node
+        :type parent: :class:`StoreNode`
+        :param index: the index with the data
+        :type index: :class:`PySide.QtCore.QModelIndex`
+        :returns: the new node
+        :rtype: :class:`StoreNode`
+        :raises: None
+        """
+        node = StoreNode(parent)
+        self._convert_data(node, index)
+        return node
+
+    def _convert_data(self, node, index):
+        """Query and convert the data of the index and store it on the node
+
+        :param node: the node to update
+        :type node: :class:`StoreNode`
+        :param index: the index with the data
+        :type index: :class:`PySide.QtCore.QModelIndex`
+        :returns: None
+        :rtype: None
+        :raises: None
+        """
+        Qt = QtCore.Qt
+        checkedflags = index.sibling(index.row(), self.checked_column).flags()
+        node.flags = (index.flags() & Qt.ItemIsEnabled) | (checkedflags & Qt.ItemIsUserCheckable)
+        values = []
+        for args in self.setdataargs:
+            column = args.column
+            if not isinstance(column, int):
+                column = getattr(self, column)
+            data = MenuView.get_data(index, args.role, column)
+            if data is None:
+                continue
+            if args.convertfunc:
+                data = args.convertfunc(data)
+            values.append((args.setfunc, data))
+        node.values = tuple(values)
+
+    def children(self, node):
+        """Return the child nodes of the given node
+
+        :param node: the node to query
+        :type node: :class:`StoreNode`
+        :returns: the child nodes
+        :rtype: :class:`list` of :class:`StoreNode`
+        :raises: None
+        """
+        return node.children
+
+    def data(self, node, role):
+        """Return the data of the node for the given role from the model
+
+        :param node: the node to query
+        :type node: :class:`StoreNode`
+        :param role: the data role
+        :type role: :data:`PySide.QtCore.Qt.ItemDataRole`
+        :returns: the data or None
+        :raises: None
+        """
+        index = self.get_index(node)
+        if index.isValid():
+            return index.data(role)
+
+    def flags(self, node):
+        """Return the item flags of the given node
+
+        :param node: the node to query
+        :type node: :class:`StoreNode`
+        :returns: the item flags for the enabled and checkable state
+        :rtype: :data:`PySide.QtCore.Qt.ItemFlags`
+        :raises: None
+        """
+        return node.flags
+
+    def action_data(self, node):
+        """Return the converted data of the node
+
+        :param node: the node to query
+        :type node: :class:`StoreNode`
+        :returns: pairs of action setter names and converted values
+        :rtype: :class:`tuple`
+        :raises: None
+        """
+        return node.values
+
+    def get_node(self, index):
+        """Return the node of the given index
+
+        :param index: the index to query
+        :type index: :class:`PySide.QtCore.QModelIndex`
+        :returns: the node or None
+        :rtype: :class:`StoreNode` | None
+        :raises: None
+        """
+        rows = []
+        while index.isValid():
+            rows.append(index.row())
+            index = index.parent()
+        node = self._root
+        try:
+            for row in reversed(rows):
+                node = node.children[row]
+        except IndexError:
+            return None
+        return node
+
+    def get_index(self, node, column=0):
+        """Return the index of the given node
+
+        :param node: the node to query
+        :type node: :class:`StoreNode`
+        :param column: the column of the index
+        :type column: :class:`int`
+        :returns: the index of the node. The root gives an invalid index.
+        :rtype: :class:`PySide.QtCore.QModelIndex`
+        :raises: None
+        """
+        rows = []
+        while node.parent is not None:
+            rows.append(node.parent.children.index(node))
+            node = node.parent
+        index = QtCore.QModelIndex()
+        if not self._model:
+            return index
+        for i, row in enumerate(reversed(rows)):
+            c = column if i == len(rows) - 1 else 0
+            index = self._model.index(row, c, index)
+        return index
+
+    def _insert_rows(self, parent, first, last):
+        """Create nodes for the inserted rows and notify the views
+
+        :param parent: The parent index
+        :type parent: :class:`PySide.QtCore.QModelIndex`
+        :param first: the first row
+        :type first: :class:`int`
+        :param last: the last row
+        :type last: :class:`int`
+        :returns: None
+        :rtype: None
+        :raises: None
+        """
+        node = self.get_node(parent)
+        if node is None:
+            return
+        new = []
+        for row in range(first, last + 1):
+            index = self._model.index(row, 0, parent)
+            child = self._create_node(node, index)
+            self._build(child, index)
+            new.append(child)
+        node.children[first:first] = new
+        for view in self._views:
+            view.insert_nodes(node, first, last)
+
+    def _remove_rows(self, parent, first, last):
+        """Notify the views and remove the nodes of the rows
+
+        :param parent: the parent index
+        :type parent: :class:`PySide.QtCore.QModelIndex`
+        :param first: the first row
+        :type first: :class:`int`
+        :param last: the last row
+        :type last: :class:`int`
+        :returns: None
+        :rtype: None
+        :raises: None
+        """
+        node = self.get_node(parent)
+        if node is None:
+            return
+        for view in self._views:
+            view.remove_nodes(node, first, last)
+        del node.children[first:last + 1]
+
+    def _update_rows(self, topLeft, bottomRight):
+        """Convert the data of the changed rows once and notify the views
+
+        :param topLeft: The top left index to update
+        :type topLeft: :class:`PySide.QtCore.QModelIndex`
+        :param bottomRight: the bottom right index to update
+        :type bottomRight: :class:`PySide.QtCore.QModelIndex`
+        :returns: None
+        :rtype: None
+        :raises: None
+        """
+        columns = self._data_columns()
+        if not any([(c >= topLeft.column() and c <= bottomRight.column()) for c in columns]):
+            return
+        node = self.get_node(topLeft.parent())
+        if node is None:
+            return
+        first, last = topLeft.row(), bottomRight.row()
+        for row in range(first, last + 1):
+            self._convert_data(node.children[row], topLeft.sibling(row, 0))
+        for view in self._views:
+            view.update_nodes(node, first, last)
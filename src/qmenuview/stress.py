@@ -0,0 +1,382 @@
+"""Randomized mutation stress test for :class:`qmenuview.MenuView`
+
+The index to action mapping of the view relies on the order of the actions
+matching the order of the rows. :func:`run` applies random inserts, removes,
+moves, data changes and resets to a :class:`PySide.QtGui.QStandardItemModel`,
+verifies the action tree against the model after each batch with :func:`verify`
+and reports the throughput. From the command line::
+
+  python -m qmenuview.stress --operations 1000000 --seed 42
+"""
+import argparse
+import json
+import random
+import sys
+import time
+
+from .qt import QtCore, QtGui
+
+__all__ = ['StressResult', 'random_model', 'run', 'verify']
+
+OPERATIONS = ['insert', 'remove', 'move', 'data', 'reset']
+"""The names of the random operations"""
+WEIGHTS = [30, 25, 15, 29, 1]
+"""The default relative weights of :data:`OPERATIONS`"""
+
+
+class StressResult(object):
+    """The outcome of a stress run"""
+
+    def __init__(self, ):
+        self.operations = 0
+        """The number of applied operations"""
+        self.batches = 0
+        """The number of verified batches"""
+        self.seconds = 0.0
+        """The time spent in the operations. Verification is excluded."""
+        self.counts = dict((name, 0) for name in OPERATIONS)
+        """A map of operation names to the number of times they were applied"""
+        self.problems = []
+        """The problems found by the first failing verification"""
+
+    @property
+    def ops_per_second(self, ):
+        """Get the throughput
+
+        :returns: the number of operations per second
+        :rtype: :class:`float`
+        :raises: None
+        """
+        if not self.seconds:
+            return 0.0
+        return self.operations / self.seconds
+
+    def summary(self, ):
+        """Return the result as JSON compatible dictionary
+
+        :returns: the summary
+        :rtype: :class:`dict`
+        :raises: None
+        """
+        return {'operations': self.operations, 'batches': self.batches,
+                'seconds': self.seconds, 'ops_per_second': self.ops_per_second,
+                'counts': dict(self.counts), 'problems': list(self.problems)}
+
+
+def _random_rows(rng, depth, breadth):
+    """Return a list of new items with random children
+
+    :param rng: the random generator
+    :type rng: :class:`random.Random`
+    :param depth: the maximum depth of the new items
+    :type depth: :class:`int`
+    :param breadth: the maximum number of items per level
+    :type breadth: :class:`int`
+    :returns: the new items
+    :rtype: :class:`list` of :class:`PySide.QtGui.QStandardItem`
+    :raises: None
+    """
+    items = []
+    for i in range(rng.randint(1, breadth)):
+        item = QtGui.QStandardItem('item%s' % rng.randrange(1000000))
+        if depth > 1 and rng.random() < 0.3:
+            for child in _random_rows(rng, depth - 1, breadth):
+                item.appendRow(child)
+        items.append(item)
+    return items
+
+
+def random_model(rng, depth=4, breadth=8):
+    """Return a model with a random tree
+
+    :param rng: the random generator
+    :type rng: :class:`random.Random`
+    :param depth: the maximum depth
+    :type depth: :class:`int`
+    :param breadth: the maximum number of rows per level
+    :type breadth: :class:`int`
+    :returns: the new model
+    :rtype: :class:`PySide.QtGui.QStandardItemModel`
+    :raises: None
+    """
+    model = QtGui.QStandardItemModel()
+    for item in _random_rows(rng, depth, breadth):
+        model.appendRow(item)
+    return model
+
+
+def _random_item(rng, model):
+    """Return a random item by walking down from the root
+
+    :param rng: the random generator
+    :type rng: :class:`random.Random`
+    :param model: the model
+    :type model: :class:`PySide.QtGui.QStandardItemModel`
+    :returns: the item and its depth. The root is the invisible root item.
+    :rtype: :class:`tuple`
+    :raises: None
+    """
+    item = model.invisibleRootItem()
+    depth = 0
+    while item.rowCount() and rng.random() < 0.6:
+        item = item.child(rng.randrange(item.rowCount()))
+        depth += 1
+    return item, depth
+
+
+def _is_ancestor(item, other):
+    """Return True, if item is other or one of its parents
+
+    :param item: the possible ancestor
+    :type item: :class:`PySide.QtGui.QStandardItem`
+    :param other: the item to check
+    :type other: :class:`PySide.QtGui.QStandardItem` | None
+    :returns: True, if item is an ancestor
+    :rtype: :class:`bool`
+    :raises: None
+    """
+    while other is not None:
+        if other is item:
+            return True
+        other = other.parent()
+    return False
+
+
+def _parent_item(model, item):
+    """Return the parent of the item. Top level items give the invisible root item.
+
+    :param model: the model
+    :type model: :class:`PySide.QtGui.QStandardItemModel`
+    :param item: the item
+    :type item: :class:`PySide.QtGui.QStandardItem`
+    :returns: the parent item
+    :rtype: :class:`PySide.QtGui.QStandardItem`
+    :raises: None
+    """
+    return item.parent() or model.invisibleRootItem()
+
+
+def _apply(rng, model, name, depth, breadth):
+    """Apply one random operation to the model
+
+    :param rng: the random generator
+    :type rng: :class:`random.Random`
+    :param model: the model to change
+    :type model: :class:`PySide.QtGui.QStandardItemModel`
+    :param name: the operation. One of :data:`OPERATIONS`.
+    :type name: :class:`str`
+    :param depth: the maximum depth of the tree
+    :type depth: :class:`int`
+    :param breadth: the maximum number of new rows
+    :type breadth: :class:`int`
+    :returns: None
+    :rtype: None
+    :raises: None
+    """
+    root = model.invisibleRootItem()
+    if name == 'insert':
+        parent, level = _random_item(rng, model)
+        if level >= depth:
+            parent = _parent_item(model, parent)
+            level -= 1
+        row = rng.randint(0, parent.rowCount())
+        parent.insertRows(row, _random_rows(rng, max(depth - level - 1, 1), breadth))
+    elif name == 'remove':
+        item, level = _random_item(rng, model)
+        if item is root:
+            return
+        parent = _parent_item(model, item)
+        first = item.row()
+        last = rng.randint(first, min(first + breadth, parent.rowCount()) - 1)
+        parent.removeRows(first, last - first + 1)
+    elif name == 'move':
+        item, level = _random_item(rng, model)
+        target, targetlevel = _random_item(rng, model)
+        if item is root or targetlevel >= depth or _is_ancestor(item, target):
+            return
+        # QStandardItemModel moves as remove and insert
+        row = _parent_item(model, item).takeRow(item.row())
+        target.insertRow(rng.randint(0, target.rowCount()), row)
+    elif name == 'data':
+        item, level = _random_item(rng, model)
+        if item is root:
+            return
+        item.setText('item%s' % rng.randrange(1000000))
+    elif name == 'reset':
+        model.clear()
+        for item in _random_rows(rng, depth, breadth):
+            model.appendRow(item)
+
+
+def verify(view, model):
+    """Compare the action tree of the view with the model
+
+    Unloaded placeholder menus are skipped. Rows behind an overflow action must not be built.
+    The actions are mapped to the rows with the row order of the view,
+    so sorted and grouped menus are checked as well. Their display order has to follow
+    the sort and group keys. Texts and order are only checked for menus without pending data.
+
+    :param view: the view to check
+    :type view: :class:`qmenuview.MenuView`
+    :param model: the model of the view
+    :type model: :class:`PySide.QtCore.QAbstractItemModel`
+    :returns: a list of problems. Empty if the tree is consistent.
+    :rtype: :class:`list` of :class:`str`
+    :raises: None
+    """
+    problems = []
+    stack = [(view, QtCore.QModelIndex())]
+    while stack:
+        menu, parent = stack.pop()
+        if menu in view._unloaded:
+            continue
+        actions = view._row_actions(menu)
+        overflow = view._overflow.get(menu)
+        shown = [a for a in menu.actions() if a is not overflow and not a.isSeparator()]
+        if len(shown) != len(actions) or set(shown) != set(actions):
+            problems.append('%s: the menu shows other actions than its rows' % _describe(parent))
+        for action in menu.actions():
+            if (action is overflow or action.isSeparator()) and view.get_index(action).isValid():
+                problems.append('%s: an action without row has an index' % _describe(parent))
+        order = view._sorted.get(menu)
+        if order is not None and menu not in view._dirty:
+            keys = [view._order_key(order, view.get_index(a)) for a in shown]
+            if keys != sorted(keys):
+                problems.append('%s: the actions are not sorted' % _describe(parent))
+        rows = model.rowCount(parent)
+        if overflow is not None:
+            if len(actions) > rows:
+                problems.append('%s: %s actions before the overflow for %s rows'
+                                % (_describe(parent), len(actions), rows))
+        elif len(actions) != rows:
+            problems.append('%s: %s actions for %s rows' % (_describe(parent), len(actions), rows))
+        for row, action in enumerate(actions[:rows]):
+            index = model.index(row, 0, parent)
+            if view.get_action(index) is not action:
+                problems.append('%s: get_action returns another action' % _describe(index))
+            if view.get_index(action) != index:
+                problems.append('%s: get_index returns another index' % _describe(index))
+            if menu not in view._dirty:
+                text = view.get_data(index, QtCore.Qt.DisplayRole, view.text_column)
+                if text is not None and action.text() != str(text):
+                    problems.append('%s: text %r instead of %r' % (_describe(index), action.text(), text))
+            if model.hasChildren(index) != (action.menu() is not None):
+                problems.append('%s: menu does not match the children' % _describe(index))
+            if action.menu() is not None:
+                stack.append((action.menu(), index))
+        if problems:
+            break
+    return problems
+
+
+def _describe(index):
+    """Return the path of rows of the index as string
+
+    :param index: the index
+    :type index: :class:`PySide.QtCore.QModelIndex`
+    :returns: e.g. ``'/2/0'`` or ``'/'`` for the root
+    :rtype: :class:`str`
+    :raises: None
+    """
+    rows = []
+    while index.isValid():
+        rows.append(str(index.row()))
+        index = index.parent()
+    return '/' + '/'.join(reversed(rows))
+
+
+def run(operations=10000, batch=1000, seed=None, depth=4, breadth=8, weights=None, view=None):
+    """Apply random operations to a random model and verify the view after each batch
+
+    The run stops at the first batch, that fails the verification.
+
+    :param operations: the number of operations
+    :type operations: :class:`int`
+    :param batch: the number of operations between verifications
+    :type batch: :class:`int`
+    :param seed: the seed for the random generator
+    :param depth: the maximum depth of the tree
+    :type depth: :class:`int`
+    :param breadth: the maximum number of rows created at once
+    :type breadth: :class:`int`
+    :param weights: the relative weights of :data:`OPERATIONS`. Default is :data:`WEIGHTS`.
+    :type weights: :class:`list` of :class:`int` | None
+    :param view: the view to test. Default is a new :class:`qmenuview.MenuView`.
+                 Configure limits etc. before the run.
+    :type view: :class:`qmenuview.MenuView` | None
+    :returns: the result
+    :rtype: :class:`StressResult`
+    :raises: None
+    """
+    from .view import MenuView
+    rng = random.Random(seed)
+    ownview = view is None
+    if ownview:
+        view = MenuView()
+    choices = []
+    for name, weight in zip(OPERATIONS, weights or WEIGHTS):
+        choices.extend([name] * weight)
+    result = StressResult()
+    model = random_model(rng, depth, breadth)
+    view.model = model
+    while result.operations < operations:
+        count = min(batch, operations - result.operations)
+        names = [rng.choice(choices) for i in range(count)]
+        start = time.time()
+        for name in names:
+            _apply(rng, model, name, depth, breadth)
+        result.seconds += time.time() - start
+        result.operations += count
+        for name in names:
+            result.counts[name] += 1
+        result.batches += 1
+        result.problems = verify(view, model)
+        if result.problems:
+            break
+        _process_posted_events()
+    view.model = None
+    if ownview:
+        view.deleteLater()
+        _process_posted_events()
+    return result
+
+
+def _process_posted_events():
+    """Deliver the posted events and delete the removed actions
+
+    Without an event loop the posted events would pile up.
+
+    :returns: None
+    :rtype: None
+    :raises: None
+    """
+    QtCore.QCoreApplication.sendPostedEvents()
+    QtCore.QCoreApplication.sendPostedEvents(None, QtCore.QEvent.DeferredDelete)
+
+
+def main(argv=None):
+    """Run the stress test headless and print the result as JSON
+
+    :param argv: the command line arguments
+    :type argv: :class:`list` | None
+    :returns: the exit code. 1 if the verification failed.
+    :rtype: :class:`int`
+    :raises: None
+    """
+    parser = argparse.ArgumentParser(description=main.__doc__.splitlines()[0])
+    parser.add_argument('--operations', type=int, default=100000, help='the number of operations')
+    parser.add_argument('--batch', type=int, default=1000, help='the operations between verifications')
+    parser.add_argument('--seed', type=int, default=None, help='the random seed')
+    parser.add_argument('--depth', type=int, default=4, help='the maximum depth of the tree')
+    parser.add_argument('--breadth', type=int, default=8, help='the maximum number of new rows')
+    args = parser.parse_args(argv)
+    app = QtGui.QApplication.instance() or QtGui.QApplication(sys.argv[:1])
+    result = run(args.operations, args.batch, args.seed, args.depth, args.breadth)
+    json.dump(result.summary(), sys.stdout, indent=2, sort_keys=True)
+    sys.stdout.write('\n')
+    app.processEvents()
+    return 1 if result.problems else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,11 +1,74 @@
+import bisect
+import collections
 import functools
+import numbers
+import time
 
-from PySide import QtCore, QtGui
+from .qt import QtCore, QtGui
+
+from .columns import DataColumns
+from .icons import PendingIcon, shared_loader
+from .menu import BatchMenu, suspended_layout
+from .plan import PlanBuilder, plan_from_snapshot, plan_from_source, snapshot_model
+from .setdataargs import SetDataArgs
+from .snapshot import MENU, CHECKABLE, CHECKED, ENABLED, Snapshot, write_snapshot
+from .source import NestedSource
 
 __all__ = ['MenuView', 'SetDataArgs']
 
+_RECENT_MENUS = 8
+"""The number of recently shown menus, whose submenus are prebuilt first"""
+_HOVER_CACHE = 1024
+"""The number of cached indizes of hovered actions, before invalid ones are dropped"""
+_CLEAR_VALUES = {'setText': lambda: '', 'setIconText': lambda: '', 'setToolTip': lambda: '',
+                 'setWhatsThis': lambda: '', 'setStatusTip': lambda: '',
+                 'setIcon': lambda: QtGui.QIcon(), 'setChecked': lambda: False}
+"""Factories for the values of new actions by setter.
+They replace old values, when data is reapplied and the new column has no data."""
+
+
+def _orderable(value):
+    """Return a sort key for the value, that puts None first
+
+    Values of different types are not comparable on Python 3.
+    So numbers come next and the other values are grouped by the name of their type.
+
+    :param value: the value or None
+    :returns: the key
+    :rtype: :class:`tuple`
+    :raises: None
+    """
+    if value is None:
+        return (0,)
+    if isinstance(value, numbers.Real):
+        return (1, '', value)
+    return (1, type(value).__name__, value)
+
+
+class _SortedMenu(object):
+    """The order of the actions of a sorted menu"""
 
-class MenuView(QtGui.QMenu):
+    __slots__ = ('level', 'rows', 'display', 'keys', 'separators')
+
+    def __init__(self, level):
+        """Initialize the order of an empty menu
+
+        :param level: the level of the menu. 0 for the top menu.
+        :type level: :class:`int`
+        :raises: None
+        """
+        self.level = level
+        self.rows = []
+        """The actions in the order of the model rows"""
+        self.display = []
+        """The actions in the order of the menu"""
+        self.keys = []
+        """The group and sort key of each action in :data:`_SortedMenu.display`"""
+        self.separators = []
+        """The separators between the groups"""
+
+
+class MenuView(BatchMenu, DataColumns):
     """A view that creates submenus based on a model.
 
     The model can be a list, table or treemodel.
@@ -37,12 +100,74 @@ class MenuView(QtGui.QMenu):
     :data:`MenuView.icon_column`, :data:`MenuView.icontext_column`,
     :data:`MenuView.tooltip_column`, :data:`MenuView.checked_column`,
     :data:`MenuView.whatsthis_column`, :data:`MenuView.statustip_column`.
+    Changing a column reapplies only the affected :data:`MenuView.setdataargs`
+    to the built actions. See :meth:`MenuView.reapply_data`.
+
+    The actions of a menu can be sorted by the data of :data:`MenuView.sort_role`
+    and grouped by :data:`MenuView.group_role` without a proxy model.
+    The keys are computed once per row and new rows are inserted with a binary search.
+    Groups are divided by separators. Changed rows are moved, not rebuilt.
+
+    If :data:`MenuView.defer_data` is True, the data of actions in closed submenus
+    is only applied, when the submenu is about to show.
+    The structure of the menus is still created eagerly.
+
+    To cap the memory of big trees, set :data:`MenuView.max_loaded_menus` or
+    :data:`MenuView.max_loaded_actions`. If the limit is exceeded,
+    the least recently shown submenus are unloaded to empty placeholders.
+    They get rebuilt from the model, when they are opened again.
+    See :data:`MenuView.lru_stats`.
+
+    The size of the built tree can be bounded with :data:`MenuView.max_depth`,
+    :data:`MenuView.max_children_per_menu` and :data:`MenuView.max_total_actions`.
+    Menus below the maximum depth become placeholders, that are built when they are opened.
+    Rows that exceed the other limits are replaced by an overflow action,
+    which builds the next rows, when it is triggered.
+    If a limit is hit, :data:`MenuView.limit_reached` is emitted.
 
     For more control on how the data gets applied to the action, change
     :data:`MenuView.setdataargs`. It is a list of :class:`SetDataArgs` containers.
     One container defines the functionname to use for setting the attribute,
     the column to use, the :data:`PySide.QtCore.Qt.ItemDataRole`, and a data conversion function.
 
+    The :data:`PySide.QtCore.Qt.DecorationRole` may also return file paths or encoded images.
+    They are decoded on a thread pool, while the action shows a placeholder.
+    See :data:`MenuView.icon_loader`.
+
+    Instead of a model, a native tree source can be used. See :data:`MenuView.source`.
+    The source is built without any :class:`PySide.QtCore.QModelIndex`.
+    Changes of the source are applied with :meth:`MenuView.insert_nodes`,
+    :meth:`MenuView.remove_nodes` and :meth:`MenuView.update_nodes`.
+    For a source the view emits :data:`MenuView.node_triggered`,
+    :data:`MenuView.node_hovered` and :data:`MenuView.node_toggled`.
+
+    To show a large, mostly static menu at startup before the model is ready, save the
+    built tree with :meth:`MenuView.save_snapshot`. On the next start, restore it with
+    :meth:`MenuView.restore_snapshot` and hand over the model with :meth:`MenuView.reconcile`,
+    once it is loaded.
+
+    Big trees can be prepared on a worker thread with :meth:`MenuView.build_in_thread`.
+    The GUI thread then only creates the actions.
+
+    Radio style groups are declared with :data:`MenuView.checkgroup_role`.
+    Checkable siblings with the same group value share an exclusive
+    :class:`PySide.QtGui.QActionGroup`. If the model checks a row, only the new
+    and the previously checked action change. If the user checks an action,
+    the changed check states of the group are written back to the model in one batch.
+
+    To emit :data:`MenuView.action_hovered` only for the action, where the mouse settles,
+    set :data:`MenuView.hover_delay`. The indizes of hovered actions are cached,
+    so hovering an action again does not walk up the menus.
+
+    If :data:`MenuView.prebuild` is True, placeholders and menus with deferred data
+    are built, while the event loop is idle: the submenus next to the hovered action first,
+    then the submenus of recently shown menus, then all others breadth first.
+    See :data:`MenuView.prebuild_stats`.
+
+    The view and its default submenus are :class:`qmenuview.menu.BatchMenu` instances.
+    Their geometry is recalculated once per insert, removal or update of rows,
+    not once per action.
+
     If you want custom menu and action classes,
     override :meth:`MenuView.create_menu`, :meth:`MenuView.create_action`.
     """
@@ -53,6 +178,19 @@ class MenuView(QtGui.QMenu):
     """Signal for when an action gets triggered"""
     action_toggled = QtCore.Signal(QtCore.QModelIndex, bool)
     """Signal for when an action gets toggled"""
+    node_hovered = QtCore.Signal(object)
+    """Signal for when an action of a source node gets hovered"""
+    node_triggered = QtCore.Signal(object, bool)
+    """Signal for when an action of a source node gets triggered"""
+    node_toggled = QtCore.Signal(object, bool)
+    """Signal for when an action of a source node gets toggled"""
+    limit_reached = QtCore.Signal(str)
+    """Signal for when a build limit was hit. Emits the name of the limit:
+    ``'max_depth'``, ``'max_children_per_menu'`` or ``'max_total_actions'``"""
+    reconciled = QtCore.Signal()
+    """Signal for when the menus restored from a snapshot were reconciled with the model"""
+    plan_committed = QtCore.Signal()
+    """Signal for when the actions of a plan from :meth:`MenuView.build_in_thread` were created"""
 
     def __init__(self, title='', parent=None):
         """Initialize a new menu view with the given title
@@ -64,33 +202,207 @@ class MenuView(QtGui.QMenu):
         :raises: None
         """
         super(MenuView, self).__init__(title, parent)
-        self.text_column = 0
-        """The column for the action text. Default 0"""
-        self.icon_column = 0
-        """The column for the action icon. Default 0"""
-        self.icontext_column = -1
-        """The column for the action icon text. Default -1"""
-        self.tooltip_column = 0
-        """The column for the tooltip data. Default 0"""
-        self.checked_column = 0
-        """The column for the checked data. Has to be checkable. Default 0"""
-        self.whatsthis_column = 0
-        """The column for the whatsThis text. Default 0"""
-        self.statustip_column = 0
-        """The column for the statustip text. Default 0"""
+        self._init_data_columns()
+        self.defer_data = False
+        """If True, only mark actions in closed submenus as dirty and
+        apply their data when the submenu is about to show. Default False"""
         self._model = None
+        self._source = None
+        self._action_nodes = {}
+        """Map of actions to the source nodes"""
+        self._node_actions = {}
+        """Map of the ids of source nodes to the actions"""
+        self._dirty = {}
+        """Map of closed menus to the set of their actions with pending data"""
+        self._watched_menus = set()
+        """Menus, which have their aboutToShow signal connected"""
+        self.max_loaded_menus = None
+        """The maximum number of loaded submenus or None for no limit. Default None"""
+        self.max_loaded_actions = None
+        """The maximum number of actions in loaded menus or None for no limit. Default None"""
+        self._loaded = collections.OrderedDict()
+        """Loaded submenus, ordered from least to most recently shown"""
+        self._untracked = None
+        """New submenus of a hierarchy, that is being built. They are tracked in level order afterwards."""
+        self._unloaded = set()
+        """Placeholder menus, which are built when they are about to show"""
+        self._lru_counts = {'evictions': 0, 'evicted_actions': 0, 'loads': 0}
+        self.max_depth = None
+        """The maximum number of built menu levels or None for no limit.
+        Deeper menus are built when they are opened. Default None"""
+        self.max_children_per_menu = None
+        """The maximum number of actions built per menu or None for no limit. Default None"""
+        self.max_total_actions = None
+        """The maximum number of actions, that are built automatically,
+        or None for no limit. Set it before setting the model. Default None"""
+        self._overflow = {}
+        """Map of truncated menus to their overflow action"""
+        self._action_count = 0
+        self._reconcile_queue = None
+        """Queue of menus and persistent indizes, that still have to be reconciled"""
+        self._reconcile_requeued = {}
+        """Map of menus, that a change of the model queued, to their pending parent index"""
+        self._reconcile_timer = None
+        self._planning = None
+        """The running plan builder, the model, the source and whether the model changed"""
+        self.icon_loader = None
+        """The :class:`qmenuview.icons.IconLoader` for icons from file paths and byte buffers.
+        None uses the loader, that is shared by all views. Default None"""
+        self.checkgroup_role = None
+        """The data role of the :data:`MenuView.checked_column`, which returns the group
+        of a row, or None for no groups. Checkable rows of one menu with the same
+        group are exclusive. Rows with None are not grouped. Only applies to actions,
+        that are built from the model directly, not to sources and plans. Default None"""
+        self._groups = {}
+        """Map of menus to a map of group values to their action group"""
+        self.prebuild = False
+        """If True, build placeholders and apply deferred data in idle time,
+        so submenus are ready, when they are opened. Set it before setting the model.
+        Default False"""
+        self.prebuild_budget = 5
+        """The time of one idle prebuild step in milliseconds. Default 5"""
+        self.prebuild_delay = 100
+        """The time in milliseconds without user input,
+        after which prebuilding starts or continues. Default 100"""
+        self._prebuild_timer = None
+        self._prebuild_filter = None
+        """The application event filter, that pauses prebuilding on user input"""
+        self._prebuild_queue = None
+        """Iterator over the menus to prebuild in the order of their priority"""
+        self._prebuild_hovered = None
+        """The last hovered action"""
+        self._prebuilt = set()
+        """Menus, that were prebuilt and not opened yet"""
+        self._recent = collections.OrderedDict()
+        """The recently shown menus, ordered from least to most recently shown"""
+        self._prebuild_counts = {'prebuilt': 0, 'steps': 0, 'hits': 0, 'misses': 0}
+        self.hover_delay = None
+        """If not None, :data:`MenuView.action_hovered` and :data:`MenuView.node_hovered`
+        are only emitted for an action, that stays hovered for this many milliseconds.
+        Sweeping the mouse over a menu then emits once. Default None"""
+        self._hover_timer = None
+        self._hovered_action = None
+        """The hovered action, that waits for the hover delay"""
+        self._hover_indexes = {}
+        """Map of hovered actions to their :class:`PySide.QtCore.QPersistentModelIndex`"""
+        self.sort_role = None
+        """The data role of the :data:`MenuView.text_column` to sort the actions of a menu by,
+        or None to keep the order of the model. A dictionary maps the level of a menu,
+        0 for the top menu, to its role. Levels without a role are not sorted.
+        Rows with equal keys keep the order, in which they were built.
+        Only applies to models. Set it before setting the model. Default None"""
+        self.sort_key = None
+        """A function, that converts the sort data of a row to its key,
+        e.g. :meth:`str.lower`, or None. Default None"""
+        self.group_role = None
+        """The data role of the :data:`MenuView.text_column` to group the actions of a menu by,
+        or None for no groups. A dictionary maps levels to roles like for :data:`MenuView.sort_role`.
+        The groups are sorted by this data and divided by separators.
+        Only applies to models. Set it before setting the model. Default None"""
+        self._sorted = {}
+        """Map of sorted menus to their :class:`_SortedMenu`"""
+        self._pending_separators = set()
+        """Sorted menus, whose separators have to be updated"""
+
+    def _data_args_changed(self, setdataargs, cleared=()):
+        """Reapply the changed data arguments to the built actions
+
+        :param setdataargs: the affected data arguments
+        :type setdataargs: :class:`list` of :class:`SetDataArgs`
+        :param cleared: the setters, that no container uses anymore
+        :type cleared: :class:`list` of :class:`str`
+        :returns: None
+        :rtype: None
+        :raises: None
+        """
+        self.reapply_data(setdataargs, cleared)
+
+    def reapply_data(self, setdataargs=None, cleared=()):
+        """Apply the given data arguments to all built actions in one pass
+
+        Only the given containers are applied, the rest of the data stays.
+        Placeholders have no actions and get all data, when they are built.
+        If the new column has no data, the value of a new action is set,
+        e.g. an empty text. Pending data of :data:`MenuView.defer_data` stays pending.
+        The actions of sorted menus are moved, if their keys changed, e.g. because
+        :data:`MenuView.text_column` changed.
+
+        Without data arguments, :data:`MenuView.setdataargs` is compared with its last state first.
+        So setters of containers, that were removed in place, are cleared as well.
+
+        :param setdataargs: the data arguments to apply. Default is all :data:`MenuView.setdataargs`.
+        :type setdataargs: :class:`list` of :class:`SetDataArgs` | None
+        :param cleared: setters, whose values are reset to the ones of a new action, e.g. ``'setToolTip'``.
+                        Setters of custom attributes have no such value and are left alone.
+        :type cleared: :class:`list` of :class:`str`
+        :returns: None
+        :rtype: None
+        :raises: None
+        """
+        if setdataargs is None:
+            setdataargs = self.setdataargs
+            cleared = list(cleared) + self._diff_data_args()[1]
+        clears = [(setfunc, _CLEAR_VALUES[setfunc]) for setfunc in cleared if setfunc in _CLEAR_VALUES]
+        if not setdataargs and not clears:
+            return
+        source = self._source
+        if source is not None and getattr(source, 'action_data', None) is not None:
+            # the source converts the data itself
+            return
+        if source is None and not self._model:
+            return
+        checked = source is None and any(args.column == 'checked_column' for args in setdataargs)
+        columns = [args.column if isinstance(args.column, int) else getattr(self, args.column)
+                   for args in setdataargs]
+        queue = collections.deque([(self, QtCore.QModelIndex())])
+        while queue:
+            menu, parentindex = queue.popleft()
+            if menu in self._unloaded:
+                continue
+            order = self._sorted.get(menu) if source is None else None
+            with suspended_layout(menu):
+                for row, action in enumerate(self._row_actions(menu)):
+                    index = self._model.index(row, 0, parentindex) if source is None else None
+                    if checked:
+                        self._set_action_checkable(action, index)
+                        self._set_action_group(action, index)
+                    for setfunc, clear in clears:
+                        getattr(action, setfunc)(clear())
+                    node = self._action_nodes.get(action)
+                    for args, column in zip(setdataargs, columns):
+                        if source is None:
+                            data = self.get_data(index, args.role, column)
+                        elif node is not None and column >= 0:
+                            data = source.data(node, args.role)
+                        else:
+                            data = None
+                        self._reapply_value(action, args, data)
+                    if order is not None:
+                        self._resort(menu, order, action, index)
+                    if action.menu() is not None:
+                        queue.append((action.menu(), index))
+        self._update_separators()
+
+    def _reapply_value(self, action, setdataarg, data):
+        """Convert and apply the data or reset the attribute, if there is no data
 
-        Qt = QtCore.Qt
-        args = [SetDataArgs('setText', 'text_column', Qt.DisplayRole, str),
-                SetDataArgs('setIcon', 'icon_column', Qt.DecorationRole, self._process_icondata),
-                SetDataArgs('setIconText', 'icontext_column', Qt.DisplayRole, str),
-                SetDataArgs('setToolTip', 'tooltip_column', Qt.ToolTipRole, str),
-                SetDataArgs('setChecked', 'checked_column', Qt.CheckStateRole, self._checkconvertfunc),
-                SetDataArgs('setWhatsThis', 'whatsthis_column', Qt.WhatsThisRole, str),
-                SetDataArgs('setStatusTip', 'statustip_column', Qt.StatusTipRole, str)]
-        self.setdataargs = args
-        """A list of :class:`SetDataArgs` containers. Defines how the
-        data from the model is applied to the action"""
+        :param action: the action to update
+        :type action: :class:`PySide.QtGui.QAction`
+        :param setdataarg: the data argument
+        :type setdataarg: :class:`SetDataArgs`
+        :param data: the raw data or None
+        :returns: None
+        :rtype: None
+        :raises: None
+        """
+        if data is None:
+            clear = _CLEAR_VALUES.get(setdataarg.setfunc)
+            if clear is not None:
+                getattr(action, setdataarg.setfunc)(clear())
+            return
+        if setdataarg.convertfunc:
+            data = setdataarg.convertfunc(data)
+        self._apply_value(action, setdataarg.setfunc, data)
 
     @property
     def model(self, ):
@@ -112,6 +424,21 @@ class MenuView(QtGui.QMenu):
         :rtype: None
         :raises: None
         """
+        self._cancel_plan()
+        self._stop_reconcile()
+        self._set_source(None)
+        self._connect_model(model)
+        self.reset()
+
+    def _connect_model(self, model):
+        """Disconnect the current model and connect the given one
+
+        :param model: the model to connect
+        :type model: :class:`PySide.QtCore.QAbstractItemModel` | None
+        :returns: None
+        :rtype: None
+        :raises: None
+        """
         signalmap = {"modelReset": self.reset,
                      "rowsInserted": self.insert_menus,
                      "rowsAboutToBeRemoved": self.remove_menus,
@@ -120,20 +447,109 @@ class MenuView(QtGui.QMenu):
             for signal, callback in signalmap.items():
                 getattr(self._model, signal).disconnect(callback)
         self._model = model
+        self._hover_indexes.clear()
         if model:
             for signal, callback in signalmap.items():
                 getattr(model, signal).connect(callback)
+
+    @property
+    def source(self, ):
+        """Get the native tree source
+
+        :returns: the current source
+        :rtype: :class:`qmenuview.source.TreeSource`
+        :raises: None
+        """
+        return self._source
+
+    @source.setter
+    def source(self, source):
+        """Set a native tree source instead of a model
+
+        The source can be a nested list or dict (see :class:`qmenuview.source.NestedSource`)
+        or any object with a ``children(node)`` and ``data(node, role)`` method.
+        Setting a source removes the model.
+
+        If the source has a ``subscribe(view)`` and ``unsubscribe(view)`` method,
+        the view subscribes to it, so the source can call
+        :meth:`MenuView.insert_nodes`, :meth:`MenuView.remove_nodes`,
+        :meth:`MenuView.update_nodes` and :meth:`MenuView.reset` on changes.
+        If the source has an ``action_data(node)`` method, it has to return
+        pairs of action setter names and converted values. They are applied
+        instead of converting the data with :data:`MenuView.setdataargs`.
+
+        :param source: the source to set
+        :type source: :class:`qmenuview.source.TreeSource` | :class:`list` | :class:`dict` | None
+        :returns: None
+        :rtype: None
+        :raises: None
+        """
+        if isinstance(source, (list, tuple, dict)):
+            source = NestedSource(source)
+        self._cancel_plan()
+        self._stop_reconcile()
+        self._connect_model(None)
+        self._set_source(source)
         self.reset()
 
+    def _set_source(self, source):
+        """Unsubscribe from the current source and subscribe to the given one
+
+        :param source: the new source
+        :type source: :class:`qmenuview.source.TreeSource` | None
+        :returns: None
+        :rtype: None
+        :raises: None
+        """
+        if hasattr(self._source, 'unsubscribe'):
+            self._source.unsubscribe(self)
+        self._source = source
+        if hasattr(source, 'subscribe'):
+            source.subscribe(self)
+
     def reset(self, ):
         """Delete and recreate all menus
 
+        :returns: None
+        :rtype: None
+        :raises: None
+        """
+        with suspended_layout(self):
+            self._clear_all()
+            if self._source is not None:
+                self.create_all_nodes()
+            else:
+                self.create_all_menus()
+            self._update_separators()
+        self._schedule_prebuild()
+
+    def _clear_all(self, ):
+        """Delete all actions and forget about them
+
         :returns: None
         :rtype: None
         :raises: None
         """
         self.clear()
-        self.create_all_menus()
+        self._dirty.clear()
+        self._watched_menus.clear()
+        self._loaded.clear()
+        self._unloaded.clear()
+        self._action_nodes.clear()
+        self._node_actions.clear()
+        self._overflow.clear()
+        for group in self._groups.pop(self, {}).values():
+            group.deleteLater()
+        self._groups.clear()
+        self._action_count = 0
+        self._prebuilt.clear()
+        self._recent.clear()
+        self._prebuild_queue = None
+        self._prebuild_hovered = None
+        self._hover_indexes.clear()
+        self._hovered_action = None
+        self._sorted.clear()
+        self._pending_separators.clear()
 
     def create_all_menus(self, ):
         """Create all menus according to the model
@@ -145,271 +561,2026 @@ class MenuView(QtGui.QMenu):
         m = self._model
         if not m:
             return
-        indizes = self._flatten_hierarchy(m)
-        for i in indizes:
-            self.create_menu_for_index(i)
+        self._create_hierarchy(QtCore.QModelIndex())
 
-    @staticmethod
-    def _flatten_hierarchy(model, parent=None):
-        """Return a level-order list of indizes
+    def _create_hierarchy(self, parent):
+        """Create the actions for all indizes below parent within the limits
 
-        :param model: the model to traverse
-        :type model: :class:`PySide.QtCore.QAbstractItemModel`
-        :param parent: the parent index. Default is the root.
+        Menus deeper than :data:`MenuView.max_depth` become placeholders.
+        Rows after :data:`MenuView.max_children_per_menu` and rows, that exceed
+        :data:`MenuView.max_total_actions`, are replaced by an overflow action.
+        For every limit that was hit, :data:`MenuView.limit_reached` is emitted once.
+
+        :param parent: the parent index. Its action has to exist already.
         :type parent: :class:`PySide.QtCore.QModelIndex`
-        :returns: a level-order list of indizes
-        :rtype: :class:`list` of :class:`PySide.QtCore.QModelIndex`
+        :returns: None
+        :rtype: None
         :raises: None
         """
-        indizes = []
-        if parent is None:
-            parent = QtCore.QModelIndex()
-        parents = [parent]
-        children = []
-        # for all parents, get the children
-        # during the next iteration, the children become the parents
-        # and are queried for children as well. Once no new children are found
-        # the loop ends
-        while parents:
-            for parent in parents:
-                for i in range(model.rowCount(parent)):
-                    index = model.index(i, 0, parent)
-                    indizes.append(index)
-                    children.append(index)
-            parents = children
-            children = []
-        return indizes
-
-    def create_menu_for_index(self, index):
         m = self._model
-        parentaction = self.get_action(index.parent())
-        # Action has no menu yet. In order to create a sub action,
-        # we have to convert it.
-        if parentaction.menu() is None:
-            self._convert_action_to_menu(parentaction)
-        parent = parentaction.menu()
-        beforeindex = index.sibling(index.row(), 0)
-        before = self.get_action(beforeindex)
-        if m.hasChildren(index):
+        hit = []
+        maxchildren = self.max_children_per_menu
+        remaining = None
+        if self.max_total_actions is not None:
+            remaining = self.max_total_actions - self._action_count
+        basedepth = len(self._get_parent_indizes(parent)) + 1 if parent.isValid() else 0
+        # the last created action, so descend can decide about its children
+        created = [None]
+
+        def descend(index, depth):
+            action = created[0]
+            if action is None or action.menu() is None:
+                return False
+            if self.max_depth is not None and basedepth + depth >= self.max_depth:
+                self._add_placeholder(action.menu())
+                if 'max_depth' not in hit:
+                    hit.append('max_depth')
+                return False
+            return True
+
+        last = None
+        indizes = self.iter_hierarchy(m, parent, max_nodes=remaining,
+                                      max_children=maxchildren, descend=descend)
+        # the walk is depth-first, but the menus have to be tracked in level order,
+        # so the deepest menus are the most recently shown ones
+        self._untracked = []
+        try:
+            for index in indizes:
+                action = self.create_menu_for_index(index, append=True)
+                created[0] = action
+                last = index
+                if action is not None and maxchildren is not None and index.row() == maxchildren - 1\
+                        and m.rowCount(index.parent()) > maxchildren:
+                    self._add_overflow(self._get_parent_menu(action))
+                    if 'max_children_per_menu' not in hit:
+                        hit.append('max_children_per_menu')
+        finally:
+            untracked, self._untracked = self._untracked, None
+            untracked.sort(key=self._menu_depth)
+            for menu in untracked:
+                if menu not in self._unloaded:
+                    self._track_menu(menu)
+        if remaining is not None and self._truncate_after(last, parent):
+            hit.append('max_total_actions')
+        for limit in hit:
+            self.limit_reached.emit(limit)
+
+    def _truncate_after(self, last, parent):
+        """Mark the menus, that were cut off, because the action budget ran out after last
+
+        :param last: the last index that was built or None, if nothing was built
+        :type last: :class:`PySide.QtCore.QModelIndex` | None
+        :param parent: the parent index of the build
+        :type parent: :class:`PySide.QtCore.QModelIndex`
+        :returns: True, if any menu was truncated
+        :rtype: :class:`bool`
+        :raises: None
+        """
+        m = self._model
+        if last is None:
+            if not m.hasChildren(parent):
+                return False
+            action = self.get_action(parent)
+            if action is None or action.menu() is None:
+                return False
+            if action.menu() is self:
+                self._add_overflow(self)
+            elif not action.menu().actions():
+                self._add_placeholder(action.menu())
+            return True
+        truncated = False
+        action = self.get_action(last)
+        if action is not None and action.menu() is not None and not action.menu().actions():
+            self._add_placeholder(action.menu())
+            truncated = True
+        # every level above last with rows left gets an overflow action
+        index = last
+        while index != parent:
+            p = index.parent()
+            rows = m.rowCount(p)
+            if self.max_children_per_menu is not None:
+                rows = min(rows, self.max_children_per_menu)
+            if index.row() + 1 < rows:
+                self._add_overflow(self.get_action(p).menu())
+                truncated = True
+            index = p
+        return truncated
+
+    def create_overflow_action(self, parent):
+        """Create and return the action, that replaces the rows of a truncated menu
+
+        The parent of the action has to be set to ``parent``.
+        When the action is triggered, the next rows are built.
+
+        :param parent: The parent menu
+        :type parent: :class:`PySide.QtGui.QMenu`
+        :returns: The created action
+        :rtype: :class:`PySide.QtGui.QAction`
+        :raises: None
+        """
+        return QtGui.QAction('...', parent)
+
+    def _add_overflow(self, menu):
+        """Append an overflow action to the menu, if it has none yet
+
+        :param menu: the truncated menu
+        :type menu: :class:`PySide.QtGui.QMenu`
+        :returns: None
+        :rtype: None
+        :raises: None
+        """
+        if menu in self._overflow:
+            return
+        action = self.create_overflow_action(menu)
+        menu.addAction(action)
+        action.triggered.connect(functools.partial(self._expand_overflow, menu))
+        self._overflow[menu] = action
+
+    def _expand_overflow(self, menu, *args):
+        """Replace the overflow action of the menu by the next rows
+
+        :param menu: the truncated menu
+        :type menu: :class:`PySide.QtGui.QMenu`
+        :returns: None
+        :rtype: None
+        :raises: None
+        """
+        overflow = self._overflow.pop(menu, None)
+        if overflow is None:
+            return
+        menu.removeAction(overflow)
+        overflow.deleteLater()
+        if self._model:
+            self._populate_menu(menu, self.get_index(menu.menuAction()), len(self._row_actions(menu)))
+
+    def create_all_nodes(self, ):
+        """Create all menus according to the source
+
+        :returns: None
+        :rtype: None
+        :raises: None
+        """
+        src = self._source
+        root = getattr(src, 'root', None)
+        self._node_actions[id(root)] = self.menuAction()
+        stack = [(self, root)]
+        while stack:
+            menu, node = stack.pop()
+            for child in src.children(node):
+                action = self._create_action_for_node(menu, child, None)
+                if action.menu() is not None:
+                    stack.append((action.menu(), child))
+
+    def _create_action_for_node(self, parent, node, before):
+        """Create and return the action for the given source node
+
+        :param parent: the parent menu
+        :type parent: :class:`PySide.QtGui.QMenu`
+        :param node: the source node
+        :param before: the action to insert before or None to append
+        :type before: :class:`PySide.QtGui.QAction` | None
+        :returns: the created action
+        :rtype: :class:`PySide.QtGui.QAction`
+        :raises: None
+        """
+        if self._source.children(node):
             action = self.create_menu(parent)
         else:
             action = self.create_action(parent)
         parent.insertAction(before, action)
-        self.set_action_data(action, index)
-        signalmap = {action.triggered: self._action_triggered,
-                     action.hovered: self._action_hovered,
-                     action.toggled: self._action_toggled}
-        for signal, callback in signalmap.items():
-            signal.connect(functools.partial(callback, action))
+        self._action_nodes[action] = node
+        self._node_actions[id(node)] = action
+        self.set_node_data(action, node)
+        self._connect_action(action)
+        return action
 
-    def _convert_action_to_menu(self, action):
-        parent = action.parentWidget()
-        menuaction = self.create_menu(parent)
-        action.setMenu(menuaction.menu())
+    def get_node(self, action):
+        """Return the source node of the given action
 
-    def create_menu(self, parent):
-        """Create a menu and return the menus action.
+        :param action: the action to query
+        :type action: :class:`PySide.QtGui.QAction`
+        :returns: the source node or None
+        :raises: None
+        """
+        return self._action_nodes.get(action)
 
-        The parent of the menu has to be set to ``parent``
+    def get_node_action(self, node):
+        """Return the action of the given source node
 
-        :param parent: The parent menu
-        :type parent: :class:`PySide.QtGui.QMenu`
-        :returns: The menu action
-        :rtype: :class:`PySide.QtGui.QAction`
+        :param node: the source node. The root node gives the action of the view.
+        :returns: the action of the node or None
+        :rtype: :class:`PySide.QtGui.QAction` | None
+        :raises: None
+        """
+        return self._node_actions.get(id(node))
+
+    def insert_nodes(self, parent, first, last):
+        """Create actions for the nodes first til last, that were inserted under parent
+
+        Call this after the nodes were inserted to the source.
+
+        :param parent: the parent node
+        :param first: the first row
+        :type first: :class:`int`
+        :param last: the last row
+        :type last: :class:`int`
+        :returns: None
+        :rtype: None
+        :raises: None
+        """
+        parentaction = self.get_node_action(parent)
+        if parentaction is None:
+            return
+        if parentaction.menu() is None:
+            self._convert_action_to_menu(parentaction)
+        menu = parentaction.menu()
+        actions = menu.actions()
+        before = actions[first] if first < len(actions) else None
+        src = self._source
+        children = src.children(parent)
+        with suspended_layout(menu):
+            for row in range(first, last + 1):
+                node = children[row]
+                action = self._create_action_for_node(menu, node, before)
+                stack = [(action, node)] if action.menu() is not None else []
+                while stack:
+                    a, n = stack.pop()
+                    for child in src.children(n):
+                        ca = self._create_action_for_node(a.menu(), child, None)
+                        if ca.menu() is not None:
+                            stack.append((ca, child))
+
+    def remove_nodes(self, parent, first, last):
+        """Remove the actions of the nodes first til last under parent
+
+        :param parent: the parent node
+        :param first: the first row
+        :type first: :class:`int`
+        :param last: the last row
+        :type last: :class:`int`
+        :returns: None
+        :rtype: None
+        :raises: None
+        """
+        parentaction = self.get_node_action(parent)
+        if parentaction is None or parentaction.menu() is None:
+            return
+        menu = parentaction.menu()
+        actions = menu.actions()
+        with suspended_layout(menu):
+            for row in reversed(range(first, last + 1)):
+                action = actions[row]
+                self._discard_action(action)
+                self._discard_nodes(action)
+                menu.removeAction(action)
+                if action.menu() is not None:
+                    action.menu().deleteLater()
+                else:
+                    action.deleteLater()
+            if not menu.actions() and menu is not self:
+                self._remove_submenu(parentaction)
+
+    def _discard_nodes(self, action):
+        """Forget the source nodes of the action and all of its sub actions
+
+        :param action: the action that gets removed
+        :type action: :class:`PySide.QtGui.QAction`
+        :returns: None
+        :rtype: None
+        :raises: None
+        """
+        actions = [action]
+        while actions:
+            a = actions.pop()
+            node = self._action_nodes.pop(a, None)
+            if self._node_actions.get(id(node)) is a:
+                del self._node_actions[id(node)]
+            if a.menu() is not None:
+                actions.extend(a.menu().actions())
+
+    def update_nodes(self, parent, first, last):
+        """Apply the data of the nodes first til last under parent
+
+        :param parent: the parent node
+        :param first: the first row
+        :type first: :class:`int`
+        :param last: the last row
+        :type last: :class:`int`
+        :returns: None
+        :rtype: None
+        :raises: None
+        """
+        parentaction = self.get_node_action(parent)
+        if parentaction is None or parentaction.menu() is None:
+            return
+        menu = parentaction.menu()
+        actions = menu.actions()
+        children = self._source.children(parent)
+        with suspended_layout(menu):
+            for row in range(first, last + 1):
+                action = actions[row]
+                node = children[row]
+                if self._action_nodes.get(action) is not node:
+                    # the node object was replaced
+                    self._action_nodes[action] = node
+                    self._node_actions[id(node)] = action
+                self.set_node_data(action, node)
+
+    def set_node_data(self, action, node):
+        """Set the data of the action for the given source node
+
+        The roles are defined in :data:`MenuView.setdataargs`.
+        Entries with a negative column are skipped. Otherwise the column does not matter.
+
+        :param action: The action to update
+        :type action: :class:`PySide.QtGui.QAction`
+        :param node: The source node with the data
+        :returns: None
+        :rtype: None
+        :raises: None
+        """
+        src = self._source
+        flags = src.flags(node) if hasattr(src, 'flags') else QtCore.Qt.ItemIsEnabled
+        action.setEnabled(bool(flags & QtCore.Qt.ItemIsEnabled))
+        action.setCheckable(bool(flags & QtCore.Qt.ItemIsUserCheckable))
+        if self.defer_data:
+            parentmenu = self._get_parent_menu(action)
+            if parentmenu is not None and parentmenu is not self and not parentmenu.isVisible():
+                self._mark_dirty(parentmenu, action)
+                return
+        self._apply_node_data(action, node)
+
+    def _apply_node_data(self, action, node):
+        """Apply the data of all :data:`MenuView.setdataargs` of the node to the action
+
+        :param action: The action to update
+        :type action: :class:`PySide.QtGui.QAction`
+        :param node: The source node with the data
+        :returns: None
+        :rtype: None
+        :raises: None
+        """
+        actiondata = getattr(self._source, 'action_data', None)
+        if actiondata is not None:
+            for setfunc, value in actiondata(node):
+                self._apply_value(action, setfunc, value)
+            return
+        data = self._source.data
+        for args in self.setdataargs:
+            column = args.column
+            if not isinstance(column, int):
+                column = getattr(self, column)
+            if column < 0:
+                continue
+            value = data(node, args.role)
+            if value is None:
+                continue
+            if args.convertfunc:
+                value = args.convertfunc(value)
+            self._apply_value(action, args.setfunc, value)
+
+    def save_snapshot(self, path, iconkey=None):
+        """Save the built menus to a compact binary snapshot file
+
+        The structure, text, tooltips, statustips, whatsThis texts, icon keys
+        and the enabled, checkable and checked state are saved.
+        See :func:`qmenuview.snapshot.write_snapshot`.
+
+        :param path: the file path
+        :type path: :class:`str`
+        :param iconkey: a callable, that returns a string key for the icon of an action.
+                        Default is the theme name of the icon.
+        :type iconkey: callable | None
+        :returns: None
+        :rtype: None
+        :raises: :class:`IOError`
+        """
+        exclude = set(self._overflow.values())
+        for order in self._sorted.values():
+            exclude.update(order.separators)
+        write_snapshot(self, path, iconkey, exclude=exclude)
+
+    def restore_snapshot(self, path, iconprovider=None):
+        """Remove the model and build the menus from a snapshot file
+
+        The restored actions emit no signals, until a model is set with
+        :meth:`MenuView.reconcile`.
+
+        :param path: the file path of a snapshot, written by :meth:`MenuView.save_snapshot`
+        :type path: :class:`str`
+        :param iconprovider: a callable, that returns a :class:`PySide.QtGui.QIcon` for an icon key.
+                             Default is :meth:`PySide.QtGui.QIcon.fromTheme`.
+        :type iconprovider: callable | None
+        :returns: None
+        :rtype: None
+        :raises: :class:`ValueError` if the file is no valid snapshot.
+        """
+        if iconprovider is None:
+            iconprovider = QtGui.QIcon.fromTheme
+        icons = {}
+        self.model = None
+        with Snapshot(path) as snapshot:
+            # each entry is [menu, number of children that are still missing]
+            stack = [[self, snapshot.record(0)[1]]]
+            i = 1
+            while stack:
+                entry = stack[-1]
+                if not entry[1]:
+                    stack.pop()
+                    continue
+                entry[1] -= 1
+                flags, count, text, tooltip, statustip, whatsthis, iconkey = snapshot.record(i)
+                i += 1
+                menu = entry[0]
+                if flags & MENU:
+                    action = self.create_menu(menu)
+                    self._track_menu(action.menu())
+                else:
+                    action = self.create_action(menu)
+                menu.addAction(action)
+                self._action_count += 1
+                action.setText(text)
+                action.setToolTip(tooltip)
+                action.setStatusTip(statustip)
+                action.setWhatsThis(whatsthis)
+                if iconkey:
+                    if iconkey not in icons:
+                        icons[iconkey] = iconprovider(iconkey)
+                    action.setIcon(icons[iconkey])
+                action.setEnabled(bool(flags & ENABLED))
+                action.setCheckable(bool(flags & CHECKABLE))
+                action.setChecked(bool(flags & CHECKED))
+                self._connect_action(action)
+                if flags & MENU:
+                    stack.append([action.menu(), count])
+
+    def reconcile(self, model, budget=10):
+        """Set the model for menus restored from a snapshot without rebuilding them
+
+        The existing actions are compared with the model level by level in the event loop.
+        Actions are reused and updated, missing ones are created and surplus ones are removed.
+        Each step takes about ``budget`` milliseconds.
+        If the model changes during the reconciliation, only the menu of the changed rows
+        is queued again. A reset of the model starts over.
+        When it is done, the model is connected like any other model
+        and :data:`MenuView.reconciled` is emitted.
+
+        :param model: the model to reconcile with
+        :type model: :class:`PySide.QtCore.QAbstractItemModel`
+        :param budget: the time per step in milliseconds
+        :type budget: :class:`int`
+        :returns: None
+        :rtype: None
+        :raises: None
+        """
+        self._cancel_plan()
+        self._stop_reconcile()
+        self._set_source(None)
+        self._connect_model(None)
+        self._model = model
+        self._reconcile_budget = budget / 1000.0
+        self._reconcile_restart()
+        for signal, slot in self._reconcile_signals():
+            signal.connect(slot)
+        if self._reconcile_timer is None:
+            self._reconcile_timer = QtCore.QTimer(self)
+            self._reconcile_timer.setInterval(0)
+            self._reconcile_timer.timeout.connect(self._reconcile_step)
+        self._reconcile_timer.start()
+
+    def _reconcile_signals(self, ):
+        """Return the signals of the model, that requeue menus of the reconciliation, and their slots
+
+        :returns: a list of signals and slots
+        :rtype: :class:`list` of :class:`tuple`
+        :raises: None
+        """
+        m = self._model
+        return [(m.modelReset, self._reconcile_restart),
+                (m.rowsInserted, self._reconcile_rows),
+                (m.rowsAboutToBeRemoved, self._reconcile_rows),
+                (m.dataChanged, self._reconcile_data)]
+
+    def _reconcile_restart(self, *args):
+        """Start the reconciliation from the top menu
+
+        :returns: None
+        :rtype: None
+        :raises: None
+        """
+        self._reconcile_queue = collections.deque([(self, QtCore.QPersistentModelIndex())])
+        self._reconcile_requeued = {}
+
+    def _reconcile_rows(self, parent, first, last):
+        """Reconcile the menu of the parent again, after rows were inserted or before they are removed
+
+        :param parent: the parent index of the rows
+        :type parent: :class:`PySide.QtCore.QModelIndex`
+        :param first: the first row
+        :type first: :class:`int`
+        :param last: the last row
+        :type last: :class:`int`
+        :returns: None
+        :rtype: None
+        :raises: None
+        """
+        self._reconcile_requeue(parent)
+
+    def _reconcile_data(self, topLeft, bottomRight, *args):
+        """Reconcile the menu of the changed rows again
+
+        :param topLeft: the top left index of the changed data
+        :type topLeft: :class:`PySide.QtCore.QModelIndex`
+        :param bottomRight: the bottom right index of the changed data
+        :type bottomRight: :class:`PySide.QtCore.QModelIndex`
+        :returns: None
+        :rtype: None
+        :raises: None
+        """
+        self._reconcile_requeue(topLeft.parent())
+
+    def _reconcile_requeue(self, parent):
+        """Queue the menu of the parent index, so a change of the model does not restart the reconciliation
+
+        If the action of the parent has no menu yet, the menu of its parent is queued,
+        which converts the action. If the action is not built, the menu is created,
+        when its parent is reconciled. A menu, that a change queued and that still waits
+        for the same parent, is not queued again. So steady changes can not outgrow the queue.
+
+        :param parent: the parent index of the changed rows
+        :type parent: :class:`PySide.QtCore.QModelIndex`
+        :returns: None
+        :rtype: None
+        :raises: None
+        """
+        action = self.get_action(parent)
+        while action is not None and action.menu() is None:
+            parent = parent.parent()
+            action = self.get_action(parent)
+        if action is None:
+            return
+        menu = action.menu()
+        persistent = QtCore.QPersistentModelIndex(parent)
+        pending = self._reconcile_requeued.get(menu)
+        if pending is not None and pending == persistent:
+            return
+        self._reconcile_requeued[menu] = persistent
+        self._reconcile_queue.append((menu, persistent))
+
+    def _stop_reconcile(self, ):
+        """Stop a running reconciliation and return its model
+
+        :returns: the model of the reconciliation or None
+        :rtype: :class:`PySide.QtCore.QAbstractItemModel` | None
+        :raises: None
+        """
+        if self._reconcile_queue is None:
+            return
+        self._reconcile_timer.stop()
+        for signal, slot in self._reconcile_signals():
+            signal.disconnect(slot)
+        self._reconcile_queue = None
+        self._reconcile_requeued = {}
+        model = self._model
+        # the model was never connected
+        self._model = None
+        return model
+
+    def _reconcile_step(self, ):
+        """Reconcile menus until the time budget is used up
+
+        The queue holds persistent indizes, so they follow the changes of the model.
+        A menu is skipped, if its row was removed or it belongs to another row now.
+        The menu, that moved it, queues it again.
+
+        :returns: None
+        :rtype: None
+        :raises: None
+        """
+        end = time.time() + self._reconcile_budget
+        while self._reconcile_queue:
+            menu, parent = self._reconcile_queue.popleft()
+            if self._reconcile_requeued.get(menu) is parent:
+                del self._reconcile_requeued[menu]
+            if parent.isValid():
+                # sibling converts to a model index with every binding
+                parentindex = parent.sibling(parent.row(), parent.column())
+                action = self.get_action(parentindex)
+                if action is None or action.menu() is not menu:
+                    continue
+            elif menu is self:
+                parentindex = QtCore.QModelIndex()
+            else:
+                continue
+            self._reconcile_menu(menu, parentindex)
+            if self._reconcile_queue and time.time() >= end:
+                return
+        self._connect_model(self._stop_reconcile())
+        self.reconciled.emit()
+
+    def _reconcile_menu(self, menu, parentindex):
+        """Make the actions of the menu match the children of the index
+
+        :param menu: the menu to reconcile
+        :type menu: :class:`PySide.QtGui.QMenu`
+        :param parentindex: the index of the menu
+        :type parentindex: :class:`PySide.QtCore.QModelIndex`
+        :returns: None
+        :rtype: None
+        :raises: None
+        """
+        m = self._model
+        rows = m.rowCount(parentindex)
+        actions = menu.actions()
+        for action in actions[rows:]:
+            self._action_count -= self._count_actions(action)
+            self._discard_action(action)
+            menu.removeAction(action)
+            if action.menu() is not None:
+                action.menu().deleteLater()
+            else:
+                action.deleteLater()
+        for row in range(rows):
+            index = m.index(row, 0, parentindex)
+            if row >= len(actions):
+                if self.create_menu_for_index(index, append=True) is not None:
+                    self._create_hierarchy(index)
+                continue
+            action = actions[row]
+            haschildren = m.hasChildren(index)
+            if haschildren and action.menu() is None:
+                self._convert_action_to_menu(action)
+            elif not haschildren and action.menu() is not None:
+                self._action_count -= self._count_actions(action) - 1
+                self._remove_submenu(action)
+            self.set_action_data(action, index)
+            if haschildren:
+                self._reconcile_queue.append((action.menu(), QtCore.QPersistentModelIndex(index)))
+
+    def build_in_thread(self, model=None, source=None):
+        """Build the menus from a plan, that is computed on a worker thread
+
+        The structure and the converted data are computed as plain Python objects
+        on a worker thread. See :mod:`qmenuview.plan`. When the plan is ready,
+        the GUI thread only creates the actions and :data:`MenuView.plan_committed` is emitted.
+        Until then, the current actions stay, but the view is detached.
+
+        For a model, the raw data is copied on the GUI thread first,
+        because models must not be used from other threads.
+        If the model changes while the plan is computed, the actions are
+        updated with :meth:`MenuView.reconcile` after the commit.
+
+        A source has to be thread-safe and must not change, until the plan is committed.
+        Icons are converted on the GUI thread. The build limits and
+        :data:`MenuView.defer_data` do not apply to plans.
+
+        :param model: the model to build
+        :type model: :class:`PySide.QtCore.QAbstractItemModel` | None
+        :param source: the source to build instead of a model
+        :type source: :class:`qmenuview.source.TreeSource` | :class:`list` | :class:`dict` | None
+        :returns: the builder. Use it to wait for the plan or to connect to
+                  :data:`qmenuview.plan.PlanBuilder.failed`. None if there is nothing to build.
+        :rtype: :class:`qmenuview.plan.PlanBuilder` | None
+        :raises: None
+        """
+        if isinstance(source, (list, tuple, dict)):
+            source = NestedSource(source)
+        if model is None and source is None:
+            self.model = None
+            return
+        self._cancel_plan()
+        self._stop_reconcile()
+        self._set_source(None)
+        self._connect_model(None)
+        args = list(self.setdataargs)
+        columns = [a.column if isinstance(a.column, int) else getattr(self, a.column) for a in args]
+        if source is not None:
+            work = functools.partial(plan_from_source, source, args, columns)
+        else:
+            snapshot = snapshot_model(model, args, columns, self.checked_column)
+            work = functools.partial(plan_from_snapshot, snapshot, args)
+        builder = PlanBuilder(work, self)
+        builder.finished.connect(functools.partial(self._commit_plan, builder))
+        builder.finished.connect(builder.deleteLater)
+        builder.failed.connect(builder.deleteLater)
+        self._planning = [builder, model, source, False]
+        if source is None:
+            for signal in self._plan_signals(model):
+                signal.connect(self._plan_outdated)
+        builder.start()
+        return builder
+
+    def _plan_signals(self, model):
+        """Return the signals of the model, that outdate a plan
+
+        :param model: the model of the plan
+        :type model: :class:`PySide.QtCore.QAbstractItemModel`
+        :returns: a list of signals
+        :rtype: :class:`list`
+        :raises: None
+        """
+        return [model.modelReset, model.rowsInserted, model.rowsRemoved, model.dataChanged]
+
+    def _plan_outdated(self, *args):
+        """Remember, that the model changed after it was copied for the plan
+
+        :returns: None
+        :rtype: None
+        :raises: None
+        """
+        self._planning[3] = True
+
+    def _cancel_plan(self, ):
+        """Ignore the result of the running plan builder
+
+        :returns: None
+        :rtype: None
+        :raises: None
+        """
+        if self._planning is None:
+            return
+        model, source = self._planning[1:3]
+        self._planning = None
+        if source is None:
+            for signal in self._plan_signals(model):
+                signal.disconnect(self._plan_outdated)
+
+    def _commit_plan(self, builder, plan):
+        """Create the actions of the plan and connect the model or source
+
+        :param builder: the builder of the plan
+        :type builder: :class:`qmenuview.plan.PlanBuilder`
+        :param plan: the root of the plan
+        :type plan: :class:`qmenuview.plan.PlanNode`
+        :returns: None
+        :rtype: None
+        :raises: None
+        """
+        if self._planning is None or self._planning[0] is not builder:
+            return
+        model, source, outdated = self._planning[1:]
+        self._cancel_plan()
+        self._clear_all()
+        self._create_from_plan(plan, source is not None)
+        if source is not None:
+            self._set_source(source)
+        elif outdated:
+            self.reconcile(model)
+        else:
+            self._connect_model(model)
+        self.plan_committed.emit()
+
+    def _create_from_plan(self, plan, withnodes):
+        """Create the actions for the nodes of the plan
+
+        :param plan: the root of the plan
+        :type plan: :class:`qmenuview.plan.PlanNode`
+        :param withnodes: if True, register the source nodes of the plan
+        :type withnodes: :class:`bool`
+        :returns: None
+        :rtype: None
+        :raises: None
+        """
+        if withnodes:
+            self._node_actions[id(plan.node)] = self.menuAction()
+        stack = [(self, plan.children)]
+        while stack:
+            menu, children = stack.pop()
+            for planned in children:
+                if planned.children:
+                    action = self.create_menu(menu)
+                    self._track_menu(action.menu())
+                    stack.append((action.menu(), planned.children))
+                else:
+                    action = self.create_action(menu)
+                menu.addAction(action)
+                self._action_count += 1
+                action.setEnabled(bool(planned.flags & ENABLED))
+                action.setCheckable(bool(planned.flags & CHECKABLE))
+                for setfunc, value, convertfunc in planned.values:
+                    if convertfunc is not None:
+                        value = convertfunc(value)
+                    self._apply_value(action, setfunc, value)
+                if withnodes:
+                    self._action_nodes[action] = planned.node
+                    self._node_actions[id(planned.node)] = action
+                self._connect_action(action)
+
+    @staticmethod
+    def _flatten_hierarchy(model, parent=None):
+        """Return a level-order list of indizes
+
+        :param model: the model to traverse
+        :type model: :class:`PySide.QtCore.QAbstractItemModel`
+        :param parent: the parent index. Default is the root.
+        :type parent: :class:`PySide.QtCore.QModelIndex`
+        :returns: a level-order list of indizes
+        :rtype: :class:`list` of :class:`PySide.QtCore.QModelIndex`
+        :raises: None
+        """
+        return list(MenuView.iter_hierarchy(model, parent, depth_first=False))
+
+    @staticmethod
+    def iter_hierarchy(model, parent=None, depth_first=True, max_depth=None, max_nodes=None,
+                       max_children=None, descend=None):
+        """Yield the indizes below parent lazily
+
+        Depth-first traversal yields the indizes in pre-order and only keeps
+        one row counter per level in memory.
+        Level-order traversal only keeps the parents of the pending levels.
+        In both orders a parent is always yielded before its children.
+
+        The children of an index are only queried after the index was yielded,
+        so the consumer can act on the index first.
+
+        :param model: the model to traverse
+        :type model: :class:`PySide.QtCore.QAbstractItemModel`
+        :param parent: the parent index. Default is the root.
+        :type parent: :class:`PySide.QtCore.QModelIndex`
+        :param depth_first: True for depth-first, False for level-order traversal.
+        :type depth_first: :class:`bool`
+        :param max_depth: the maximum depth relative to parent. Direct children have depth 1.
+                          None for no limit.
+        :type max_depth: :class:`int` | None
+        :param max_nodes: stop after this many indizes. None for no limit.
+        :type max_nodes: :class:`int` | None
+        :param max_children: only yield this many rows per parent. None for no limit.
+        :type max_children: :class:`int` | None
+        :param descend: a callable, that is called with an yielded index and its depth,
+                        before its children are queried. If it returns False, the children are skipped.
+        :type descend: callable | None
+        :returns: a generator of indizes
+        :rtype: generator of :class:`PySide.QtCore.QModelIndex`
+        :raises: None
+        """
+        if parent is None:
+            parent = QtCore.QModelIndex()
+        if max_nodes is not None and max_nodes <= 0:
+            return
+        count = 0
+
+        def rowcount(p):
+            rows = model.rowCount(p)
+            if max_children is not None:
+                return min(rows, max_children)
+            return rows
+
+        def visit(index, depth):
+            if max_depth is not None and depth >= max_depth:
+                return False
+            return descend is None or descend(index, depth)
+
+        if depth_first:
+            # each entry is [parent, next row, row count, depth of the rows]
+            stack = [[parent, 0, rowcount(parent), 1]]
+            while stack:
+                entry = stack[-1]
+                p, row, rows, depth = entry
+                if row >= rows:
+                    stack.pop()
+                    continue
+                entry[1] = row + 1
+                index = model.index(row, 0, p)
+                yield index
+                count += 1
+                if max_nodes is not None and count >= max_nodes:
+                    return
+                if visit(index, depth):
+                    childrows = rowcount(index)
+                    if childrows:
+                        stack.append([index, 0, childrows, depth + 1])
+        else:
+            parents = collections.deque([(parent, 1)])
+            while parents:
+                p, depth = parents.popleft()
+                for row in range(rowcount(p)):
+                    index = model.index(row, 0, p)
+                    yield index
+                    count += 1
+                    if max_nodes is not None and count >= max_nodes:
+                        return
+                    # only remember indizes with children for the next level
+                    if visit(index, depth) and model.hasChildren(index):
+                        parents.append((index, depth + 1))
+
+    def create_menu_for_index(self, index, append=False):
+        """Create the action for the given index and return it
+
+        If the parent of the index is not built, because it is
+        an unloaded placeholder, or if the row is hidden behind an
+        overflow action, nothing is created.
+
+        :param index: the index to create an action for
+        :type index: :class:`PySide.QtCore.QModelIndex`
+        :param append: If True, append the action to the menu instead of inserting
+                       it before the action of the next row. Looking up the next action
+                       costs linear time, so menus, that are built in row order, append.
+        :type append: :class:`bool`
+        :returns: the created action or None
+        :rtype: :class:`PySide.QtGui.QAction` | None
+        :raises: None
+        """
+        m = self._model
+        parentaction = self.get_action(index.parent())
+        if parentaction is None or parentaction.menu() in self._unloaded:
+            return
+        # Action has no menu yet. In order to create a sub action,
+        # we have to convert it.
+        if parentaction.menu() is None:
+            self._convert_action_to_menu(parentaction)
+        parent = parentaction.menu()
+        if parent in self._overflow and index.row() >= len(self._row_actions(parent)):
+            # the row is hidden behind the overflow action
+            return
+        order = self._get_order(parent, index)
+        before = None
+        if not append and order is None:
+            before = self._child_action(parent, index.row())
+        if m.hasChildren(index):
+            action = self.create_menu(parent)
+            self._track_menu(action.menu())
+        else:
+            action = self.create_action(parent)
+        if order is not None:
+            self._insert_sorted(parent, order, action, index)
+        else:
+            parent.insertAction(before, action)
+        self._action_count += 1
+        self.set_action_data(action, index)
+        self._connect_action(action)
+        return action
+
+    def _connect_action(self, action):
+        """Connect the signals of the action to the signal handlers of the view
+
+        :param action: the new action
+        :type action: :class:`PySide.QtGui.QAction`
+        :returns: None
+        :rtype: None
+        :raises: None
+        """
+        signalmap = {action.triggered: self._action_triggered,
+                     action.hovered: self._action_hovered,
+                     action.toggled: self._action_toggled}
+        for signal, callback in signalmap.items():
+            signal.connect(functools.partial(callback, action))
+
+    def _convert_action_to_menu(self, action):
+        # QAction.parentWidget does not exist in Qt 6
+        parent = action.parent()
+        menuaction = self.create_menu(parent)
+        action.setMenu(menuaction.menu())
+        self._track_menu(menuaction.menu())
+
+    def _track_menu(self, menu):
+        """Register a new loaded submenu, if there is a limit for loaded menus
+
+        :param menu: the new submenu
+        :type menu: :class:`PySide.QtGui.QMenu`
+        :returns: None
+        :rtype: None
+        :raises: None
+        """
+        if self.max_loaded_menus is None and self.max_loaded_actions is None:
+            return
+        if self._untracked is not None:
+            self._untracked.append(menu)
+            return
+        self._loaded[menu] = None
+        self._watch_menu(menu)
+
+    def _menu_depth(self, menu):
+        """Return the number of menus between the view and the given submenu
+
+        :param menu: the submenu
+        :type menu: :class:`PySide.QtGui.QMenu`
+        :returns: the depth, 0 for the direct submenus of the view
+        :rtype: :class:`int`
+        :raises: None
+        """
+        depth = 0
+        menu = self._get_parent_menu(menu.menuAction())
+        while menu is not None and menu is not self:
+            depth += 1
+            menu = self._get_parent_menu(menu.menuAction())
+        return depth
+
+    def create_menu(self, parent):
+        """Create a menu and return the menus action.
+
+        The parent of the menu has to be set to ``parent``.
+        The default menu is a :class:`qmenuview.menu.BatchMenu`, so the view can
+        suspend its layout during bulk changes. Other menus are still supported.
+
+        :param parent: The parent menu
+        :type parent: :class:`PySide.QtGui.QMenu`
+        :returns: The menu action
+        :rtype: :class:`PySide.QtGui.QAction`
+        :raises: None
+        """
+        menu = BatchMenu(parent=parent)
+        return menu.menuAction()
+
+    def create_action(self, parent):
+        """Create and return a new action
+
+        The parent of the action has to be set to ``parent``
+
+        :param parent: The parent menu
+        :type parent: :class:`PySide.QtGui.QMenu`
+        :returns: The created action
+        :rtype: :class:`PySide.QtGui.QAction`
+        :raises: None
+        """
+        return QtGui.QAction(parent)
+
+    def insert_menus(self, parent, first, last):
+        """Create menus for rows first til last under the given parent
+
+        :param parent: The parent index
+        :type parent: :class:`PySide.QtCore.QModelIndex`
+        :param first: the first row
+        :type first: :class:`int`
+        :param last: the last row
+        :type last: :class:`int`
+        :returns: None
+        :rtype: None
+        :raises: None
+        """
+        parentaction = self.get_action(parent)
+        parentmenu = parentaction.menu() if parentaction is not None else None
+        # rows inserted at the end, e.g. a bulk append, do not need to look up the next action
+        append = parentmenu is None
+        if not append and parentmenu not in self._overflow:
+            append = self._child_action(parentmenu, first) is None
+        with suspended_layout(parentmenu):
+            for i in range(first, last + 1):
+                index = self._model.index(i, 0, parent)
+                if self.create_menu_for_index(index, append=append) is None:
+                    # the parent is not built, so the children are not needed either
+                    continue
+                self._create_hierarchy(index)
+            self._update_separators()
+
+    def remove_menus(self, parent, first, last):
+        """Remove the menus under the given parent
+
+        :param parent: the parent of the menus
+        :type parent: :class:`PySide.QtCore.QModelIndex`
+        :param first: the first row
+        :type first: :class:`int`
+        :param last: the last row
+        :type last: :class:`int`
+        :returns: None
+        :rtype: None
+        :raises: None
+        """
+        parentaction = self.get_action(parent)
+        if parentaction is None:
+            return
+        parentmenu = parentaction.menu()
+        if parentmenu in self._unloaded:
+            # a placeholder has no actions to remove
+            if first == 0 and last == self._model.rowCount(parent) - 1:
+                self._remove_submenu(parentaction)
+            return
+        with suspended_layout(parentmenu):
+            for i in reversed(range(first, last + 1)):
+                index = self._model.index(i, 0, parent)
+                action = self.get_action(index)
+                if action is None:
+                    # the row is hidden behind the overflow action
+                    continue
+                if self.max_total_actions is not None:
+                    self._action_count -= self._count_actions(action)
+                self._discard_action(action)
+                self._remove_sorted(parentmenu, i, action)
+                parentmenu.removeAction(action)
+                if action.menu() is not None:
+                    action.menu().deleteLater()
+                else:
+                    action.deleteLater()
+            self._update_separators()
+            overflow = self._overflow.get(parentmenu)
+            if overflow is not None and self._model.rowCount(parent) == last - first + 1:
+                del self._overflow[parentmenu]
+                parentmenu.removeAction(overflow)
+                overflow.deleteLater()
+            # menu has no childs, only display the action
+            if not parentmenu.actions() and parentmenu is not self:
+                self._remove_submenu(parentaction)
+
+    def update_menus(self, topLeft, bottomRight, roles=None):
+        """Update the menus from topleft index to bottomright index
+
+        The menu of the rows is looked up once for the whole range.
+        If only the :data:`PySide.QtCore.Qt.CheckStateRole` changed,
+        only the check state is applied.
+
+        :param topLeft: The top left index to update
+        :type topLeft: :class:`PySide.QtCore.QModelIndex`
+        :param bottomRight: the bottom right index to update
+        :type bottomRight: :class:`PySide.QtCore.QModelIndex`
+        :param roles: the changed roles. Empty or None for all roles.
+                      Only newer bindings pass them.
+        :type roles: :class:`list` | None
+        :returns: None
+        :rtype: None
+        :raises: None
+        """
+        columns = self._data_columns()
+        needupdate = any([(c >= topLeft.column() and c <= bottomRight.column()) for c in columns])
+        if not needupdate:
+            return
+        parentaction = self.get_action(topLeft.parent())
+        menu = parentaction.menu() if parentaction is not None else None
+        if menu is None or menu in self._unloaded:
+            return
+        actions = self._row_actions(menu)
+        count = len(actions)
+        checkonly = bool(roles) and list(roles) == [QtCore.Qt.CheckStateRole]
+        order = self._sorted.get(menu)
+        with suspended_layout(menu):
+            for row in range(topLeft.row(), min(bottomRight.row() + 1, count)):
+                index = topLeft.sibling(row, 0)
+                if checkonly:
+                    self._set_action_checked(actions[row], index)
+                else:
+                    self.set_action_data(actions[row], index)
+                if order is not None:
+                    self._resort(menu, order, actions[row], index)
+            self._update_separators()
+
+    def get_index(self, action, column=0):
+        """Return the index for the given action
+
+        :param action: the action to query
+        :type action: :class:`PySide.QtGui.QAction`
+        :param column: The column of the index
+        :type column: :class:`int`
+        :returns: the index of the action
+        :rtype: :class:`PySide.QtCore.QModelIndex`
+        :rasies: None
+        """
+        if action == self.menuAction():
+            return QtCore.QModelIndex()
+        # find all parents to get their index
+        parents = self._get_parents(action)
+        index = QtCore.QModelIndex()
+        # Move through indexes down the chain
+        for a in reversed(parents):
+            parent = a.parent()
+            # if parent of action is its own menu, get parent of that menu.
+            # We want to know which row the action is in. For that we need
+            # The real parent menu.
+            if parent is a.menu():
+                parent = parent.parent()
+            row = self._row_actions(parent).index(a)
+            index = self._model.index(row, 0, index)
+        parent = action.parent()
+        if parent is None:
+            return index
+        if parent is action.menu():
+            parent = parent.parent()
+        try:
+            row = self._row_actions(parent).index(action)
+        except ValueError:
+            # the overflow action and the separators of groups have no row
+            return QtCore.QModelIndex()
+        index = self._model.index(row, column, index)
+        return index
+
+    def _get_parents(self, action):
+        parents = []
+        a = action
+        while True:
+            parent = a.parent()
+            # if the parent is the actions menu, we have to get
+            # the menues parent. Else we get stuck on the same level.
+            if parent and parent is a.menu():
+                parent = parent.parent()
+            if not isinstance(parent, QtGui.QMenu):
+                # Is not part of the tree. Parent is not a menu but
+                # might be None or another Widget
+                return []
+            # break if parent is root because we got all parents we need
+            if parent is self:
+                break
+            # a new parent was found and we are still not at root
+            # search further until we get to root
+            parent = parent.menuAction()
+            a = parent
+            parents.append(parent)
+        return parents
+
+    def get_action(self, index):
+        """Return the action for the given index
+
+        :param index: the index to query
+        :type index: :class:`PySide.QtCore.QModelIndex`
+        :returns: the action for the given index or None, if the
+                  action is not built, e.g. because it is in an unloaded submenu.
+        :rtype: :class:`PySide.QtGui.QAction` | None
+        :raises: None
+        """
+        if not index.isValid():
+            return self.menuAction()
+        parents = self._get_parent_indizes(index)
+        menu = self
+        try:
+            for i in reversed(parents):
+                menu = self._child_action(menu, i.row()).menu()
+            return self._child_action(menu, index.row())
+        except AttributeError:
+            # a parent is not built
+            return None
+
+    def _child_action(self, menu, row):
+        """Return the action of the given row in the menu
+
+        :param menu: the menu to query
+        :type menu: :class:`PySide.QtGui.QMenu`
+        :param row: the row of the action
+        :type row: :class:`int`
+        :returns: the action or None, if the row is not built
+        :rtype: :class:`PySide.QtGui.QAction` | None
+        :raises: None
+        """
+        actions = self._row_actions(menu)
+        if 0 <= row < len(actions):
+            return actions[row]
+
+    def _row_actions(self, menu):
+        """Return the actions of the menu in the order of the model rows
+
+        The overflow action and the separators of groups are not included.
+
+        :param menu: the menu to query
+        :type menu: :class:`PySide.QtGui.QMenu`
+        :returns: the actions. Do not modify the list.
+        :rtype: :class:`list` of :class:`PySide.QtGui.QAction`
+        :raises: None
+        """
+        order = self._sorted.get(menu)
+        if order is not None:
+            return order.rows
+        actions = menu.actions()
+        if menu in self._overflow:
+            actions = actions[:-1]
+        return actions
+
+    @staticmethod
+    def _level_role(roles, level):
+        """Return the role for the level from a role or a dictionary of levels to roles
+
+        :param roles: a role, a dictionary or None
+        :param level: the level of a menu
+        :type level: :class:`int`
+        :returns: the role or None
+        :raises: None
+        """
+        if isinstance(roles, dict):
+            return roles.get(level)
+        return roles
+
+    def _get_order(self, menu, index):
+        """Return the order of the menu, if the level of the index is sorted or grouped
+
+        :param menu: the menu of the index
+        :type menu: :class:`PySide.QtGui.QMenu`
+        :param index: an index in the menu
+        :type index: :class:`PySide.QtCore.QModelIndex`
+        :returns: the order or None
+        :rtype: :class:`_SortedMenu` | None
+        :raises: None
+        """
+        if self.sort_role is None and self.group_role is None:
+            return None
+        order = self._sorted.get(menu)
+        if order is None:
+            level = len(self._get_parent_indizes(index))
+            if self._level_role(self.sort_role, level) is None and\
+                    self._level_role(self.group_role, level) is None:
+                return None
+            order = self._sorted[menu] = _SortedMenu(level)
+        return order
+
+    def _order_key(self, order, index):
+        """Return the group and sort key of the index
+
+        :param order: the order of the menu of the index
+        :type order: :class:`_SortedMenu`
+        :param index: the index
+        :type index: :class:`PySide.QtCore.QModelIndex`
+        :returns: the key
+        :rtype: :class:`tuple`
+        :raises: None
+        """
+        group = value = None
+        grouprole = self._level_role(self.group_role, order.level)
+        if grouprole is not None:
+            group = self.get_data(index, grouprole, self.text_column)
+        sortrole = self._level_role(self.sort_role, order.level)
+        if sortrole is not None:
+            value = self.get_data(index, sortrole, self.text_column)
+            if value is not None and self.sort_key is not None:
+                value = self.sort_key(value)
+        return _orderable(group), _orderable(value)
+
+    def _insert_sorted(self, menu, order, action, index):
+        """Insert the new action of the index at its sorted position
+
+        :param menu: the sorted menu
+        :type menu: :class:`PySide.QtGui.QMenu`
+        :param order: the order of the menu
+        :type order: :class:`_SortedMenu`
+        :param action: the new action
+        :type action: :class:`PySide.QtGui.QAction`
+        :param index: the index of the action
+        :type index: :class:`PySide.QtCore.QModelIndex`
+        :returns: None
+        :rtype: None
+        :raises: None
+        """
+        order.rows.insert(index.row(), action)
+        self._place_sorted(menu, order, action, self._order_key(order, index))
+
+    def _place_sorted(self, menu, order, action, key):
+        """Insert the action into the menu at the position of the key
+
+        :param menu: the sorted menu
+        :type menu: :class:`PySide.QtGui.QMenu`
+        :param order: the order of the menu
+        :type order: :class:`_SortedMenu`
+        :param action: the action, that is not in the menu
+        :type action: :class:`PySide.QtGui.QAction`
+        :param key: the key of the action
+        :type key: :class:`tuple`
+        :returns: None
+        :rtype: None
+        :raises: None
+        """
+        position = bisect.bisect_right(order.keys, key)
+        order.keys.insert(position, key)
+        order.display.insert(position, action)
+        if position + 1 < len(order.display):
+            before = order.display[position + 1]
+        else:
+            before = self._overflow.get(menu)
+        menu.insertAction(before, action)
+        if order.separators or self._level_role(self.group_role, order.level) is not None:
+            self._pending_separators.add(menu)
+
+    def _resort(self, menu, order, action, index):
+        """Move the action, if the key of its index changed
+
+        :param menu: the sorted menu
+        :type menu: :class:`PySide.QtGui.QMenu`
+        :param order: the order of the menu
+        :type order: :class:`_SortedMenu`
+        :param action: the action of the index
+        :type action: :class:`PySide.QtGui.QAction`
+        :param index: the changed index
+        :type index: :class:`PySide.QtCore.QModelIndex`
+        :returns: None
+        :rtype: None
+        :raises: None
+        """
+        key = self._order_key(order, index)
+        position = order.display.index(action)
+        if order.keys[position] == key:
+            return
+        del order.display[position]
+        del order.keys[position]
+        menu.removeAction(action)
+        self._place_sorted(menu, order, action, key)
+
+    def _remove_sorted(self, menu, row, action):
+        """Forget the action of the removed row of a sorted menu
+
+        :param menu: the menu of the action
+        :type menu: :class:`PySide.QtGui.QMenu`
+        :param row: the removed row
+        :type row: :class:`int`
+        :param action: the action of the row
+        :type action: :class:`PySide.QtGui.QAction`
+        :returns: None
+        :rtype: None
+        :raises: None
+        """
+        order = self._sorted.get(menu)
+        if order is None:
+            return
+        del order.rows[row]
+        position = order.display.index(action)
+        del order.display[position]
+        del order.keys[position]
+        if order.separators:
+            self._pending_separators.add(menu)
+
+    def _forget_order(self, menu):
+        """Remove the separators of a sorted menu and forget its order
+
+        :param menu: the menu
+        :type menu: :class:`PySide.QtGui.QMenu`
+        :returns: None
+        :rtype: None
+        :raises: None
+        """
+        self._pending_separators.discard(menu)
+        order = self._sorted.pop(menu, None)
+        if order is None:
+            return
+        for separator in order.separators:
+            menu.removeAction(separator)
+            separator.deleteLater()
+
+    def _update_separators(self, ):
+        """Put separators between the groups of the changed sorted menus
+
+        The separators of a menu are replaced in one pass after a batch of changes.
+
+        :returns: None
+        :rtype: None
+        :raises: None
+        """
+        while self._pending_separators:
+            menu = self._pending_separators.pop()
+            order = self._sorted[menu]
+            for separator in order.separators:
+                menu.removeAction(separator)
+                separator.deleteLater()
+            order.separators = []
+            keys = order.keys
+            for position in range(1, len(keys)):
+                if keys[position][0] != keys[position - 1][0]:
+                    separator = QtGui.QAction(menu)
+                    separator.setSeparator(True)
+                    menu.insertAction(order.display[position], separator)
+                    order.separators.append(separator)
+
+    def _get_parent_indizes(self, index):
+        if not index.isValid() or index.model() != self._model:
+            return []
+        parents = []
+        i = index
+        while True:
+            p = i.parent()
+            if not p.isValid():
+                break
+            parents.append(p)
+            i = p
+        return parents
+
+    def set_action_data(self, action, index):
+        """Set the data of the action for the given index
+
+        .. Note:: The column of the index does not matter. The columns for the data
+                  are specified in :data:`MenuView.setdataargs`.
+
+        The arguments to used are defined in :data:`MenuView.setdataargs`.
+
+        If :data:`MenuView.defer_data` is True and the action is inside
+        a closed submenu, only the enabled and checkable state are applied.
+        The rest of the data is applied, when the submenu is about to show.
+
+        :param action: The action to update
+        :type action: :class:`PySide.QtGui.QAction`
+        :param index: The index with the data
+        :type index: :class:`PySide.QtCore.QModelIndex`
+        :returns: None
+        :rtype: None
+        :raises: None
+        """
+        self._set_action_enabled(action, index)
+        self._set_action_checkable(action, index)
+        self._set_action_group(action, index)
+        if self.defer_data:
+            parentmenu = self._get_parent_menu(action)
+            if parentmenu is not None and parentmenu is not self and not parentmenu.isVisible():
+                self._mark_dirty(parentmenu, action)
+                return
+        for args in self.setdataargs:
+            self._set_action_attribute(action, index, args)
+
+    def _get_parent_menu(self, action):
+        """Return the menu, which contains the given action
+
+        :param action: the action to query
+        :type action: :class:`PySide.QtGui.QAction`
+        :returns: the menu of the action or None
+        :rtype: :class:`PySide.QtGui.QMenu` | None
+        :raises: None
+        """
+        parent = action.parent()
+        # the action of a menu has the menu as parent
+        if parent is not None and parent is action.menu():
+            parent = parent.parent()
+        if isinstance(parent, QtGui.QMenu):
+            return parent
+
+    def _mark_dirty(self, menu, action):
+        """Remember that the data of action has to be applied when menu shows
+
+        :param menu: the closed menu that contains the action
+        :type menu: :class:`PySide.QtGui.QMenu`
+        :param action: the action with pending data
+        :type action: :class:`PySide.QtGui.QAction`
+        :returns: None
+        :rtype: None
+        :raises: None
+        """
+        self._dirty.setdefault(menu, set()).add(action)
+        self._watch_menu(menu)
+
+    def _watch_menu(self, menu):
+        """Connect the aboutToShow signal of the menu, if it is not connected yet
+
+        :param menu: the menu to watch
+        :type menu: :class:`PySide.QtGui.QMenu`
+        :returns: None
+        :rtype: None
+        :raises: None
+        """
+        if menu in self._watched_menus:
+            return
+        self._watched_menus.add(menu)
+        menu.aboutToShow.connect(functools.partial(self._menu_about_to_show, menu))
+
+    def _menu_about_to_show(self, menu):
+        """Apply the pending data of the menu
+
+        :param menu: the menu that is about to show
+        :type menu: :class:`PySide.QtGui.QMenu`
+        :returns: None
+        :rtype: None
+        :raises: None
+        """
+        if self._build_menu(menu):
+            self._prebuild_counts['misses'] += 1
+        elif menu in self._prebuilt:
+            self._prebuild_counts['hits'] += 1
+        self._prebuilt.discard(menu)
+        if menu in self._loaded:
+            # move the menu to the end, it is now the most recently shown
+            del self._loaded[menu]
+            self._loaded[menu] = None
+            self._evict_menus(menu)
+        if self.prebuild:
+            self._recent.pop(menu, None)
+            self._recent[menu] = None
+            if len(self._recent) > _RECENT_MENUS:
+                self._recent.popitem(last=False)
+            self._prebuild_queue = None
+            self._schedule_prebuild()
+
+    def _build_menu(self, menu):
+        """Build the placeholder menu and apply its pending data
+
+        :param menu: the menu to build
+        :type menu: :class:`PySide.QtGui.QMenu`
+        :returns: True, if there was anything to build
+        :rtype: :class:`bool`
+        :raises: None
+        """
+        built = False
+        if menu in self._unloaded:
+            self._load_menu(menu)
+            built = True
+        if menu in self._dirty:
+            self._apply_dirty(menu)
+            built = True
+        return built
+
+    def _add_placeholder(self, menu):
+        """Mark the given empty menu as placeholder, that is built on show
+
+        :param menu: the empty menu
+        :type menu: :class:`PySide.QtGui.QMenu`
+        :returns: None
+        :rtype: None
+        :raises: None
+        """
+        self._loaded.pop(menu, None)
+        self._unloaded.add(menu)
+        self._watch_menu(menu)
+
+    def _load_menu(self, menu):
+        """Build the actions of the placeholder menu from the model
+
+        Only the direct children are created. Submenus of the children
+        become placeholders themselves.
+
+        :param menu: the placeholder menu
+        :type menu: :class:`PySide.QtGui.QMenu`
+        :returns: None
+        :rtype: None
+        :raises: None
+        """
+        self._unloaded.discard(menu)
+        self._lru_counts['loads'] += 1
+        self._track_menu(menu)
+        if self._model:
+            self._populate_menu(menu, self.get_index(menu.menuAction()), 0)
+
+    def _populate_menu(self, menu, parentindex, start):
+        """Build one level of actions in the menu starting at the given row
+
+        At most :data:`MenuView.max_children_per_menu` rows are built.
+        If there are more rows, an overflow action is appended.
+        Submenus of the new actions become placeholders.
+
+        :param menu: the menu to populate
+        :type menu: :class:`PySide.QtGui.QMenu`
+        :param parentindex: the index of the menu
+        :type parentindex: :class:`PySide.QtCore.QModelIndex`
+        :param start: the first row to build
+        :type start: :class:`int`
+        :returns: None
+        :rtype: None
+        :raises: None
+        """
+        m = self._model
+        rows = m.rowCount(parentindex)
+        end = rows
+        if self.max_children_per_menu is not None:
+            end = min(rows, start + self.max_children_per_menu)
+        for row in range(start, end):
+            action = self.create_menu_for_index(m.index(row, 0, parentindex), append=True)
+            if action is not None and action.menu() is not None:
+                self._add_placeholder(action.menu())
+        if end < rows:
+            self._add_overflow(menu)
+        self._update_separators()
+
+    def _unload_menu(self, menu):
+        """Delete all actions of the menu and turn it into a placeholder
+
+        :param menu: the menu to unload
+        :type menu: :class:`PySide.QtGui.QMenu`
+        :returns: None
+        :rtype: None
+        :raises: None
+        """
+        overflow = self._overflow.pop(menu, None)
+        if overflow is not None:
+            menu.removeAction(overflow)
+            overflow.deleteLater()
+        self._forget_order(menu)
+        actions = menu.actions()
+        for action in actions:
+            if self.max_total_actions is not None:
+                self._action_count -= self._count_actions(action)
+            self._discard_action(action)
+            menu.removeAction(action)
+            submenu = action.menu()
+            if submenu is not None:
+                submenu.deleteLater()
+            else:
+                action.deleteLater()
+        self._dirty.pop(menu, None)
+        self._prebuilt.discard(menu)
+        self._add_placeholder(menu)
+        self._lru_counts['evictions'] += 1
+        self._lru_counts['evicted_actions'] += len(actions)
+
+    def _evict_menus(self, shown):
+        """Unload the least recently shown submenus until the limits are met
+
+        Visible menus and the parents of the shown menu are never unloaded.
+
+        :param shown: the menu that is about to show
+        :type shown: :class:`PySide.QtGui.QMenu`
+        :returns: None
+        :rtype: None
+        :raises: None
+        """
+        protected = set()
+        menu = shown
+        while menu is not None and menu is not self:
+            protected.add(menu)
+            menu = self._get_parent_menu(menu.menuAction())
+        for menu in list(self._loaded):
+            if not self._exceeds_limits():
+                return
+            if menu not in self._loaded or menu in protected or menu.isVisible():
+                continue
+            self._unload_menu(menu)
+
+    def _exceeds_limits(self, ):
+        """Return True, if there are more loaded menus or actions than allowed
+
+        :returns: True, if the limits are exceeded
+        :rtype: :class:`bool`
+        :raises: None
+        """
+        if self.max_loaded_menus is not None and len(self._loaded) > self.max_loaded_menus:
+            return True
+        if self.max_loaded_actions is not None:
+            count = len(self.actions()) + sum(len(m.actions()) for m in self._loaded)
+            return count > self.max_loaded_actions
+        return False
+
+    @property
+    def lru_stats(self, ):
+        """Get statistics about the unloading of idle submenus
+
+        The keys are ``loaded_menus``, ``unloaded_menus``, ``evictions``,
+        ``evicted_actions`` and ``loads``. ``loads`` counts how often
+        a placeholder was built, when it was about to show.
+
+        :returns: a dictionary with the statistics
+        :rtype: :class:`dict`
         :raises: None
         """
-        menu = QtGui.QMenu(parent=parent)
-        return menu.menuAction()
+        stats = dict(self._lru_counts)
+        stats['loaded_menus'] = len(self._loaded)
+        stats['unloaded_menus'] = len(self._unloaded)
+        return stats
 
-    def create_action(self, parent):
-        """Create and return a new action
+    @property
+    def prebuild_stats(self, ):
+        """Get statistics about building submenus in idle time
 
-        The parent of the action has to be set to ``parent``
+        The keys are ``prebuilt``, ``steps``, ``hits``, ``misses`` and ``pending``.
+        ``prebuilt`` counts the menus built in idle time, ``steps`` the idle steps.
+        ``hits`` counts the openings of prebuilt menus, ``misses`` the openings of menus,
+        that still had to be built. ``pending`` is True, while prebuilding is scheduled.
 
-        :param parent: The parent menu
-        :type parent: :class:`PySide.QtGui.QMenu`
-        :returns: The created action
-        :rtype: :class:`PySide.QtGui.QAction`
+        :returns: a dictionary with the statistics
+        :rtype: :class:`dict`
         :raises: None
         """
-        return QtGui.QAction(parent)
+        stats = dict(self._prebuild_counts)
+        stats['pending'] = self._prebuild_timer is not None and self._prebuild_timer.isActive()
+        return stats
 
-    def insert_menus(self, parent, first, last):
-        """Create menus for rows first til last under the given parent
+    def _schedule_prebuild(self, delay=None):
+        """Start the next prebuild step, once there was no user input for the delay
 
-        :param parent: The parent index
-        :type parent: :class:`PySide.QtCore.QModelIndex`
-        :param first: the first row
-        :type first: :class:`int`
-        :param last: the last row
-        :type last: :class:`int`
+        :param delay: the delay in milliseconds. Default is :data:`MenuView.prebuild_delay`.
+        :type delay: :class:`int` | None
         :returns: None
         :rtype: None
         :raises: None
         """
-        for i in range(first, last + 1):
-            index = self._model.index(i, 0, parent)
-            flattened = [index]
-            flattened.extend(self._flatten_hierarchy(self._model, index))
-            for newi in flattened:
-                self.create_menu_for_index(newi)
-
-    def remove_menus(self, parent, first, last):
-        """Remove the menus under the given parent
+        if not self.prebuild:
+            return
+        if self._prebuild_timer is None:
+            self._prebuild_timer = QtCore.QTimer(self)
+            self._prebuild_timer.setSingleShot(True)
+            self._prebuild_timer.timeout.connect(self._prebuild_step)
+        if self._prebuild_filter is None:
+            app = QtCore.QCoreApplication.instance()
+            if app is not None:
+                self._prebuild_filter = _InputFilter(self._prebuild_input, self)
+                app.installEventFilter(self._prebuild_filter)
+        self._prebuild_timer.start(self.prebuild_delay if delay is None else delay)
+
+    def _prebuild_input(self, ):
+        """Pause prebuilding on user input
 
-        :param parent: the parent of the menus
-        :type parent: :class:`PySide.QtCore.QModelIndex`
-        :param first: the first row
-        :type first: :class:`int`
-        :param last: the last row
-        :type last: :class:`int`
         :returns: None
         :rtype: None
         :raises: None
         """
-        parentaction = self.get_action(parent)
-        parentmenu = parentaction.menu()
-        for i in reversed(range(first, last + 1)):
-            index = self._model.index(i, 0, parent)
-            action = self.get_action(index)
-            parentmenu.removeAction(action)
-        # menu has no childs, only display the action
-        if not parentmenu.actions() and parentmenu is not self:
-            parentaction.setMenu(None)
-
-    def update_menus(self, topLeft, bottomRight):
-        """Update the menus from topleft index to bottomright index
+        if self._prebuild_timer.isActive():
+            self._prebuild_timer.start(self.prebuild_delay)
+
+    def _stop_prebuild(self, ):
+        """Stop prebuilding, until new menus need it
 
-        :param topLeft: The top left index to update
-        :type topLeft: :class:`PySide.QtCore.QModelIndex`
-        :param bottomRight: the bottom right index to update
-        :type bottomRight: :class:`PySide.QtCore.QModelIndex`
         :returns: None
         :rtype: None
         :raises: None
         """
-        columns = [self.text_column, self.icon_column, self.icontext_column,
-                   self.tooltip_column, self.checked_column, self.whatsthis_column,
-                   self.statustip_column]
-        needupdate = any([(c >= topLeft.column() and c <= bottomRight.column()) for c in columns])
-        if needupdate:
-            for row in range(topLeft.row(), bottomRight.row() + 1):
-                index = topLeft.sibling(row, 0)
-                action = self.get_action(index)
-                self.set_action_data(action, index)
+        self._prebuild_queue = None
+        if self._prebuild_timer is not None:
+            self._prebuild_timer.stop()
+        if self._prebuild_filter is not None:
+            app = QtCore.QCoreApplication.instance()
+            if app is not None:
+                app.removeEventFilter(self._prebuild_filter)
+            self._prebuild_filter.deleteLater()
+            self._prebuild_filter = None
 
-    def get_index(self, action, column=0):
-        """Return the index for the given action
+    def _prebuild_step(self, ):
+        """Build menus in the order of their priority until the time budget is used up
 
-        :param action: the action to query
-        :type action: :class:`PySide.QtGui.QAction`
-        :param column: The column of the index
-        :type column: :class:`int`
-        :returns: the index of the action
-        :rtype: :class:`PySide.QtCore.QModelIndex`
-        :rasies: None
-        """
-        if action == self.menuAction():
-            return QtCore.QModelIndex()
-        # find all parents to get their index
-        parents = self._get_parents(action)
-        index = QtCore.QModelIndex()
-        # Move through indexes down the chain
-        for a in reversed(parents):
-            parent = a.parent()
-            # if parent of action is its own menu, get parent of that menu.
-            # We want to know which row the action is in. For that we need
-            # The real parent menu.
-            if parent is a.menu():
-                parent = parent.parent()
-            row = parent.actions().index(a)
-            index = self._model.index(row, 0, index)
-        parent = action.parent()
-        if parent is None:
-            return index
-        if parent is action.menu():
-            parent = parent.parent()
-        row = parent.actions().index(action)
-        index = self._model.index(row, column, index)
-        return index
+        Placeholders are only loaded, while the limits of loaded menus are not exceeded.
 
-    def _get_parents(self, action):
-        parents = []
-        a = action
-        while True:
-            parent = a.parent()
-            # if the parent is the actions menu, we have to get
-            # the menues parent. Else we get stuck on the same level.
-            if parent and parent is a.menu():
-                parent = parent.parent()
-            if not isinstance(parent, QtGui.QMenu):
-                # Is not part of the tree. Parent is not a menu but
-                # might be None or another Widget
-                return []
-            # break if parent is root because we got all parents we need
-            if parent is self:
-                break
-            # a new parent was found and we are still not at root
-            # search further until we get to root
-            parent = parent.menuAction()
-            a = parent
-            parents.append(parent)
-        return parents
+        :returns: None
+        :rtype: None
+        :raises: None
+        """
+        if not self.prebuild:
+            self._stop_prebuild()
+            return
+        end = time.time() + self.prebuild_budget / 1000.0
+        self._prebuild_counts['steps'] += 1
+        if self._prebuild_queue is None:
+            self._prebuild_queue = self._prebuild_candidates()
+        try:
+            for menu in self._prebuild_queue:
+                if menu in self._unloaded and not self._can_load():
+                    continue
+                if self._build_menu(menu):
+                    self._prebuilt.add(menu)
+                    self._prebuild_counts['prebuilt'] += 1
+                    self._unmark_shown(menu)
+                if time.time() >= end:
+                    # let the event loop handle input, before the next step
+                    self._prebuild_timer.start(0)
+                    return
+        except RuntimeError:
+            # a queued menu was deleted by a model change. Start over.
+            self._prebuild_queue = None
+            self._prebuild_timer.start(0)
+            return
+        self._stop_prebuild()
 
-    def get_action(self, index):
-        """Return the action for the given index
+    def _can_load(self, ):
+        """Return True, if one more menu can be loaded without exceeding the limits
 
-        :param index: the index to query
-        :type index: :class:`PySide.QtCore.QModelIndex`
-        :returns: the action for the given index
-        :rtype: :class:`PySide.QtGui.QAction`
+        :returns: True, if a placeholder may be loaded
+        :rtype: :class:`bool`
         :raises: None
         """
-        if not index.isValid():
-            return self.menuAction()
-        parents = self._get_parent_indizes(index)
-        menu = self
-        for i in reversed(parents):
-            action = menu.actions()[i.row()]
-            menu = action.menu()
-        try:
-            return menu.actions()[index.row()]
-        except IndexError:
-            return None
+        if self.max_loaded_menus is not None and len(self._loaded) >= self.max_loaded_menus:
+            return False
+        return not self._exceeds_limits()
 
-    def _get_parent_indizes(self, index):
-        if not index.isValid() or index.model() != self._model:
-            return []
-        parents = []
-        i = index
-        while True:
-            p = i.parent()
-            if not p.isValid():
-                break
-            parents.append(p)
-            i = p
-        return parents
+    def _unmark_shown(self, menu):
+        """Make a prebuilt menu the least recently shown one, because it was not shown yet
 
-    def set_action_data(self, action, index):
-        """Set the data of the action for the given index
+        :param menu: the prebuilt menu
+        :type menu: :class:`PySide.QtGui.QMenu`
+        :returns: None
+        :rtype: None
+        :raises: None
+        """
+        if menu not in self._loaded:
+            return
+        loaded = self._loaded
+        loaded.pop(menu)
+        self._loaded = collections.OrderedDict([(menu, None)])
+        self._loaded.update(loaded)
 
-        .. Note:: The column of the index does not matter. The columns for the data
-                  are specified in :data:`MenuView.setdataargs`.
+    def _prebuild_candidates(self, ):
+        """Yield the submenus to prebuild in the order of their priority
 
-        The arguments to used are defined in :data:`MenuView.setdataargs`.
+        The submenus next to the hovered action come first,
+        then the submenus of the recently shown menus, then all others breadth first.
+        Menus may be yielded, that do not need to be built.
 
-        :param action: The action to update
+        :returns: an iterator over menus
+        :rtype: iterator
+        :raises: None
+        """
+        seen = set()
+        hovered = self._prebuild_hovered
+        if hovered is not None:
+            try:
+                parent = self._get_parent_menu(hovered)
+                actions = parent.actions() if parent is not None else []
+            except RuntimeError:  # the action was deleted
+                actions = []
+            if hovered in actions:
+                row = actions.index(hovered)
+                order = sorted(range(len(actions)), key=lambda i: abs(i - row))
+                actions = [actions[i] for i in order]
+            for action in actions:
+                menu = action.menu()
+                if menu is not None and menu not in seen:
+                    seen.add(menu)
+                    yield menu
+        for shown in reversed(list(self._recent)):
+            for action in shown.actions():
+                menu = action.menu()
+                if menu is not None and menu not in seen:
+                    seen.add(menu)
+                    yield menu
+        queue = collections.deque([self])
+        while queue:
+            parent = queue.popleft()
+            for action in parent.actions():
+                menu = action.menu()
+                if menu is None:
+                    continue
+                if menu not in seen:
+                    seen.add(menu)
+                    yield menu
+                if menu not in self._unloaded:
+                    queue.append(menu)
+
+    def _apply_dirty(self, menu):
+        """Apply the data of all dirty actions of the given menu in one pass
+
+        :param menu: the menu with dirty actions
+        :type menu: :class:`PySide.QtGui.QMenu`
+        :returns: None
+        :rtype: None
+        :raises: None
+        """
+        dirty = self._dirty.pop(menu, None)
+        if not dirty:
+            return
+        if self._source is not None:
+            for action in menu.actions():
+                if action in dirty:
+                    self._apply_node_data(action, self._action_nodes[action])
+            return
+        if not self._model:
+            return
+        parentindex = self.get_index(menu.menuAction())
+        for row, action in enumerate(self._row_actions(menu)):
+            if action not in dirty:
+                continue
+            index = self._model.index(row, 0, parentindex)
+            for args in self.setdataargs:
+                self._set_action_attribute(action, index, args)
+
+    def _discard_action(self, action):
+        """Forget the pending data and the cached index of the action and all of its submenus
+
+        :param action: the action that gets removed
         :type action: :class:`PySide.QtGui.QAction`
-        :param index: The index with the data
-        :type index: :class:`PySide.QtCore.QModelIndex`
         :returns: None
         :rtype: None
         :raises: None
         """
-        self._set_action_enabled(action, index)
-        self._set_action_checkable(action, index)
-        for args in self.setdataargs:
-            self._set_action_attribute(action, index, args)
+        self._hover_indexes.pop(action, None)
+        if not self._watched_menus and not self._sorted:
+            return
+        parentmenu = self._get_parent_menu(action)
+        self._dirty.get(parentmenu, set()).discard(action)
+        menus = [action.menu()]
+        while menus:
+            menu = menus.pop()
+            if menu is None:
+                continue
+            self._forget_menu(menu)
+            menus.extend(a.menu() for a in menu.actions())
+
+    def _forget_menu(self, menu):
+        """Drop all bookkeeping of the given menu
+
+        :param menu: the menu that gets removed
+        :type menu: :class:`PySide.QtGui.QMenu`
+        :returns: None
+        :rtype: None
+        :raises: None
+        """
+        self._dirty.pop(menu, None)
+        self._watched_menus.discard(menu)
+        self._loaded.pop(menu, None)
+        self._unloaded.discard(menu)
+        self._overflow.pop(menu, None)
+        self._prebuilt.discard(menu)
+        self._recent.pop(menu, None)
+        self._prebuild_queue = None
+        self._sorted.pop(menu, None)
+        self._pending_separators.discard(menu)
+
+    def _remove_submenu(self, action):
+        """Remove the menu of the action, so it becomes a plain action
+
+        The action of a menu created by :meth:`MenuView.create_menu` is a child of that menu.
+        It is moved to the menu, which contains it. Else the parents of the
+        action can not be found anymore.
+
+        :param action: the action with a menu
+        :type action: :class:`PySide.QtGui.QAction`
+        :returns: None
+        :rtype: None
+        :raises: None
+        """
+        menu = action.menu()
+        parent = self._get_parent_menu(action)
+        self._forget_menu(menu)
+        action.setMenu(None)
+        if action.parent() is menu:
+            action.setParent(parent)
+            menu.deleteLater()
+
+    def _count_actions(self, action):
+        """Return the number of built actions of the action and its submenus
+
+        :param action: the action to count
+        :type action: :class:`PySide.QtGui.QAction`
+        :returns: the number of actions
+        :rtype: :class:`int`
+        :raises: None
+        """
+        count = 0
+        actions = [action]
+        while actions:
+            a = actions.pop()
+            count += 1
+            menu = a.menu()
+            if menu is not None:
+                actions.extend(self._row_actions(menu))
+        return count
 
     def _set_action_enabled(self, action, index):
         """Enable the action , depending on the item flags
@@ -422,7 +2593,7 @@ class MenuView(QtGui.QMenu):
         :rtype: None
         :raises: None
         """
-        action.setEnabled(index.flags() & QtCore.Qt.ItemIsEnabled)
+        action.setEnabled(bool(index.flags() & QtCore.Qt.ItemIsEnabled))
 
     def _set_action_checkable(self, action, index):
         """Set the action checkable, depending on the item flags
@@ -440,7 +2611,123 @@ class MenuView(QtGui.QMenu):
         """
         checkedindex = index.sibling(index.row(), self.checked_column)
         checkedflags = checkedindex.flags()
-        action.setCheckable(checkedflags & QtCore.Qt.ItemIsUserCheckable)
+        action.setCheckable(bool(checkedflags & QtCore.Qt.ItemIsUserCheckable))
+
+    def _set_action_checked(self, action, index):
+        """Apply only the check state of the index to the action
+
+        In an exclusive group, checking the action unchecks the previously checked one.
+
+        :param action: The action to update
+        :type action: :class:`PySide.QtGui.QAction`
+        :param index: the model index with the check state
+        :type index: :class:`PySide.QtCore.QModelIndex`
+        :returns: None
+        :rtype: None
+        :raises: None
+        """
+        self._set_action_checkable(action, index)
+        for args in self.setdataargs:
+            if args.role == QtCore.Qt.CheckStateRole:
+                self._set_action_attribute(action, index, args)
+
+    def _set_action_group(self, action, index):
+        """Put the action into the exclusive group of its row
+
+        See :data:`MenuView.checkgroup_role`.
+
+        :param action: The action to update
+        :type action: :class:`PySide.QtGui.QAction`
+        :param index: the model index with the group
+        :type index: :class:`PySide.QtCore.QModelIndex`
+        :returns: None
+        :rtype: None
+        :raises: None
+        """
+        current = action.actionGroup()
+        if self.checkgroup_role is None and current is None:
+            return
+        key = None
+        if self.checkgroup_role is not None:
+            key = self.get_data(index, self.checkgroup_role, self.checked_column)
+        group = None
+        if key is not None:
+            group = self._get_group(self._get_parent_menu(action), key)
+        if group is current:
+            return
+        if current is not None:
+            current.removeAction(action)
+        if group is not None:
+            group.addAction(action)
+
+    def _get_group(self, menu, key):
+        """Return the exclusive action group of the menu for the given group value
+
+        The group is created on demand and forgotten, when the menu is destroyed.
+
+        :param menu: the menu of the grouped actions
+        :type menu: :class:`PySide.QtGui.QMenu`
+        :param key: the group value of the rows
+        :returns: the action group
+        :rtype: :class:`PySide.QtGui.QActionGroup`
+        :raises: :class:`TypeError` if the group value is not hashable
+        """
+        groups = self._groups.get(menu)
+        if groups is None:
+            groups = self._groups[menu] = {}
+            if menu is not self:
+                menu.destroyed.connect(functools.partial(self._forget_groups, menu))
+        group = groups.get(key)
+        if group is None:
+            group = groups[key] = QtGui.QActionGroup(menu)
+            group.setExclusive(True)
+            group.triggered.connect(functools.partial(self._group_triggered, menu, group))
+        return group
+
+    def _forget_groups(self, menu, *args):
+        """Forget the action groups of the destroyed menu
+
+        :param menu: the destroyed menu
+        :type menu: :class:`PySide.QtGui.QMenu`
+        :returns: None
+        :rtype: None
+        :raises: None
+        """
+        self._groups.pop(menu, None)
+
+    def _group_triggered(self, menu, group, action):
+        """Write the check states of the group back to the model
+
+        Only rows, whose check state differs from their action, are set.
+        Rows are unchecked first, so the model never has two checked rows of the group.
+
+        :param menu: the menu of the group
+        :type menu: :class:`PySide.QtGui.QMenu`
+        :param group: the group of the triggered action
+        :type group: :class:`PySide.QtGui.QActionGroup`
+        :param action: the triggered action
+        :type action: :class:`PySide.QtGui.QAction`
+        :returns: None
+        :rtype: None
+        :raises: None
+        """
+        m = self._model
+        if not m:
+            return
+        Qt = QtCore.Qt
+        parentindex = self.get_index(menu.menuAction())
+        unchecked, checked = [], []
+        for row, a in enumerate(self._row_actions(menu)):
+            if a.actionGroup() is not group:
+                continue
+            index = m.index(row, self.checked_column, parentindex)
+            if self._checkconvertfunc(index.data(Qt.CheckStateRole)) == a.isChecked():
+                continue
+            (checked if a.isChecked() else unchecked).append(index)
+        for index in unchecked:
+            m.setData(index, Qt.Unchecked, Qt.CheckStateRole)
+        for index in checked:
+            m.setData(index, Qt.Checked, Qt.CheckStateRole)
 
     def _set_action_attribute(self, action, index, setdataarg):
         """Query the data of index and use it to set an attribute on action.
@@ -467,10 +2754,30 @@ class MenuView(QtGui.QMenu):
         data = self.get_data(index, setdataarg.role, column)
         if data is None:
             return
-        setattrmethod = getattr(action, setdataarg.setfunc)
         if setdataarg.convertfunc:
             data = setdataarg.convertfunc(data)
-        setattrmethod(data)
+        self._apply_value(action, setdataarg.setfunc, data)
+
+    def _apply_value(self, action, setfunc, value):
+        """Call the setter of the action with the converted value
+
+        A :class:`qmenuview.icons.PendingIcon` is handed to the icon loader.
+        See :data:`MenuView.icon_loader`.
+
+        :param action: the action to update
+        :type action: :class:`PySide.QtGui.QAction`
+        :param setfunc: the name of the setter
+        :type setfunc: :class:`str`
+        :param value: the converted value
+        :returns: None
+        :rtype: None
+        :raises: None
+        """
+        if isinstance(value, PendingIcon):
+            loader = self.icon_loader or shared_loader()
+            loader.load(action, value.data, setfunc)
+        else:
+            getattr(action, setfunc)(value)
 
     @staticmethod
     def get_data(index, role, column=None):
@@ -503,7 +2810,79 @@ class MenuView(QtGui.QMenu):
         :rtype: None
         :raises: None
         """
-        self._emit_signal_for_action(self.action_hovered, action)
+        if self.prebuild:
+            self._prebuild_hovered = action
+            self._prebuild_queue = None
+            self._schedule_prebuild()
+        if not self.hover_delay:
+            self._emit_hovered(action)
+            return
+        self._hovered_action = action
+        if self._hover_timer is None:
+            self._hover_timer = QtCore.QTimer(self)
+            self._hover_timer.setSingleShot(True)
+            self._hover_timer.timeout.connect(self._hover_settled)
+        self._hover_timer.start(self.hover_delay)
+
+    def _hover_settled(self, ):
+        """Emit the hovered signal for the action, that stayed hovered for the delay
+
+        :returns: None
+        :rtype: None
+        :raises: None
+        """
+        action, self._hovered_action = self._hovered_action, None
+        if action is None:
+            return
+        try:
+            self._emit_hovered(action)
+        except RuntimeError:
+            # the action was deleted during the delay
+            pass
+
+    def _emit_hovered(self, action):
+        """Emit the hovered signal for the action with the cached index
+
+        :param action: the hovered action
+        :type action: :class:`PySide.QtGui.QAction`
+        :returns: None
+        :rtype: None
+        :raises: None
+        """
+        if self._source is not None:
+            self._emit_signal_for_node(self.node_hovered, action)
+            return
+        if not self._model:
+            return
+        index = self._hovered_index(action)
+        if index.isValid():
+            self.action_hovered.emit(index)
+
+    def _hovered_index(self, action):
+        """Return the index of the hovered action from the cache or compute it
+
+        The cache holds persistent indizes, so they follow inserted rows.
+        Indizes of removed rows get invalid and are computed again.
+
+        :param action: the hovered action
+        :type action: :class:`PySide.QtGui.QAction`
+        :returns: the index of the action
+        :rtype: :class:`PySide.QtCore.QModelIndex`
+        :raises: None
+        """
+        cached = self._hover_indexes.get(action)
+        if cached is not None and cached.isValid():
+            # sibling converts to a model index with every binding
+            return cached.sibling(cached.row(), cached.column())
+        index = self.get_index(action)
+        if not index or not index.isValid():
+            return QtCore.QModelIndex()
+        if len(self._hover_indexes) >= _HOVER_CACHE:
+            self._hover_indexes = dict((a, i) for a, i in self._hover_indexes.items() if i.isValid())
+            if len(self._hover_indexes) >= _HOVER_CACHE:
+                self._hover_indexes.clear()
+        self._hover_indexes[action] = QtCore.QPersistentModelIndex(index)
+        return index
 
     def _action_triggered(self, action, checked=False):
         """Emit the triggered signal
@@ -516,7 +2895,10 @@ class MenuView(QtGui.QMenu):
         :rtype: None
         :raises: None
         """
-        self._emit_signal_for_action(self.action_triggered, action, checked)
+        if self._source is not None:
+            self._emit_signal_for_node(self.node_triggered, action, checked)
+        else:
+            self._emit_signal_for_action(self.action_triggered, action, checked)
 
     def _action_toggled(self, action, checked=False):
         """Emit the toggled signal
@@ -529,7 +2911,10 @@ class MenuView(QtGui.QMenu):
         :rtype: None
         :raises: None
         """
-        self._emit_signal_for_action(self.action_toggled, action, checked)
+        if self._source is not None:
+            self._emit_signal_for_node(self.node_toggled, action, checked)
+        else:
+            self._emit_signal_for_action(self.action_toggled, action, checked)
 
     def _emit_signal_for_action(self, signal, action, *args):
         """Emit the given signal for the index of the given action
@@ -542,48 +2927,54 @@ class MenuView(QtGui.QMenu):
         :rtype: None
         :raises: None
         """
+        if not self._model:
+            # e.g. actions restored from a snapshot
+            return
         index = self.get_index(action)
         if index and index.isValid():
             signal.emit(index, *args)
 
-    @staticmethod
-    def _process_icondata(icondata):
-        """Return an icon for the data of the :data:`PySide.QtCore.Qt.DecorationRole`
+    def _emit_signal_for_node(self, signal, action, *args):
+        """Emit the given signal for the source node of the given action
 
-        :param icondata: The data from the :data:`PySide.QtCore.Qt.DecorationRole`
-        :type icondata: :class:`PySide.QtGui.QIcon` | :class:`PySide.QtGui.QPixmap`
-        :returns: A Icon based on the data.
-        :rtype: :class:`PySide.QtGui.QIcon`
+        :param signal: The signal to emit
+        :type signal: :class:`PySide.QtCore.Signal`
+        :param action: The action for which to emit the signal
+        :type action: :class:`PySide.QtGui.QAction`
+        :returns: None
+        :rtype: None
         :raises: None
         """
-        if isinstance(icondata, QtGui.QIcon):
-            return icondata
-        if isinstance(icondata, QtGui.QPixmap):
-            return QtGui.QIcon(icondata)
+        if action in self._action_nodes:
+            signal.emit(self._action_nodes[action], *args)
 
-    @staticmethod
-    def _checkconvertfunc(data):
-        checkedstate = int(data) if data is not None else 0
-        return checkedstate == QtCore.Qt.Checked
 
+class _InputFilter(QtCore.QObject):
+    """An application event filter, that calls a function on user input"""
 
-class SetDataArgs(object):
-    """A container of arguments for setting attributes on an action.
+    INPUT = (QtCore.QEvent.KeyPress, QtCore.QEvent.MouseButtonPress,
+             QtCore.QEvent.MouseMove, QtCore.QEvent.Wheel)
+    """The event types of user input"""
 
-    The data is queried from the model with ``role``. Then converted with ``convertfunc``.
-    Then ``setfunc`` is used for setting the attribute on the action.
-    ``convertfunc`` can be ``None``.
+    def __init__(self, callback, parent=None):
+        """Initialize a new filter
 
-    If column is a string, the attribute of the view with that name will be used as column.
-    """
+        :param callback: the function to call on user input
+        :type callback: callable
+        :param parent: the parent object
+        :type parent: :class:`PySide.QtCore.QObject`
+        :raises: None
+        """
+        super(_InputFilter, self).__init__(parent)
+        self.callback = callback
 
-    def __init__(self, setfunc, column, role, convertfunc):
-        """Initialize a new container
+    def eventFilter(self, obj, event):
+        """Call the callback for user input. Never filters the event.
 
+        :returns: False
+        :rtype: :class:`bool`
         :raises: None
         """
-        super(SetDataArgs, self).__init__()
-        self.setfunc = setfunc
-        self.column = column
-        self.role = role
-        self.convertfunc = convertfunc
+        if event.type() in self.INPUT:
+            self.callback()
+        return False
@@ -0,0 +1,359 @@
+"""Report handlers of a :class:`qmenuview.MenuView`, that block the event loop too long
+
+A :class:`Watchdog` measures the wall time of the model signal handlers, the source
+handlers and the population of submenus, when they are about to show.
+If a run exceeds its budget, a report is logged on the ``qmenuview.watchdog`` channel,
+emitted with :data:`Watchdog.stalled` and kept in a ring buffer::
+
+  dog = Watchdog(budget=50, show_budget=16)
+  dog.attach(view)
+  dog.stalled.connect(send_telemetry)
+"""
+import collections
+import inspect
+import logging
+import sys
+import threading
+import time
+import traceback
+
+from .qt import QtCore
+
+__all__ = ['Watchdog']
+
+log = logging.getLogger('qmenuview.watchdog')
+
+try:
+    _getargspec = inspect.getfullargspec
+except AttributeError:  # python 2
+    _getargspec = inspect.getargspec
+
+HANDLERS = ['reset', 'insert_menus', 'remove_menus', 'update_menus',
+            'insert_nodes', 'remove_nodes', 'update_nodes']
+"""The handlers of the view, that are measured with the handler budget"""
+SHOW_HANDLERS = {'_load_menu': 'load_menu', '_apply_dirty': 'apply_dirty'}
+"""The methods, that populate a submenu on show, and their operation names"""
+FACTORIES = ['create_action', 'create_menu']
+"""The factories of the view, that are counted as created nodes"""
+
+
+class _Sampler(object):
+    """Takes a stack sample of a thread, if an operation is still running at its deadline"""
+
+    def __init__(self, thread_id):
+        """Initialize a new sampler for the given thread
+
+        :param thread_id: the id of the thread to sample
+        :type thread_id: :class:`int`
+        :raises: None
+        """
+        super(_Sampler, self).__init__()
+        self._thread_id = thread_id
+        self._cond = threading.Condition()
+        self._armed = None
+        self._sample = None
+        self._thread = None
+        self._stopped = False
+
+    def arm(self, token, deadline):
+        """Sample the thread at the deadline, unless it is disarmed before
+
+        :param token: identifies the operation
+        :param deadline: the time of the sample
+        :type deadline: :class:`float`
+        :returns: None
+        :rtype: None
+        :raises: None
+        """
+        with self._cond:
+            if self._thread is None:
+                self._stopped = False
+                self._thread = threading.Thread(target=self._run)
+                self._thread.daemon = True
+                self._thread.start()
+            self._armed = (token, deadline)
+            self._sample = None
+            self._cond.notify()
+
+    def disarm(self, token):
+        """Cancel the sample and return it, if it was taken
+
+        :param token: identifies the operation
+        :returns: the formatted stack or None
+        :rtype: :class:`list` of :class:`str` | None
+        :raises: None
+        """
+        with self._cond:
+            if self._armed is not None and self._armed[0] is token:
+                self._armed = None
+            sample, self._sample = self._sample, None
+            return sample
+
+    def stop(self, ):
+        """Stop the thread and wait for it. The next :meth:`_Sampler.arm` starts a new one.
+
+        :returns: None
+        :rtype: None
+        :raises: None
+        """
+        with self._cond:
+            thread, self._thread = self._thread, None
+            self._stopped = True
+            self._armed = None
+            self._cond.notify()
+        if thread is not None:
+            thread.join()
+
+    def _run(self, ):
+        """Wait for deadlines and take the samples, until the sampler is stopped
+
+        :returns: None
+        :rtype: None
+        :raises: None
+        """
+        with self._cond:
+            while not self._stopped:
+                if self._armed is None:
+                    self._cond.wait()
+                    continue
+                remaining = self._armed[1] - time.time()
+                if remaining > 0:
+                    self._cond.wait(remaining)
+                    continue
+                frame = sys._current_frames().get(self._thread_id)
+                self._sample = traceback.format_stack(frame) if frame is not None else None
+                self._armed = None
+
+
+class Watchdog(QtCore.QObject):
+    """Measures the handlers of views and reports runs, that exceed a budget.
+
+    Each report is a dictionary with these keys:
+
+      ``operation``
+        the name of the handler, e.g. ``'insert_menus'`` or ``'load_menu'``
+      ``first``, ``last``
+        the row range or None
+      ``nodes``
+        the number of actions, that were created
+      ``elapsed``, ``budget``
+        the wall time and the budget in milliseconds
+      ``stack``
+        the formatted stack of the GUI thread, sampled when the budget ran out.
+        If no sample could be taken, the stack of the call.
+      ``time``
+        the time of the report
+
+    Only the outermost measured operation is reported, if they are nested.
+    """
+
+    stalled = QtCore.Signal(object)
+    """Signal for when an operation exceeded its budget. Emits the report."""
+
+    def __init__(self, budget=50, show_budget=None, size=100, parent=None):
+        """Initialize a new watchdog
+
+        :param budget: the budget for handlers in milliseconds
+        :type budget: :class:`float`
+        :param show_budget: the budget for populating a submenu in milliseconds.
+                            Default is ``budget``.
+        :type show_budget: :class:`float` | None
+        :param size: the number of recent reports, that are kept
+        :type size: :class:`int`
+        :param parent: the parent object
+        :type parent: :class:`PySide.QtCore.QObject`
+        :raises: None
+        """
+        super(Watchdog, self).__init__(parent)
+        self.budget = budget
+        """The budget for handlers in milliseconds"""
+        self.show_budget = budget if show_budget is None else show_budget
+        """The budget for populating a submenu in milliseconds"""
+        self._recent = collections.deque(maxlen=size)
+        self._views = []
+        self._running = None
+        self._nodes = 0
+        self._sampler = _Sampler(threading.current_thread().ident)
+
+    def recent(self, ):
+        """Return the recent reports, the oldest first
+
+        :returns: the reports
+        :rtype: :class:`list` of :class:`dict`
+        :raises: None
+        """
+        return list(self._recent)
+
+    def clear(self, ):
+        """Forget the recent reports
+
+        :returns: None
+        :rtype: None
+        :raises: None
+        """
+        self._recent.clear()
+
+    def close(self, ):
+        """Stop the thread, that samples the stack
+
+        :meth:`Watchdog.detach` calls this, when the last view is detached.
+        Attaching a view again starts a new thread on the first measured run.
+
+        :returns: None
+        :rtype: None
+        :raises: None
+        """
+        self._sampler.stop()
+
+    def attach(self, view):
+        """Start measuring the handlers of the view
+
+        The handlers are replaced by measuring wrappers on the instance.
+        A connected model is reconnected to the wrappers.
+
+        :param view: the view to watch
+        :type view: :class:`qmenuview.MenuView`
+        :returns: None
+        :rtype: None
+        :raises: None
+        """
+        if view in self._views:
+            return
+        connected, model = self._disconnect(view)
+        for name in HANDLERS:
+            setattr(view, name, self._wrap(view, getattr(view, name), name, False))
+        for name, operation in SHOW_HANDLERS.items():
+            setattr(view, name, self._wrap(view, getattr(view, name), operation, True))
+        for name in FACTORIES:
+            setattr(view, name, self._count(getattr(view, name)))
+        if connected:
+            view._connect_model(model)
+        self._views.append(view)
+
+    def detach(self, view):
+        """Stop measuring the handlers of the view
+
+        If it was the last view, the watchdog is closed. See :meth:`Watchdog.close`.
+
+        :param view: the watched view
+        :type view: :class:`qmenuview.MenuView`
+        :returns: None
+        :rtype: None
+        :raises: None
+        """
+        if view not in self._views:
+            return
+        connected, model = self._disconnect(view)
+        for name in HANDLERS + list(SHOW_HANDLERS) + FACTORIES:
+            delattr(view, name)
+        if connected:
+            view._connect_model(model)
+        self._views.remove(view)
+        if not self._views:
+            self.close()
+
+    def _disconnect(self, view):
+        """Disconnect the model of the view, so it can be connected to other handlers
+
+        A model, that is not connected yet, because it is reconciled, is ignored.
+
+        :param view: the view
+        :type view: :class:`qmenuview.MenuView`
+        :returns: True, if the model was disconnected, and the model
+        :rtype: :class:`tuple`
+        :raises: None
+        """
+        if view._reconcile_queue is not None:
+            return False, None
+        model = view.model
+        view._connect_model(None)
+        return True, model
+
+    def _count(self, factory):
+        """Return a wrapper of the factory, that counts the created nodes
+
+        :param factory: the bound factory
+        :type factory: callable
+        :returns: the wrapper
+        :rtype: callable
+        :raises: None
+        """
+        def wrapper(*args):
+            self._nodes += 1
+            return factory(*args)
+        return wrapper
+
+    def _wrap(self, view, func, operation, show):
+        """Return a wrapper of the handler, that measures it
+
+        :param view: the view of the handler
+        :type view: :class:`qmenuview.MenuView`
+        :param func: the bound handler
+        :type func: callable
+        :param operation: the name in the reports
+        :type operation: :class:`str`
+        :param show: True for the population of a submenu
+        :type show: :class:`bool`
+        :returns: the wrapper
+        :rtype: callable
+        :raises: None
+        """
+        spec = _getargspec(func)
+        # newer bindings pass more arguments, e.g. the roles of dataChanged
+        count = None if spec.varargs else len(spec.args) - 1
+
+        def wrapper(*args):
+            args = args[:count]
+            if self._running is not None:
+                return func(*args)
+            budget = self.show_budget if show else self.budget
+            token = self._running = object()
+            self._nodes = 0
+            start = time.time()
+            self._sampler.arm(token, start + budget / 1000.0)
+            try:
+                return func(*args)
+            finally:
+                elapsed = (time.time() - start) * 1000.0
+                sample = self._sampler.disarm(token)
+                self._running = None
+                if elapsed > budget:
+                    self._report(view, operation, args, elapsed, budget, sample)
+        return wrapper
+
+    def _report(self, view, operation, args, elapsed, budget, stack):
+        """Create, log and emit a report
+
+        :param view: the view of the operation
+        :type view: :class:`qmenuview.MenuView`
+        :param operation: the name of the operation
+        :type operation: :class:`str`
+        :param args: the arguments of the handler
+        :type args: :class:`tuple`
+        :param elapsed: the wall time in milliseconds
+        :type elapsed: :class:`float`
+        :param budget: the budget in milliseconds
+        :type budget: :class:`float`
+        :param stack: the sampled stack or None
+        :type stack: :class:`list` of :class:`str` | None
+        :returns: None
+        :rtype: None
+        :raises: None
+        """
+        first = last = None
+        if len(args) >= 2 and isinstance(args[1], QtCore.QModelIndex):
+            first, last = args[0].row(), args[1].row()
+        elif len(args) == 3:
+            first, last = args[1], args[2]
+        elif operation == 'load_menu':
+            first, last = 0, len(args[0].actions()) - 1
+        if stack is None:
+            # skip the frames of the watchdog
+            stack = traceback.format_stack()[:-2]
+        report = {'operation': operation, 'first': first, 'last': last, 'nodes': self._nodes,
+                  'elapsed': elapsed, 'budget': budget, 'stack': stack, 'time': time.time()}
+        self._recent.append(report)
+        log.warning("%s of %r took %.1f ms (budget %.1f ms), rows %s-%s, %s nodes",
+                    operation, view.title(), elapsed, budget, first, last, self._nodes,
+                    extra={'report': report})
+        self.stalled.emit(report)
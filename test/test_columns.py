@@ -0,0 +1,74 @@
+import pytest
+
+import qmenuview
+from qmenuview import columns
+from qmenuview.qt import QtGui
+
+
+@pytest.fixture(scope='function', autouse=True)
+def useqtbot(qtbot):
+    pass
+
+
+class Recorder(columns.DataColumns):
+
+    def __init__(self, ):
+        self.changed = []
+        self._init_data_columns()
+
+    def _data_args_changed(self, setdataargs, cleared=()):
+        self.changed.append([args.setfunc for args in setdataargs])
+        self.cleared = cleared
+
+
+def test_defaults():
+    rec = Recorder()
+    assert rec._data_columns() == [0, 0, -1, 0, 0, 0, 0]
+    assert [args.setfunc for args in rec.setdataargs] ==\
+        ['setText', 'setIcon', 'setIconText', 'setToolTip', 'setChecked', 'setWhatsThis', 'setStatusTip']
+    assert rec.changed == [], "Setting the defaults should not report changes."
+
+
+def test_changes():
+    rec = Recorder()
+    rec.tooltip_column = 0
+    assert rec.changed == []
+    rec.tooltip_column = 1
+    assert rec.changed == [['setToolTip']]
+    args = qmenuview.SetDataArgs('setData', 'text_column', 32, None)
+    rec.setdataargs = rec.setdataargs + [args]
+    assert rec.changed[-1] == ['setData']
+    assert rec.cleared == []
+
+
+def test_changes_diff():
+    rec = Recorder()
+    args = qmenuview.SetDataArgs('setData', 'text_column', 32, None)
+    rec.setdataargs.append(args)
+    rec.setdataargs = rec.setdataargs
+    assert rec.changed == [['setData']], "Containers appended in place should be reported."
+    rec.setdataargs = rec.setdataargs
+    assert len(rec.changed) == 1, "Assigning an unchanged list should not report changes."
+    args.role = 33
+    rec.setdataargs = rec.setdataargs
+    assert rec.changed[-1] == ['setData'], "Containers changed in place should be reported."
+    rec.setdataargs = rec.setdataargs[:-1]
+    assert rec.changed[-1] == []
+    assert rec.cleared == ['setData']
+    extra = qmenuview.SetDataArgs('setText', 'icon_column', 32, None)
+    rec.setdataargs = rec.setdataargs + [extra]
+    rec.setdataargs = rec.setdataargs[:-1]
+    assert rec.changed[-1] == ['setText'], \
+        "Containers sharing the setter of a removed one should be reported."
+    assert rec.cleared == []
+
+
+def test_shared_by_view_and_store():
+    model = QtGui.QStandardItemModel()
+    store = qmenuview.MenuStore(model)
+    view = qmenuview.MenuView()
+    for obj in (store, view):
+        assert isinstance(obj, columns.DataColumns)
+        assert obj._data_columns() == [0, 0, -1, 0, 0, 0, 0]
+    store.text_column = 1
+    assert view.text_column == 0
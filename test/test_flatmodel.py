@@ -0,0 +1,116 @@
+import pytest
+
+import qmenuview
+from qmenuview import flatmodel
+from qmenuview.qt import QtCore
+
+
+@pytest.fixture(scope='function', autouse=True)
+def useqtbot(qtbot):
+    pass
+
+
+@pytest.fixture(scope='function')
+def model():
+    return flatmodel.FlatListModel([u'zero', u'one', u'\xfcml\xe4ut'])
+
+
+def test_data(model):
+    assert model.rowCount() == 3
+    assert model.rowCount(model.index(0, 0)) == 0
+    assert [model.index(i, 0).data() for i in range(3)] == [u'zero', u'one', u'\xfcml\xe4ut']
+    index = model.index(1, 0)
+    assert index.data(QtCore.Qt.ToolTipRole) is None
+    assert index.data(QtCore.Qt.CheckStateRole) is None
+    assert model.flags(index) & QtCore.Qt.ItemIsEnabled
+    assert not model.flags(index) & QtCore.Qt.ItemIsUserCheckable
+
+
+def test_append_one_signal(qtbot, model):
+    with qtbot.waitSignal(model.rowsInserted) as blocker:
+        model.append([u'a', u'b'], tooltips=[u'tip a', None],
+                     flags=[flatmodel.ENABLED | flatmodel.CHECKABLE, 0])
+    assert blocker.args[1:] == [3, 4]
+    assert model.rowCount() == 5
+    assert model.index(3, 0).data(QtCore.Qt.ToolTipRole) == u'tip a'
+    assert model.index(4, 0).data(QtCore.Qt.ToolTipRole) is None
+    assert model.index(0, 0).data(QtCore.Qt.ToolTipRole) is None
+    assert model.index(3, 0).data(QtCore.Qt.CheckStateRole) == QtCore.Qt.Unchecked
+    assert not model.flags(model.index(4, 0)) & QtCore.Qt.ItemIsEnabled
+
+
+def test_insert_remove(model):
+    model.insert(1, [u'x', u'y'], statustips=[u's1', u's2'])
+    assert [model.index(i, 0).data() for i in range(5)] == [u'zero', u'x', u'y', u'one', u'\xfcml\xe4ut']
+    assert model.index(2, 0).data(QtCore.Qt.StatusTipRole) == u's2'
+    assert model.index(3, 0).data(QtCore.Qt.StatusTipRole) is None
+    model.remove(1, 3)
+    assert [model.index(i, 0).data() for i in range(2)] == [u'zero', u'\xfcml\xe4ut']
+    assert model.index(1, 0).data(QtCore.Qt.StatusTipRole) is None
+    with pytest.raises(IndexError):
+        model.remove(1, 2)
+    with pytest.raises(ValueError):
+        model.append([u'a'], tooltips=[])
+
+
+def test_update_one_signal(qtbot, model):
+    with qtbot.waitSignal(model.dataChanged) as blocker:
+        model.update(1, texts=[u'ONE', u'TWO'], flags=[flatmodel.CHECKABLE | flatmodel.CHECKED, 0])
+    assert (blocker.args[0].row(), blocker.args[1].row()) == (1, 2)
+    assert [model.index(i, 0).data() for i in range(3)] == [u'zero', u'ONE', u'TWO']
+    assert model.index(1, 0).data(QtCore.Qt.CheckStateRole) == QtCore.Qt.Checked
+    with pytest.raises(IndexError):
+        model.update(2, texts=[u'a', u'b'])
+
+
+def test_set_data(model):
+    model.update(0, flags=[flatmodel.ENABLED | flatmodel.CHECKABLE])
+    index = model.index(0, 0)
+    assert model.setData(index, QtCore.Qt.Checked, QtCore.Qt.CheckStateRole)
+    assert index.data(QtCore.Qt.CheckStateRole) == QtCore.Qt.Checked
+    assert model.setData(index, u'renamed')
+    assert index.data() == u'renamed'
+    assert model.index(1, 0).data() == u'one'
+    assert not model.setData(index, u'x', QtCore.Qt.WhatsThisRole)
+    assert not model.setData(index, 42), "Values, that are no text, should be rejected."
+    assert index.data() == u'renamed'
+
+
+def test_replace_texts():
+    column = flatmodel._TextColumn()
+    column.insert(0, [u'aa', u'bb', u'\xfcml', u'dd'])
+    offsets = column.offsets
+    column.replace(1, [u'xy'])
+    assert column.offsets is offsets
+    assert list(column.offsets) == [0, 2, 4, 8, 10], "Equal lengths should only patch the bytes."
+    column.replace(1, [u'longer', None])
+    assert [column.get(i) for i in range(4)] == [u'aa', u'longer', u'', u'dd']
+    assert list(column.offsets) == [0, 2, 8, 8, 10]
+    column.replace(3, [u'e'])
+    assert [column.get(i) for i in range(4)] == [u'aa', u'longer', u'', u'e']
+    assert len(column.data) == 9
+
+
+def test_replace(qtbot, model):
+    with qtbot.waitSignal(model.modelReset):
+        model.replace([u'new'])
+    assert model.rowCount() == 1
+    assert model.index(0, 0).data() == u'new'
+
+
+def test_view(model):
+    view = qmenuview.MenuView()
+    view.model = model
+    model.append([u'row%s' % i for i in range(100)])
+    actions = view.actions()
+    assert len(actions) == 103
+    assert actions[-1].text() == u'row99'
+    model.insert(1, [u'inserted'])
+    assert view.actions()[1].text() == u'inserted'
+    model.update(0, texts=[u'a', u'b'], flags=[flatmodel.CHECKABLE | flatmodel.CHECKED, 0])
+    actions = view.actions()
+    assert actions[0].text() == u'a'
+    assert actions[0].isChecked()
+    assert not actions[1].isEnabled()
+    model.remove(2, 103)
+    assert [a.text() for a in view.actions()] == [u'a', u'b']
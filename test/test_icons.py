@@ -0,0 +1,110 @@
+import pytest
+
+import qmenuview
+from qmenuview import icons
+from qmenuview.qt import QtCore, QtGui
+
+
+@pytest.fixture(scope='function', autouse=True)
+def useqtbot(qtbot):
+    pass
+
+
+def png(color):
+    image = QtGui.QImage(8, 8, QtGui.QImage.Format_ARGB32)
+    image.fill(QtGui.QColor(color))
+    buf = QtCore.QBuffer()
+    buf.open(QtCore.QIODevice.WriteOnly)
+    image.save(buf, 'PNG')
+    return bytes(buf.data().data())
+
+
+@pytest.fixture(scope='function')
+def loader():
+    return icons.IconLoader()
+
+
+def test_process_icondata_pending():
+    assert isinstance(qmenuview.MenuView._process_icondata('icon.png'), icons.PendingIcon)
+    assert isinstance(qmenuview.MenuView._process_icondata(png('red')), icons.PendingIcon)
+    assert isinstance(qmenuview.MenuView._process_icondata(':/open.svg'), icons.PendingIcon)
+
+
+def test_process_icondata_theme_name():
+    icon = qmenuview.MenuView._process_icondata('document-open')
+    assert isinstance(icon, QtGui.QIcon), "Theme names should not be read as file paths."
+    assert icons.PendingIcon.is_theme_name('document-open')
+    assert not icons.PendingIcon.is_theme_name('icons/open')
+    assert not icons.PendingIcon.is_theme_name(b'document-open' if bytes is not str else bytearray())
+
+
+def test_load_bytes(qtbot, loader):
+    action = QtGui.QAction(None)
+    loader.load(action, png('red'))
+    assert action.icon().cacheKey() == loader.placeholder.cacheKey()
+    assert loader.pending() == 1
+    qtbot.waitUntil(lambda: not loader.pending())
+    assert not action.icon().isNull()
+
+
+def test_load_deduplicates(qtbot, loader, tmpdir):
+    data = png('red')
+    path1 = tmpdir.join('a.png')
+    path2 = tmpdir.join('b.png')
+    path1.write(data, 'wb')
+    path2.write(data, 'wb')
+    actions = [QtGui.QAction(None) for i in range(3)]
+    loader.load(actions[0], str(path1))
+    loader.load(actions[1], str(path2))
+    qtbot.waitUntil(lambda: not loader.pending())
+    # cached, so it is set right away
+    loader.load(actions[2], data)
+    assert not loader.pending()
+    keys = set(a.icon().cacheKey() for a in actions)
+    assert len(keys) == 1
+
+
+def test_load_replaced_request(qtbot, loader):
+    action = QtGui.QAction(None)
+    loader.load(action, png('red'))
+    loader.load(action, png('blue'))
+    qtbot.waitUntil(lambda: not loader.pending())
+    blue = QtGui.QAction(None)
+    loader.load(blue, png('blue'))
+    assert action.icon().cacheKey() == blue.icon().cacheKey()
+
+
+def test_view_decodes_icons(qtbot):
+    m = QtGui.QStandardItemModel()
+    item = QtGui.QStandardItem('a')
+    item.setData(png('red'), QtCore.Qt.DecorationRole)
+    m.appendRow(item)
+    mv = qmenuview.MenuView()
+    mv.icon_loader = icons.IconLoader(mv)
+    mv.model = m
+    assert mv.actions()[0].icon().cacheKey() == mv.icon_loader.placeholder.cacheKey()
+    qtbot.waitUntil(lambda: not mv.icon_loader.pending())
+    assert not mv.actions()[0].icon().isNull()
+
+
+def test_placeholder(loader):
+    placeholder = loader.placeholder
+    assert not placeholder.isNull()
+    size = QtGui.QApplication.style().pixelMetric(QtGui.QStyle.PM_SmallIconSize)
+    image = placeholder.pixmap(size, size).toImage()
+    assert image.width() == size
+    assert image.pixel(0, 0) >> 24 == 0, "The placeholder should be transparent."
+    icon = QtGui.QIcon(QtGui.QPixmap(4, 4))
+    loader.placeholder = icon
+    action = QtGui.QAction(None)
+    loader.load(action, png('green'))
+    assert action.icon().cacheKey() == icon.cacheKey()
+
+
+def test_is_cached_while_finishing(loader):
+    digest = 'abc'
+    assert not loader._is_cached(digest)
+    loader._finish(digest, digest, None)
+    assert loader._is_cached(digest)
+    loader.clear()
+    assert not loader._is_cached(digest)
@@ -0,0 +1,95 @@
+import json
+
+import pytest
+
+import qmenuview
+from qmenuview import memory
+
+
+@pytest.fixture(scope='function', autouse=True)
+def useqtbot(qtbot):
+    pass
+
+
+def test_model_shapes():
+    flat = memory._model(10, None)
+    assert flat.rowCount() == 10
+    deep = memory._model(10, 2)
+    assert deep.rowCount() == 2
+    assert deep.item(0).rowCount() == 2
+    assert deep.item(0).child(0).rowCount() == 2
+
+
+@pytest.mark.parametrize('option', list(memory.OPTIONS))
+def test_measure(option):
+    result = memory.measure(40, 'deep', option)
+    assert result['rows'] == 40
+    assert result['option'] == option
+    if option == 'max_depth':
+        # the submenus of the top level are placeholders
+        assert result['actions'] == 4
+        assert result['menus'] == 4
+    elif option == 'max_loaded_menus':
+        # opening all menus unloads the least recently shown ones
+        assert result['actions'] < 40
+        assert result['menus'] <= 9
+    else:
+        assert result['actions'] == 40
+        assert result['menus'] == 9
+    assert result['rss'] is not None
+
+
+def test_run():
+    result = memory.run([50], options=['default', 'defer_data'])
+    assert len(result['measurements']) == 2 * len(memory.SHAPES)
+    assert [(n['option'], n['shape']) for n in result['nodes']] == \
+        [('default', 'wide'), ('default', 'deep'), ('defer_data', 'wide'), ('defer_data', 'deep')]
+    for node in result['nodes']:
+        assert set(memory.METRICS) <= set(node)
+    json.dumps(result)
+
+
+def test_per_node():
+    flat = {'actions': 10, 'menus': 0, 'python': 1000, 'rss': None}
+    tree = {'actions': 10, 'menus': 2, 'python': 1400, 'rss': None}
+    assert memory._per_node(flat, tree, 'python') == (100.0, 200.0)
+    assert memory._per_node(flat, tree, 'rss') == (None, None)
+
+
+def test_compare():
+    node = {'option': 'default', 'rows': 100, 'shape': 'deep',
+            'python_per_action': 100.0, 'python_per_menu': 200.0,
+            'rss_per_action': None, 'rss_per_menu': None}
+    baseline = {'nodes': [node]}
+    grown = dict(node, python_per_menu=250.0)
+    assert memory.compare({'nodes': [node]}, baseline) == []
+    assert memory.compare({'nodes': [dict(node, python_per_menu=210.0)]}, baseline) == []
+    regressions = memory.compare({'nodes': [grown]}, baseline)
+    assert len(regressions) == 1
+    assert 'python_per_menu' in regressions[0]
+
+
+def test_main(tmpdir):
+    output = str(tmpdir.join('memory.json'))
+    assert memory.main(['--sizes', '20', '--options', 'default', '--output', output]) == 0
+    with open(output) as f:
+        result = json.load(f)
+    assert result['nodes']
+    baseline = str(tmpdir.join('baseline.json'))
+    for node in result['nodes']:
+        for metric in memory.METRICS:
+            if node[metric] is not None:
+                node[metric] = 1.0
+    with open(baseline, 'w') as f:
+        json.dump(result, f)
+    assert memory.main(['--sizes', '20', '--options', 'default', '--output', output,
+                        '--baseline', baseline, '--tolerance', '0']) == 1
+
+
+def test_open_all_unloads():
+    mv = qmenuview.MenuView()
+    mv.max_loaded_menus = 2
+    mv.model = memory._model(40, 4)
+    memory._open_all(mv)
+    assert mv.lru_stats['loaded_menus'] <= 2
+    assert mv.lru_stats['evictions'] > 0
@@ -0,0 +1,85 @@
+import pytest
+
+import qmenuview
+from qmenuview import menu as batchmenu
+from qmenuview.qt import QtGui
+
+
+@pytest.fixture(scope='function', autouse=True)
+def useqtbot(qtbot):
+    pass
+
+
+def test_size_hint_cached():
+    m = qmenuview.BatchMenu()
+    m.addAction("first")
+    hint = m.sizeHint()
+    assert m.sizeHint() == hint
+    assert m.relayout_count == 1
+    m.addAction("a much longer second action")
+    assert m.sizeHint().width() > hint.width()
+    assert m.relayout_count == 2
+
+
+def test_suspend_layout(qtbot):
+    m = qmenuview.BatchMenu()
+    m.addAction("first")
+    m.show()
+    qtbot.waitForWindowShown(m)
+    size = m.size()
+    count = m.relayout_count
+    m.suspend_layout()
+    assert m.is_layout_suspended()
+    assert not m.updatesEnabled()
+    for i in range(50):
+        m.addAction("action%s" % i)
+    assert m.relayout_count == count
+    assert m.size() == size
+    m.resume_layout()
+    assert not m.is_layout_suspended()
+    assert m.updatesEnabled()
+    assert m.relayout_count == count + 1
+    assert m.size().height() > size.height()
+
+
+def test_suspend_nested():
+    m = qmenuview.BatchMenu()
+    m.suspend_layout()
+    m.suspend_layout()
+    m.resume_layout()
+    assert m.is_layout_suspended()
+    m.resume_layout()
+    assert not m.is_layout_suspended()
+    # too many resumes are ignored
+    m.resume_layout()
+    assert not m.is_layout_suspended()
+
+
+def test_suspended_layout():
+    m = qmenuview.BatchMenu()
+    with batchmenu.suspended_layout(m):
+        assert m.is_layout_suspended()
+    assert not m.is_layout_suspended()
+    with batchmenu.suspended_layout(QtGui.QMenu()):
+        pass
+    with batchmenu.suspended_layout(None):
+        pass
+
+
+def test_view_bulk_insert(qtbot):
+    model = QtGui.QStandardItemModel()
+    model.appendRow(QtGui.QStandardItem("first"))
+    mv = qmenuview.MenuView()
+    mv.model = model
+    mv.show()
+    qtbot.waitForWindowShown(mv)
+    count = mv.relayout_count
+    model.invisibleRootItem().appendRows([QtGui.QStandardItem("row%s" % i) for i in range(50)])
+    assert len(mv.actions()) == 51
+    assert mv.relayout_count == count + 1
+
+
+def test_view_create_menu():
+    mv = qmenuview.MenuView()
+    action = mv.create_menu(mv)
+    assert isinstance(action.menu(), qmenuview.BatchMenu)
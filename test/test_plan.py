@@ -0,0 +1,150 @@
+import sys
+
+import pytest
+
+import qmenuview
+from qmenuview import plan, snapshot
+from qmenuview.qt import QtGui
+
+
+@pytest.fixture(scope='function', autouse=True)
+def useqtbot(qtbot):
+    pass
+
+
+@pytest.fixture(scope='function')
+def treemodel():
+    m = QtGui.QStandardItemModel()
+    for i in range(5):
+        item = QtGui.QStandardItem("testrow%s" % i)
+        item.setToolTip("tip%s" % i)
+        m.appendRow(item)
+        for j in range(5):
+            child = QtGui.QStandardItem("testrow%s:%s" % (i, j))
+            child.setCheckable(True)
+            item.appendRow(child)
+    m.item(4).setEnabled(False)
+    return m
+
+
+def texts(menu):
+    return [a.text() for a in menu.actions()]
+
+
+def build(qtbot, mv, **kwargs):
+    with qtbot.waitSignal(mv.plan_committed, timeout=5000):
+        mv.build_in_thread(**kwargs)
+
+
+def test_plan_from_snapshot(treemodel):
+    mv = qmenuview.MenuView()
+    columns = [0, 0, -1, 0, 0, 0, 0]
+    copy = plan.snapshot_model(treemodel, mv.setdataargs, columns, 0)
+    root = plan.plan_from_snapshot(copy, mv.setdataargs)
+    assert len(root.children) == 5
+    first = root.children[0]
+    assert ('setText', 'testrow0', None) in first.values
+    assert ('setToolTip', 'tip0', None) in first.values
+    assert first.flags == snapshot.ENABLED
+    assert root.children[4].flags == 0
+    assert root.children[0].children[0].flags == snapshot.ENABLED | snapshot.CHECKABLE
+    assert root.children[0].children[0].children == ()
+
+
+def test_plan_from_source_defers_icons():
+    mv = qmenuview.MenuView()
+    icon = QtGui.QIcon()
+    source = qmenuview.NestedSource([{'text': 'a', 'icon': icon, 'children': ['b']}])
+    root = plan.plan_from_source(source, mv.setdataargs, [0, 0, -1, 0, 0, 0, 0])
+    a = root.children[0]
+    assert a.node is source.root[0]
+    assert ('setText', 'a', None) in a.values
+    assert ('setIcon', icon, mv._process_icondata) in a.values
+    assert a.children[0].node == 'b'
+
+
+def depth(node):
+    count = 0
+    while node.children:
+        node = node.children[0]
+        count += 1
+    return count
+
+
+def test_plan_deep_tree():
+    levels = sys.getrecursionlimit() + 100
+    m = QtGui.QStandardItemModel()
+    item = m.invisibleRootItem()
+    for i in range(levels):
+        child = QtGui.QStandardItem("level%s" % i)
+        item.appendRow(child)
+        item = child
+    mv = qmenuview.MenuView()
+    columns = [0, 0, -1, 0, 0, 0, 0]
+    copy = plan.snapshot_model(m, mv.setdataargs, columns, 0)
+    root = plan.plan_from_snapshot(copy, mv.setdataargs)
+    assert depth(root) == levels
+    assert ('setText', 'level0', None) in root.children[0].values
+
+    class Source(object):
+        root = 0
+
+        def children(self, node):
+            return [node + 1] if node < levels else []
+
+        def data(self, node, role):
+            return node
+
+    root = plan.plan_from_source(Source(), mv.setdataargs, columns)
+    assert depth(root) == levels
+    assert root.children[0].node == 1
+
+
+def test_build_in_thread_model(qtbot, treemodel):
+    mv = qmenuview.MenuView()
+    build(qtbot, mv, model=treemodel)
+    assert mv.model is treemodel
+    assert texts(mv) == ["testrow%s" % i for i in range(5)]
+    assert texts(mv.actions()[1].menu()) == ["testrow1:%s" % j for j in range(5)]
+    assert not mv.actions()[4].isEnabled()
+    assert mv.actions()[0].menu().actions()[0].isCheckable()
+    # the model is connected
+    treemodel.item(0).setText("changed")
+    assert mv.actions()[0].text() == "changed"
+    treemodel.appendRow(QtGui.QStandardItem("new"))
+    assert texts(mv)[-1] == "new"
+    assert mv.get_index(mv.actions()[2]) == treemodel.index(2, 0)
+
+
+def test_build_in_thread_outdated(qtbot, treemodel):
+    mv = qmenuview.MenuView()
+    with qtbot.waitSignal(mv.reconciled, timeout=5000):
+        mv.build_in_thread(model=treemodel)
+        treemodel.item(0).setText("changed")
+        treemodel.removeRow(1)
+    assert texts(mv) == ["changed", "testrow2", "testrow3", "testrow4"]
+    assert mv.model is treemodel
+
+
+def test_build_in_thread_source(qtbot):
+    mv = qmenuview.MenuView()
+    source = qmenuview.NestedSource([{'text': 'a', 'children': ['b', 'c']}, 'd'])
+    build(qtbot, mv, source=source)
+    assert mv.source is source
+    assert texts(mv) == ['a', 'd']
+    a = source.root[0]
+    assert mv.get_node(mv.actions()[0]) is a
+    a['children'].append('e')
+    mv.insert_nodes(a, 2, 2)
+    assert texts(mv.actions()[0].menu()) == ['b', 'c', 'e']
+    with qtbot.waitSignal(mv.node_triggered):
+        mv.actions()[1].trigger()
+
+
+def test_build_in_thread_cancelled(qtbot, treemodel):
+    mv = qmenuview.MenuView()
+    builder = mv.build_in_thread(model=treemodel)
+    mv.source = ['x']
+    builder.wait()
+    qtbot.wait(50)
+    assert texts(mv) == ['x']
@@ -0,0 +1,62 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+from qmenuview import qt
+
+
+@pytest.fixture(scope='function', autouse=True)
+def useqtbot(qtbot):
+    pass
+
+
+def run_python(code, **environ):
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(p for p in sys.path if p)
+    env.pop('QT_API', None)
+    env.update(environ)
+    process = subprocess.Popen([sys.executable, '-c', code], env=env,
+                               stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    out, err = process.communicate()
+    return process.returncode, out.decode(), err.decode()
+
+
+def test_binding():
+    assert qt.BINDING in qt.BINDINGS
+    assert qt.QtGui.QMenu
+    assert qt.QtGui.QAction
+    assert qt.QtCore.QAbstractItemModel
+
+
+def test_import_without_qt():
+    code = '''
+import sys
+import qmenuview
+args = qmenuview.SetDataArgs('setText', 'text_column', 0, str)
+gui = [m for m in sys.modules if m.split('.')[0] in ('PySide', 'PySide2', 'PySide6')
+       and m.split('.')[-1] in ('QtGui', 'QtWidgets')]
+assert not gui, gui
+assert 'qmenuview.view' not in sys.modules
+assert 'qmenuview.qt' not in sys.modules
+qmenuview.MenuView
+assert 'qmenuview.view' in sys.modules
+from qmenuview import BatchMenu
+assert set(qmenuview.__all__) <= set(dir(qmenuview))
+'''
+    code, out, err = run_python(code)
+    assert code == 0, err
+
+
+def test_invalid_binding():
+    code, out, err = run_python('import qmenuview.qt', QT_API='nobinding')
+    assert code != 0
+    assert 'QT_API' in err
+
+
+def test_unknown_attribute():
+    import qmenuview
+    with pytest.raises(AttributeError):
+        qmenuview.NoSuchName
+    assert qmenuview.MenuView is qmenuview.view.MenuView
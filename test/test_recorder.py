@@ -0,0 +1,102 @@
+import pytest
+
+import qmenuview
+from qmenuview import recorder
+from qmenuview.qt import QtCore, QtGui
+
+
+@pytest.fixture(scope='function', autouse=True)
+def useqtbot(qtbot):
+    pass
+
+
+@pytest.fixture(scope='function')
+def treemodel():
+    m = QtGui.QStandardItemModel()
+    for i in range(3):
+        item = QtGui.QStandardItem("testrow%s" % i)
+        m.appendRow(item)
+        for j in range(3):
+            child = QtGui.QStandardItem("testrow%s:%s" % (i, j))
+            child.setCheckable(True)
+            item.appendRow(child)
+    return m
+
+
+def texts(menu):
+    return [a.text() for a in menu.actions()]
+
+
+@pytest.fixture(scope='function')
+def recording(tmpdir, treemodel):
+    mv = qmenuview.MenuView()
+    mv.model = treemodel
+    path = str(tmpdir.join('menu.qmvr'))
+    with recorder.Recorder(mv, path) as rec:
+        treemodel.item(0).setText("changed")
+        treemodel.item(1).appendRow(QtGui.QStandardItem("new"))
+        treemodel.removeRow(2)
+        treemodel.item(0).child(1).setCheckState(QtCore.Qt.Checked)
+    assert rec.count == 4
+    return path, mv
+
+
+def test_read_recording(recording):
+    header, events = recorder.read_recording(recording[0])
+    assert header['columns'] == 1
+    assert len(header['tree']) == 3
+    assert [e[1] for e in events] == ['dataChanged', 'rowsInserted', 'rowsAboutToBeRemoved', 'dataChanged']
+    assert events[1][2:5] == [[1], 3, 3]
+
+
+def test_read_recording_invalid(tmpdir):
+    import gzip
+    path = str(tmpdir.join('invalid'))
+    with gzip.open(path, 'wb') as f:
+        f.write(b'{"format": "other"}\n')
+    with pytest.raises(ValueError):
+        recorder.read_recording(path)
+
+
+def test_replay(recording):
+    path, original = recording
+    view = qmenuview.MenuView()
+    result = recorder.replay(path, view)
+    assert result.events == 4
+    assert len(result.handlers['update_menus']) == 2
+    assert len(result.handlers['insert_menus']) == 1
+    assert len(result.handlers['remove_menus']) == 1
+    summary = result.summary()
+    assert summary['handlers']['update_menus']['calls'] == 2
+    assert summary['handlers']['reset']['calls'] == 0
+    # the handlers are restored
+    assert 'insert_menus' not in view.__dict__
+
+
+def test_replay_model_state(recording):
+    path, original = recording
+    header, events = recorder.read_recording(path)
+    model = recorder.ReplayModel(header['columns'], header['tree'])
+    view = qmenuview.MenuView()
+    view.model = model
+    for event in events:
+        model.apply(event[1:])
+    assert texts(view) == texts(original)
+    assert texts(view.actions()[1].menu()) == texts(original.actions()[1].menu())
+    checkstate = model.index(1, 0, model.index(0, 0)).data(QtCore.Qt.CheckStateRole)
+    assert checkstate == 2
+
+
+def test_replay_model_move():
+    model = recorder.ReplayModel(1, [[[['a']], [3], []], [[['b']], [3], []], [[['c']], [3], []]])
+    view = qmenuview.MenuView()
+    view.model = model
+    model.apply(['rowsMoved', [], 0, 0, [], 3])
+    assert [model.index(i, 0).data() for i in range(3)] == ['b', 'c', 'a']
+
+
+def test_main(recording, capsys):
+    import json
+    assert recorder.main([recording[0]]) == 0
+    summary = json.loads(capsys.readouterr()[0])
+    assert summary['events'] == 4
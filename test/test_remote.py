@@ -0,0 +1,191 @@
+import uuid
+
+import pytest
+
+import qmenuview
+from qmenuview import remote
+from qmenuview.qt import QtCore, QtGui
+
+
+@pytest.fixture(scope='function', autouse=True)
+def useqtbot(qtbot):
+    pass
+
+
+@pytest.fixture(scope='function')
+def treemodel():
+    m = QtGui.QStandardItemModel()
+    for i in range(3):
+        item = QtGui.QStandardItem("testrow%s" % i)
+        item.setToolTip("tooltip%s" % i)
+        m.appendRow(item)
+        for j in range(2):
+            child = QtGui.QStandardItem("testrow%s:%s" % (i, j))
+            item.appendRow(child)
+            child.appendRow(QtGui.QStandardItem("testrow%s:%s:0" % (i, j)))
+    return m
+
+
+@pytest.fixture(scope='function')
+def server(treemodel):
+    s = remote.ModelServer(treemodel)
+    name = 'qmenuview-test-%s' % uuid.uuid4().hex
+    assert s.listen(name)
+    yield s, name
+    s.close()
+
+
+def texts(menu):
+    return [a.text() for a in menu.actions()]
+
+
+def build(qtbot, server, fetch_depth=1):
+    source = remote.RemoteSource()
+    source.fetch_depth = fetch_depth
+    source.connect_to_server(server[1])
+    view = qmenuview.MenuView()
+    view.source = source
+
+    def built():
+        if len(view.actions()) != 3 or view.actions()[2].menu() is None:
+            return False
+        submenu = view.actions()[2].menu().actions()[1].menu()
+        return submenu is not None and bool(submenu.actions())
+
+    qtbot.waitUntil(built)
+    return source, view
+
+
+def test_build(qtbot, server):
+    source, view = build(qtbot, server)
+    assert texts(view) == ["testrow0", "testrow1", "testrow2"]
+    assert view.actions()[1].toolTip() == "tooltip1"
+    assert texts(view.actions()[1].menu()) == ["testrow1:0", "testrow1:1"]
+    assert texts(view.actions()[1].menu().actions()[0].menu()) == ["testrow1:0:0"]
+    # one request per level: the root, 3 submenus and 6 subsubmenus
+    assert source.requests == 10
+    assert server[0].clients == 1
+
+
+def test_fetch_depth(qtbot, server):
+    source, view = build(qtbot, server, fetch_depth=3)
+    assert source.requests == 1
+    assert texts(view.actions()[0].menu().actions()[1].menu()) == ["testrow0:1:0"]
+
+
+def test_push_inserted(qtbot, server, treemodel):
+    source, view = build(qtbot, server)
+    requests = source.requests
+    treemodel.insertRow(1, QtGui.QStandardItem("new"))
+    qtbot.waitUntil(lambda: len(view.actions()) == 4)
+    assert texts(view) == ["testrow0", "new", "testrow1", "testrow2"]
+    # the leaf gets a menu, when it gets children
+    leaf = treemodel.item(0).child(0).child(0)
+    leaf.appendRow(QtGui.QStandardItem("deep"))
+    leafaction = view.actions()[0].menu().actions()[0].menu().actions()[0]
+    qtbot.waitUntil(lambda: leafaction.menu() is not None)
+    assert texts(leafaction.menu()) == ["deep"]
+    assert source.requests == requests
+
+
+def test_push_removed(qtbot, server, treemodel):
+    source, view = build(qtbot, server)
+    treemodel.item(2).removeRows(0, 2)
+    qtbot.waitUntil(lambda: view.actions()[2].menu() is None)
+    treemodel.removeRow(0)
+    qtbot.waitUntil(lambda: len(view.actions()) == 2)
+    assert texts(view) == ["testrow1", "testrow2"]
+    assert source.get_node([1]).children == []
+
+
+def test_push_changed(qtbot, server, treemodel):
+    source, view = build(qtbot, server)
+    treemodel.item(1).child(0).setText("changed")
+    action = view.actions()[1].menu().actions()[0]
+    qtbot.waitUntil(lambda: action.text() == "changed")
+    assert source.get_node([1, 0]).data[0] == "changed"
+
+
+def test_push_invalidate(qtbot, server, treemodel):
+    source, view = build(qtbot, server)
+    treemodel.clear()
+    treemodel.appendRow(QtGui.QStandardItem("fresh"))
+    qtbot.waitUntil(lambda: texts(view) == ["fresh"])
+
+
+def test_queued_until_connected(qtbot, server):
+    source = remote.RemoteSource()
+    view = qmenuview.MenuView()
+    view.source = source
+    assert view.isEmpty()
+    with qtbot.waitSignal(source.fetched):
+        source.connect_to_server(server[1])
+    qtbot.waitUntil(lambda: len(view.actions()) == 3)
+
+
+def test_error(qtbot, server):
+    source = remote.RemoteSource()
+    source.connect_to_server(server[1])
+    # the server has no row at this path
+    source.root.children = [remote.RemoteNode(source.root) for i in range(5)]
+    with qtbot.waitSignal(source.error) as blocker:
+        source.children(source.root.children[4])
+    assert 'invalid path' in blocker.args[0]
+
+
+def test_subscribe_adds_roles(qtbot, server):
+    source, view = build(qtbot, server)
+    other = qmenuview.MenuView()
+    other.setdataargs.append(qmenuview.SetDataArgs('setData', 0, QtCore.Qt.UserRole, None))
+    other.source = source
+    assert QtCore.Qt.UserRole in source.roles
+    # the cache was invalidated, both views are rebuilt
+    qtbot.waitUntil(lambda: len(other.actions()) == 3 and len(view.actions()) == 3)
+
+
+def test_subscribe_twice(qtbot, server):
+    source, view = build(qtbot, server)
+    source.subscribe(view)
+    assert source.views == [view]
+    view.source = None
+    assert source.views == []
+    assert not source._unsubscribers
+
+
+def test_answer_for_moved_node(qtbot, server, treemodel):
+    source, view = build(qtbot, server)
+    node = source.get_node([2])
+    source.invalidate(node)
+    # the server reads the request for row 2 after the insertion
+    treemodel.insertRow(0, QtGui.QStandardItem("new"))
+    qtbot.waitUntil(lambda: len(view.actions()) == 4)
+    qtbot.waitUntil(lambda: bool(node.children))
+    assert source.get_path(node) == [3]
+    assert texts(view.actions()[3].menu()) == ["testrow2:0", "testrow2:1"], \
+        "The answer for the old path should not be attached to the moved node."
+
+
+def test_requests_sent_again_after_reconnect(qtbot, server):
+    source, view = build(qtbot, server)
+    node = source.get_node([1])
+    source.invalidate(node)
+    source._socket.abort()
+    qtbot.waitUntil(lambda: node not in source._requests.values() or bool(source._outbox))
+    assert node.children is None
+    with qtbot.waitSignal(source.fetched):
+        source.connect_to_server(server[1])
+    qtbot.waitUntil(lambda: bool(node.children))
+    assert texts(view.actions()[1].menu()) == ["testrow1:0", "testrow1:1"]
+
+
+def test_subscribe_while_root_is_fetched(qtbot, server, treemodel):
+    treemodel.item(0).setData('extra', QtCore.Qt.UserRole)
+    source = remote.RemoteSource()
+    source.connect_to_server(server[1])
+    view = qmenuview.MenuView()
+    view.source = source
+    other = qmenuview.MenuView()
+    other.setdataargs.append(qmenuview.SetDataArgs('setData', 0, QtCore.Qt.UserRole, None))
+    other.source = source
+    qtbot.waitUntil(lambda: len(other.actions()) == 3)
+    assert source.root.children[0].data[int(QtCore.Qt.UserRole)] == 'extra'
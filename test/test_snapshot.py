@@ -0,0 +1,145 @@
+import pytest
+
+import qmenuview
+from qmenuview import snapshot
+from qmenuview.qt import QtCore, QtGui
+
+
+@pytest.fixture(scope='function', autouse=True)
+def useqtbot(qtbot):
+    pass
+
+
+@pytest.fixture(scope='function')
+def treemodel():
+    m = QtGui.QStandardItemModel()
+    for i in range(5):
+        item = QtGui.QStandardItem("testrow%s" % i)
+        item.setToolTip("tip%s" % i)
+        m.appendRow(item)
+        for j in range(5):
+            child = QtGui.QStandardItem("testrow%s:%s" % (i, j))
+            child.setCheckable(True)
+            item.appendRow(child)
+    m.item(4).setEnabled(False)
+    return m
+
+
+@pytest.fixture(scope='function')
+def snapshotfile(tmpdir, treemodel):
+    mv = qmenuview.MenuView()
+    mv.model = treemodel
+    path = str(tmpdir.join('menu.snapshot'))
+    mv.save_snapshot(path, iconkey=lambda a: 'icon-' + a.text())
+    return path
+
+
+def texts(menu):
+    return [a.text() for a in menu.actions()]
+
+
+def test_snapshot_records(snapshotfile):
+    with snapshot.Snapshot(snapshotfile) as s:
+        assert len(s) == 1 + 5 + 25
+        assert s.record(0)[:2] == (snapshot.MENU | snapshot.ENABLED, 5)
+        flags, count, text, tooltip, statustip, whatsthis, iconkey = s.record(1)
+        assert flags & snapshot.MENU
+        assert count == 5
+        assert (text, tooltip, iconkey) == ('testrow0', 'tip0', 'icon-testrow0')
+        assert s.record(2)[2] == 'testrow0:0'
+        assert s.record(2)[0] & snapshot.CHECKABLE
+        with pytest.raises(IndexError):
+            s.record(31)
+
+
+def test_snapshot_invalid(tmpdir):
+    path = tmpdir.join('invalid')
+    path.write('no snapshot')
+    with pytest.raises(ValueError):
+        snapshot.Snapshot(str(path))
+
+
+def test_restore_snapshot(snapshotfile):
+    keys = []
+    mv = qmenuview.MenuView()
+    mv.restore_snapshot(snapshotfile, iconprovider=lambda key: keys.append(key) or QtGui.QIcon())
+    assert mv.model is None
+    assert texts(mv) == ['testrow%s' % i for i in range(5)]
+    assert texts(mv.actions()[2].menu()) == ['testrow2:%s' % j for j in range(5)]
+    assert mv.actions()[1].toolTip() == 'tip1'
+    assert not mv.actions()[4].isEnabled()
+    assert mv.actions()[0].menu().actions()[0].isCheckable()
+    assert len(keys) == 30
+
+
+def test_restore_snapshot_registers_actions(snapshotfile):
+    mv = qmenuview.MenuView()
+    mv.max_loaded_menus = 10
+    mv.restore_snapshot(snapshotfile)
+    assert mv._action_count == 30, "Restored actions should count for max_total_actions."
+    assert mv.lru_stats['loaded_menus'] == 5, "Restored menus should be unloadable."
+
+
+def test_reconcile(qtbot, snapshotfile, treemodel):
+    mv = qmenuview.MenuView()
+    mv.restore_snapshot(snapshotfile)
+    reused = mv.actions()[1]
+    treemodel.setData(treemodel.index(1, 0), 'changed')
+    treemodel.removeRows(0, 5, treemodel.index(3, 0))
+    treemodel.item(0).appendRow(QtGui.QStandardItem('new'))
+    treemodel.removeRow(2)
+    with qtbot.waitSignal(mv.reconciled, raising=True):
+        mv.reconcile(treemodel)
+    assert mv.model is treemodel
+    assert mv.actions()[1] is reused
+    assert texts(mv) == ['testrow0', 'changed', 'testrow3', 'testrow4']
+    assert mv.actions()[2].menu() is None
+    assert texts(mv.actions()[0].menu())[-1] == 'new'
+    treemodel.setData(treemodel.index(0, 0), 'connected')
+    assert mv.actions()[0].text() == 'connected'
+
+
+def test_reconcile_restart(qtbot, snapshotfile, treemodel):
+    mv = qmenuview.MenuView()
+    mv.restore_snapshot(snapshotfile)
+    mv.reconcile(treemodel, budget=0)
+    treemodel.appendRow(QtGui.QStandardItem('late'))
+    with qtbot.waitSignal(mv.reconciled, raising=True):
+        pass
+    assert texts(mv)[-1] == 'late'
+
+
+def test_reconcile_requeues_changed_menu(qtbot, snapshotfile, treemodel):
+    mv = qmenuview.MenuView()
+    mv.restore_snapshot(snapshotfile)
+    mv.reconcile(treemodel, budget=0)
+    mv._reconcile_step()
+    treemodel.item(3).appendRow(QtGui.QStandardItem('late'))
+    treemodel.item(1).removeRow(0)
+    treemodel.insertRow(0, QtGui.QStandardItem('first'))
+    with qtbot.waitSignal(mv.reconciled, raising=True):
+        pass
+    assert texts(mv) == ['first'] + ['testrow%s' % i for i in range(5)]
+    assert texts(mv.actions()[4].menu())[-1] == 'late'
+    assert texts(mv.actions()[2].menu()) == ['testrow1:%s' % j for j in range(1, 5)]
+    assert mv._action_count == 31 - 1 + 1
+
+
+def test_reconcile_finishes_under_changes(qtbot, snapshotfile, treemodel):
+    mv = qmenuview.MenuView()
+    mv.restore_snapshot(snapshotfile)
+    changes = []
+
+    def change():
+        changes.append(None)
+        treemodel.item(0).child(0).setText('change%s' % len(changes))
+
+    timer = QtCore.QTimer()
+    timer.setInterval(0)
+    timer.timeout.connect(change)
+    timer.start()
+    with qtbot.waitSignal(mv.reconciled, raising=True, timeout=5000):
+        mv.reconcile(treemodel, budget=0)
+    timer.stop()
+    assert changes, "The model should have changed during the reconciliation."
+    assert mv.actions()[0].menu().actions()[0].text() == 'change%s' % len(changes)
@@ -0,0 +1,46 @@
+import pytest
+
+from qmenuview import source
+from qmenuview.qt import QtCore
+
+
+@pytest.fixture(scope='function')
+def nested():
+    return ['Open',
+            {'text': 'Recent', 'tooltip': 'Recent files',
+             'children': ['a.txt', {'text': 'b.txt', 'enabled': False}]},
+            {'text': 'Wrap', 'checked': True}]
+
+
+def test_nested_children(nested):
+    s = source.NestedSource(nested)
+    assert s.children(s.root) is nested
+    assert s.children(nested[1]) == nested[1]['children']
+    assert s.children(nested[0]) == ()
+
+
+def test_nested_root_dict(nested):
+    s = source.NestedSource({'children': nested})
+    assert s.children(s.root) is nested
+
+
+def test_nested_data(nested):
+    s = source.NestedSource(nested)
+    assert s.data(nested[0], QtCore.Qt.DisplayRole) == 'Open'
+    assert s.data(nested[0], QtCore.Qt.ToolTipRole) is None
+    assert s.data(nested[1], QtCore.Qt.ToolTipRole) == 'Recent files'
+    assert s.data(nested[1], QtCore.Qt.CheckStateRole) is None
+    assert s.data(nested[2], QtCore.Qt.CheckStateRole) == QtCore.Qt.Checked
+
+
+def test_nested_flags(nested):
+    s = source.NestedSource(nested)
+    assert s.flags(nested[0]) & QtCore.Qt.ItemIsEnabled
+    assert not s.flags(nested[1]['children'][1]) & QtCore.Qt.ItemIsEnabled
+    assert not s.flags(nested[1]) & QtCore.Qt.ItemIsUserCheckable
+    assert s.flags(nested[2]) & QtCore.Qt.ItemIsUserCheckable
+
+
+def test_tree_source_children():
+    with pytest.raises(NotImplementedError):
+        source.TreeSource().children(None)
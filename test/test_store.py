@@ -0,0 +1,125 @@
+import pytest
+
+import qmenuview
+from qmenuview.qt import QtCore, QtGui
+
+
+@pytest.fixture(scope='function', autouse=True)
+def useqtbot(qtbot):
+    pass
+
+
+@pytest.fixture(scope='function')
+def treemodel():
+    m = QtGui.QStandardItemModel()
+    for i in range(5):
+        item = QtGui.QStandardItem("testrow%s" % i)
+        m.appendRow(item)
+        for j in range(5):
+            item.appendRow(QtGui.QStandardItem("testrow%s:%s" % (i, j)))
+    return m
+
+
+@pytest.fixture(scope='function')
+def store(treemodel):
+    return qmenuview.MenuStore(treemodel)
+
+
+@pytest.fixture(scope='function')
+def views(store):
+    views = [qmenuview.MenuView() for i in range(3)]
+    for v in views:
+        v.source = store
+    return views
+
+
+def test_build(store, views):
+    assert len(store.root.children) == 5
+    assert len(store.root.children[2].children) == 5
+    for v in views:
+        assert [a.text() for a in v.actions()] == ['testrow%s' % i for i in range(5)]
+        assert v.actions()[3].menu().actions()[4].text() == 'testrow3:4'
+
+
+def test_subscribe(store, views):
+    assert store.views == views
+    views[1].source = None
+    assert store.views == [views[0], views[2]]
+
+
+def test_subscribe_twice(store, views, treemodel):
+    store.subscribe(views[0])
+    assert store.views == views
+    calls = []
+    views[0].update_nodes = lambda *args: calls.append(args)
+    treemodel.item(1).setText('changed')
+    assert len(calls) == 1, "A view subscribed twice should be updated once."
+
+
+def test_unsubscribe_disconnects(store, views):
+    view = views[1]
+    store.unsubscribe(view)
+    assert view not in store._unsubscribers
+    store.subscribe(view)
+    store.unsubscribe(view)
+    assert store.views == [views[0], views[2]]
+    view.deleteLater()
+    QtCore.QCoreApplication.sendPostedEvents(None, QtCore.QEvent.DeferredDelete)
+    assert store.views == [views[0], views[2]]
+
+
+def test_destroyed_view_unsubscribes(store, views):
+    views[2].deleteLater()
+    QtCore.QCoreApplication.sendPostedEvents(None, QtCore.QEvent.DeferredDelete)
+    assert store.views == views[:2]
+    assert len(store._unsubscribers) == 2
+
+
+def test_get_node_index(store, treemodel):
+    index = treemodel.index(3, 0, treemodel.index(2, 0))
+    node = store.get_node(index)
+    assert node is store.root.children[2].children[3]
+    assert store.get_index(node) == index
+    assert store.get_index(node, 1) == index.sibling(3, 1)
+    assert not store.get_index(store.root).isValid()
+
+
+def test_insert(store, views, treemodel):
+    item = QtGui.QStandardItem("new")
+    item.appendRow(QtGui.QStandardItem("newchild"))
+    treemodel.item(1).insertRow(2, item)
+    assert store.root.children[1].children[2].values == (('setText', 'new'),)
+    for v in views:
+        menu = v.actions()[1].menu()
+        assert menu.actions()[2].text() == 'new'
+        assert menu.actions()[2].menu().actions()[0].text() == 'newchild'
+
+
+def test_remove(store, views, treemodel):
+    treemodel.removeRows(1, 2)
+    assert len(store.root.children) == 3
+    for v in views:
+        assert [a.text() for a in v.actions()] == ['testrow0', 'testrow3', 'testrow4']
+
+
+def test_update_converts_once(store, views, treemodel, monkeypatch):
+    calls = []
+    args = store.setdataargs[0]
+    monkeypatch.setattr(args, 'convertfunc', lambda data: calls.append(data) or str(data))
+    treemodel.setData(treemodel.index(0, 0), 'changed')
+    assert calls == ['changed']
+    for v in views:
+        assert v.actions()[0].text() == 'changed'
+
+
+def test_reset(store, views, treemodel):
+    treemodel.clear()
+    assert store.root.children == []
+    for v in views:
+        assert v.actions() == []
+
+
+def test_node_triggered(qtbot, store, views, treemodel):
+    with qtbot.waitSignal(views[2].node_triggered, raising=True) as blocker:
+        views[2].actions()[4].triggered.emit()
+    assert store.get_index(blocker.args[0]) == treemodel.index(4, 0)
@@ -0,0 +1,64 @@
+import random
+
+import pytest
+
+import qmenuview
+from qmenuview import stress
+from qmenuview.qt import QtCore
+
+
+@pytest.fixture(scope='function', autouse=True)
+def useqtbot(qtbot):
+    pass
+
+
+def test_run_consistent():
+    result = stress.run(operations=1000, batch=100, seed=1)
+    assert result.problems == []
+    assert result.operations == 1000
+    assert result.batches == 10
+    assert sum(result.counts.values()) == 1000
+    assert result.ops_per_second > 0
+
+
+def test_run_with_limits():
+    mv = qmenuview.MenuView()
+    mv.max_children_per_menu = 3
+    mv.max_depth = 2
+    result = stress.run(operations=1000, batch=100, seed=2, view=mv)
+    assert result.problems == []
+
+
+def test_verify_detects_desync():
+    model = stress.random_model(random.Random(3))
+    mv = qmenuview.MenuView()
+    mv.model = model
+    assert stress.verify(mv, model) == []
+    mv.removeAction(mv.actions()[0])
+    assert stress.verify(mv, model)
+
+
+def test_main(capsys):
+    assert stress.main(['--operations', '200', '--batch', '50', '--seed', '4']) == 0
+    assert '"ops_per_second"' in capsys.readouterr()[0]
+
+
+def test_run_sorted_and_grouped():
+    mv = qmenuview.MenuView()
+    mv.sort_role = QtCore.Qt.DisplayRole
+    mv.sort_key = lambda text: text[::-1]
+    mv.group_role = {0: QtCore.Qt.DisplayRole, 2: QtCore.Qt.DisplayRole}
+    result = stress.run(operations=1000, batch=100, seed=5, view=mv)
+    assert result.problems == []
+
+
+def test_verify_detects_unsorted():
+    model = stress.random_model(random.Random(6))
+    mv = qmenuview.MenuView()
+    mv.sort_role = QtCore.Qt.DisplayRole
+    mv.model = model
+    assert stress.verify(mv, model) == []
+    actions = mv.actions()
+    mv.removeAction(actions[0])
+    mv.addAction(actions[0])
+    assert stress.verify(mv, model)
@@ -1,7 +1,7 @@
 import pytest
-from PySide import QtGui, QtCore
 
 import qmenuview
+from qmenuview.qt import QtGui, QtCore
 
 
 @pytest.fixture(scope='function', autouse=True)
@@ -69,7 +69,7 @@ def test_actions_created(model):
     mv = qmenuview.MenuView()
     mv.model = model
     actions = mv.actions()
-    assert len(actions) == 10,\
+    assert len(actions) == 10, \
         'There should be 10 actions for 10 items'
     for i in range(10):
         assert actions[i].text() == 'testrow%s' % i
@@ -123,6 +123,38 @@ def test_action_hovered(qtbot, loadedview):
         action.hovered.emit()
 
 
+def test_hover_delay(qtbot, loadedview):
+    loadedview.hover_delay = 20
+    emitted = []
+    loadedview.action_hovered.connect(emitted.append)
+    actions = loadedview.actions()[0].menu().actions()
+    for action in actions:
+        action.hovered.emit()
+    assert emitted == []
+    qtbot.waitUntil(lambda: len(emitted) == 1)
+    qtbot.wait(40)
+    assert len(emitted) == 1, \
+        "Only the settled hover should be emitted."
+    assert emitted[0].data() == 'testrow0:9'
+
+
+def test_hover_cached_index(monkeypatch, treemodel, loadedview):
+    emitted = []
+    loadedview.action_hovered.connect(emitted.append)
+    action = loadedview.actions()[3].menu().actions()[4]
+    action.hovered.emit()
+    assert action in loadedview._hover_indexes
+    treemodel.item(3, 0).insertRow(0, QtGui.QStandardItem('inserted'))
+    with monkeypatch.context() as m:
+        m.setattr(loadedview, 'get_index', None)
+        action.hovered.emit()
+    assert emitted[1] == treemodel.index(5, 0, treemodel.index(3, 0)), \
+        "The cached index should follow inserted rows."
+    assert emitted[1].data() == 'testrow3:4'
+    treemodel.item(3, 0).removeRow(5)
+    assert action not in loadedview._hover_indexes
+
+
 def test_insert_menus(treemodel):
     mv = qmenuview.MenuView()
     mv.model = treemodel
@@ -132,36 +164,36 @@ def test_insert_menus(treemodel):
     parent = treemodel.itemFromIndex(parentindex)
     parent.appendRow(item)
     parentmenu = mv.actions()[2].menu().actions()[2].menu().actions()[0].menu()
-    assert parentmenu,\
+    assert parentmenu, \
         "The parent action was not converted to a menu"
     newaction = parentmenu.actions()[0]
     assert newaction.text() == 'newitem1'
-    assert newaction.menu().actions()[0].text() == 'newitem2',\
+    assert newaction.menu().actions()[0].text() == 'newitem2', \
         "Did not create submenus of inserted rows."
 
 
 def test_get_parent_indizes_invalid(loadedview):
     parents = loadedview._get_parent_indizes(QtCore.QModelIndex())
-    assert parents == [],\
+    assert parents == [], \
         "Invalid index has no parents!"
 
 
 def test_get_parent_indizes_other_model(loadedview, model):
     parents = loadedview._get_parent_indizes(model.index(0, 0))
-    assert parents == [],\
+    assert parents == [], \
         "There should be no parents because index is of another model!"
 
 
 def test_get_parent_indizes_first_level(loadedview, treemodel):
     parents = loadedview._get_parent_indizes(treemodel.index(0, 0))
-    assert parents == [],\
+    assert parents == [], \
         "There are no parent indizes because index is on first level!"
 
 
 def test_get_parent_indizes_second_level(loadedview, treemodel):
     p1 = treemodel.index(0, 0)
     parents = loadedview._get_parent_indizes(treemodel.index(0, 0, p1))
-    assert parents == [p1],\
+    assert parents == [p1], \
         "There should be one parent!"
 
 
@@ -169,13 +201,13 @@ def test_get_parent_indizes_third_level(loadedview, treemodel):
     p1 = treemodel.index(0, 0)
     p2 = treemodel.index(0, 0, p1)
     parents = loadedview._get_parent_indizes(treemodel.index(0, 0, p2))
-    assert parents == [p2, p1],\
+    assert parents == [p2, p1], \
         "There should be two parents!"
 
 
 def test_get_action_invalid(loadedview):
     action = loadedview.get_action(QtCore.QModelIndex())
-    assert action is loadedview.menuAction(),\
+    assert action is loadedview.menuAction(), \
         "Invalid Index should give the action of the menu view!"
 
 
@@ -186,13 +218,13 @@ def test_get_action_first_level(loadedview, treemodel):
 
 def test_get_action_second_level(loadedview, treemodel):
     action = loadedview.get_action(treemodel.index(9, 0, treemodel.index(9, 0)))
-    assert action is loadedview.actions()[9].parentWidget().actions()[9]
+    assert action is loadedview.actions()[9].menu().actions()[9]
 
 
 def test_get_action_third_level(loadedview, treemodel):
     action = loadedview.get_action(
         treemodel.index(0, 0, treemodel.index(2, 0, treemodel.index(9, 0))))
-    assert action is loadedview.actions()[9].parentWidget().actions()[2].parentWidget().actions()[0]
+    assert action is loadedview.actions()[9].menu().actions()[2].menu().actions()[0]
 
 
 def test_get_parents_invalid(loadedview):
@@ -200,21 +232,21 @@ def test_get_parents_invalid(loadedview):
     w2 = w1.addMenu("Test")
     action = QtGui.QAction(w2)
     parents = loadedview._get_parents(action)
-    assert parents == [],\
+    assert parents == [], \
         "Actions not part of the tree have no parents!"
 
 
 def test_get_parents_self(loadedview):
     action = loadedview.menuAction()
     parents = loadedview._get_parents(action)
-    assert parents == [],\
+    assert parents == [], \
         "If the action is the menuAction of the menu view, there are no parents!"
 
 
 def test_get_parents_first_level(loadedview):
     action = loadedview.actions()[4]
     parents = loadedview._get_parents(action)
-    assert parents == [],\
+    assert parents == [], \
         "First level actions have no parent!"
 
 
@@ -222,7 +254,7 @@ def test_get_parents_second_level(loadedview):
     p1 = loadedview.actions()[4]
     action = p1.menu().actions()[9]
     parents = loadedview._get_parents(action)
-    assert parents == [p1],\
+    assert parents == [p1], \
         "Second level actions only have the first level action as parent!"
 
 
@@ -232,7 +264,7 @@ def test_get_parents_third_level(loadedview):
     p2 = p1.menu().actions()[5]
     action = p2.menu().actions()[2]
     parents = loadedview._get_parents(action)
-    assert parents == [p2, p1],\
+    assert parents == [p2, p1], \
         "Third level actions have two actions as parent!"
 
 
@@ -263,12 +295,12 @@ def test_remove_menus(loadedview, treemodel):
     count = 5
     treemodel.removeRows(first, count, treemodel.index(2, 0))
     remaining = loadedview.actions()[2].menu().actions()
-    assert len(remaining) == 5,\
+    assert len(remaining) == 5, \
         "There should only be 5 rows remaining!"
     texts = ['2:0', '2:1', '2:2', '2:8', '2:9']
     expectedtexts = ['testrow%s' % t for t in texts]
     remainingtexts = [a.text() for a in remaining]
-    assert expectedtexts == remainingtexts,\
+    assert expectedtexts == remainingtexts, \
         "There should only be actions with these texts left"
 
 
@@ -276,10 +308,19 @@ def test_remove_menus_convert_menu(loadedview, treemodel):
     first = 0
     count = 10
     treemodel.removeRows(first, count, treemodel.index(2, 0))
-    assert loadedview.actions()[2].menu() is None,\
+    assert loadedview.actions()[2].menu() is None, \
         "The should be no menu, if there are no actions left."
 
 
+def test_remove_menus_then_insert_children(loadedview, treemodel):
+    treemodel.removeRows(0, 10, treemodel.index(2, 0))
+    action = loadedview.actions()[2]
+    assert loadedview.get_index(action) == treemodel.index(2, 0)
+    treemodel.insertRows(0, 1, treemodel.index(2, 0))
+    child = action.menu().actions()[0]
+    assert loadedview.get_index(child) == treemodel.index(0, 0, treemodel.index(2, 0))
+
+
 def test_update_menu_text(loadedview, treemodel):
     teststring = "Thanks for the fish!"
     treemodel.setData(treemodel.index(2, 0), teststring)
@@ -294,6 +335,101 @@ def test_change_column(loadedview, treemodel):
     assert loadedview.actions()[0].text() == txt
 
 
+def test_change_column_reapplies(loadedview):
+    action = loadedview.actions()[2]
+    action.setToolTip('manual')
+    loadedview.text_column = 1
+    assert action.text() == 'iconitem'
+    assert action.menu().actions()[0].text() == '', \
+        "Rows without data in the new column should get an empty text."
+    assert action.toolTip() == 'manual', \
+        "Only the data arguments of the changed column should be applied."
+    loadedview.text_column = 0
+    assert action.text() == 'testrow2:0'
+    assert action.menu().actions()[0].text() == 'testrow2:0'
+
+
+def test_change_column_skips_placeholders(treemodel):
+    mv = qmenuview.MenuView()
+    mv.max_depth = 1
+    mv.model = treemodel
+    menu = mv.actions()[1].menu()
+    assert menu.actions() == []
+    menu.aboutToShow.emit()
+    mv.text_column = -1
+    assert menu.actions()[0].text() == ''
+    mv.text_column = 0
+    assert menu.actions()[0].text() == 'testrow1:0'
+    assert mv.actions()[2].menu().actions() == [], \
+        "Placeholders should stay unbuilt."
+
+
+def test_change_column_defer_data(treemodel):
+    mv = qmenuview.MenuView()
+    mv.defer_data = True
+    mv.model = treemodel
+    submenu = mv.actions()[3].menu()
+    submenu.aboutToShow.emit()
+    mv.text_column = 1
+    assert mv.actions()[3].text() == 'iconitem'
+    assert submenu.actions()[0].text() == ''
+    assert mv.actions()[4].menu() in mv._dirty, \
+        "Deferred data should stay pending."
+
+
+def test_set_setdataargs(loadedview):
+    calls = []
+
+    def convert(data):
+        calls.append(data)
+        return data
+
+    args = qmenuview.SetDataArgs('setWhatsThis', 0, QtCore.Qt.DisplayRole, convert)
+    loadedview.setdataargs = loadedview.setdataargs + [args]
+    assert loadedview.actions()[1].whatsThis() == 'testrow1:0'
+    assert len(calls) == 10 + 100 + 500, \
+        "The new data argument should be applied once to every built action."
+
+
+def test_set_setdataargs_removed(loadedview):
+    args = qmenuview.SetDataArgs('setWhatsThis', 0, QtCore.Qt.DisplayRole, str)
+    loadedview.setdataargs = loadedview.setdataargs + [args]
+    action = loadedview.actions()[2]
+    assert action.whatsThis() == 'testrow2:0'
+    loadedview.setdataargs = [a for a in loadedview.setdataargs if a is not args]
+    assert action.whatsThis() == '', \
+        "The values of a removed data argument should be cleared."
+    assert action.menu().actions()[0].whatsThis() == ''
+    assert action.text() == 'testrow2:0'
+
+
+def test_set_setdataargs_removed_shared_setter(loadedview):
+    args = qmenuview.SetDataArgs('setText', 1, QtCore.Qt.DisplayRole, str)
+    loadedview.setdataargs = loadedview.setdataargs + [args]
+    action = loadedview.actions()[2]
+    assert action.text() == 'iconitem'
+    loadedview.setdataargs = loadedview.setdataargs[:-1]
+    assert action.text() == 'testrow2:0', \
+        "The remaining data argument with the same setter should be applied again."
+
+
+def test_set_setdataargs_in_place(loadedview):
+    args = qmenuview.SetDataArgs('setWhatsThis', 0, QtCore.Qt.DisplayRole, str)
+    loadedview.setdataargs.append(args)
+    loadedview.setdataargs = loadedview.setdataargs
+    action = loadedview.actions()[2]
+    assert action.whatsThis() == 'testrow2:0', \
+        "A container appended in place should be applied on reassignment."
+    args.column = 1
+    loadedview.setdataargs = loadedview.setdataargs
+    assert action.whatsThis() == 'iconitem', \
+        "A container changed in place should be applied on reassignment."
+    assert action.menu().actions()[0].whatsThis() == ''
+    loadedview.setdataargs.remove(args)
+    loadedview.reapply_data()
+    assert action.whatsThis() == ''
+
+
 def test_remove_all_then_insert(model):
     # this test can fail, if you remove all rows,
     # then remove the menu from the parent action.
@@ -307,3 +443,526 @@ def test_remove_all_then_insert(model):
     item = QtGui.QStandardItem("testrow1")
     item.appendRow(QtGui.QStandardItem("testrow2"))
     model.appendRow(item)
+
+
+def test_defer_data(treemodel):
+    mv = qmenuview.MenuView()
+    mv.defer_data = True
+    mv.model = treemodel
+    action = mv.actions()[3]
+    assert action.text() == 'testrow3:0', \
+        "Actions of the top menu should not be deferred."
+    submenu = action.menu()
+    assert submenu.actions()[2].text() == '', \
+        "Data of actions in closed submenus should be deferred."
+    submenu.aboutToShow.emit()
+    assert submenu.actions()[2].text() == 'testrow3:2'
+    assert submenu.actions()[2].menu().actions()[0].text() == '', \
+        "Only the shown submenu should get its data applied."
+
+
+def test_defer_data_update(treemodel):
+    mv = qmenuview.MenuView()
+    mv.defer_data = True
+    mv.model = treemodel
+    submenu = mv.actions()[3].menu()
+    submenu.aboutToShow.emit()
+    treemodel.setData(treemodel.index(2, 0, treemodel.index(3, 0)), 'deferred')
+    assert submenu.actions()[2].text() == 'testrow3:2'
+    submenu.aboutToShow.emit()
+    assert submenu.actions()[2].text() == 'deferred'
+
+
+def test_unload_least_recently_shown(treemodel):
+    mv = qmenuview.MenuView()
+    mv.max_loaded_menus = 3
+    mv.model = treemodel
+    mv.actions()[0].menu().aboutToShow.emit()
+    stats = mv.lru_stats
+    assert stats['loaded_menus'] == 3
+    assert stats['evictions'] == 17
+    assert mv.actions()[1].menu().actions() == [], \
+        "The idle submenu should be unloaded to a placeholder."
+    assert mv.get_action(treemodel.index(0, 0, treemodel.index(1, 0))) is None
+    assert [a.text() for a in mv.actions()[0].menu().actions()[8].menu().actions()] ==\
+        ['testrow0:8:%s' % k for k in range(5)]
+
+
+def test_reload_unloaded_menu(treemodel):
+    mv = qmenuview.MenuView()
+    mv.max_loaded_menus = 3
+    mv.model = treemodel
+    mv.actions()[0].menu().aboutToShow.emit()
+    menu = mv.actions()[5].menu()
+    treemodel.setData(treemodel.index(3, 0, treemodel.index(5, 0)), 'changed')
+    menu.aboutToShow.emit()
+    texts = [a.text() for a in menu.actions()]
+    assert texts[3] == 'changed'
+    assert len(texts) == 10
+    assert menu.actions()[0].menu().actions() == [], \
+        "Submenus of a reloaded menu should be placeholders."
+    assert mv.lru_stats['loads'] == 1
+    assert mv.get_index(menu.actions()[4]) == treemodel.index(4, 0, treemodel.index(5, 0))
+
+
+def test_remove_rows_of_unloaded_menu(treemodel):
+    mv = qmenuview.MenuView()
+    mv.max_loaded_menus = 1
+    mv.model = treemodel
+    mv.actions()[0].menu().aboutToShow.emit()
+    treemodel.removeRows(0, 10, treemodel.index(4, 0))
+    assert mv.actions()[4].menu() is None
+    assert mv.lru_stats['unloaded_menus'] == 18
+
+
+def test_prebuild(qtbot, treemodel):
+    mv = qmenuview.MenuView()
+    mv.max_depth = 1
+    mv.prebuild = True
+    mv.prebuild_delay = 0
+    mv.model = treemodel
+    assert mv.lru_stats['unloaded_menus'] == 10
+    qtbot.waitUntil(lambda: not mv.prebuild_stats['pending'])
+    assert mv.lru_stats['unloaded_menus'] == 0
+    menu = mv.actions()[2].menu().actions()[3].menu()
+    assert [a.text() for a in menu.actions()] == ['testrow2:3:%s' % k for k in range(5)]
+    menu.aboutToShow.emit()
+    stats = mv.prebuild_stats
+    assert stats['hits'] == 1
+    assert stats['misses'] == 0
+    assert stats['prebuilt'] == 110
+
+
+def test_prebuild_hovered_first(qtbot, treemodel):
+    mv = qmenuview.MenuView()
+    mv.max_depth = 1
+    mv.model = treemodel
+    mv.prebuild = True
+    mv.prebuild_delay = 0
+    mv.prebuild_budget = 0
+    mv.actions()[5].hover()
+    qtbot.waitUntil(lambda: mv.prebuild_stats['prebuilt'] >= 3)
+    assert mv.actions()[5].menu().actions()
+    assert mv.actions()[4].menu().actions()
+    assert mv.actions()[6].menu().actions()
+    assert not mv.actions()[0].menu().actions(), \
+        "Menus far from the hovered action should be built later."
+    mv.actions()[0].menu().aboutToShow.emit()
+    assert mv.prebuild_stats['misses'] == 1
+
+
+def test_prebuild_limits_and_deferred_data(qtbot, treemodel):
+    mv = qmenuview.MenuView()
+    mv.defer_data = True
+    mv.max_depth = 1
+    mv.max_loaded_menus = 2
+    mv.prebuild = True
+    mv.prebuild_delay = 0
+    mv.model = treemodel
+    qtbot.waitUntil(lambda: not mv.prebuild_stats['pending'])
+    stats = mv.lru_stats
+    assert stats['loaded_menus'] == 2
+    assert stats['evictions'] == 0
+    assert [a.text() for a in mv.actions()[0].menu().actions()][:2] == ['testrow0:0', 'testrow0:1']
+
+
+@pytest.fixture(scope='function')
+def nested():
+    return [{'text': 'testrow%s' % i,
+             'children': ['testrow%s:%s' % (i, j) for j in range(5)]}
+            for i in range(5)]
+
+
+def test_source_nested(nested):
+    mv = qmenuview.MenuView()
+    mv.source = nested
+    assert mv.model is None
+    assert [a.text() for a in mv.actions()] == ['testrow%s' % i for i in range(5)]
+    assert [a.text() for a in mv.actions()[2].menu().actions()] == nested[2]['children']
+    assert mv.get_node(mv.actions()[3]) is nested[3]
+    assert mv.get_node_action(nested[1]) is mv.actions()[1]
+
+
+def test_source_replaces_model(treemodel, nested):
+    mv = qmenuview.MenuView()
+    mv.model = treemodel
+    mv.source = nested
+    assert mv.model is None
+    treemodel.setData(treemodel.index(0, 0), 'ignored')
+    assert mv.actions()[0].text() == 'testrow0'
+
+
+def test_source_insert_nodes(nested):
+    mv = qmenuview.MenuView()
+    mv.source = nested
+    nested[4]['children'][1:1] = ['new1', {'text': 'new2', 'children': ['new3']}]
+    mv.insert_nodes(nested[4], 1, 2)
+    texts = [a.text() for a in mv.actions()[4].menu().actions()]
+    assert texts == ['testrow4:0', 'new1', 'new2', 'testrow4:1', 'testrow4:2', 'testrow4:3', 'testrow4:4']
+    assert mv.actions()[4].menu().actions()[2].menu().actions()[0].text() == 'new3'
+
+
+def test_source_insert_into_leaf():
+    leaf = {'text': 'leaf'}
+    mv = qmenuview.MenuView()
+    mv.source = [leaf]
+    leaf['children'] = ['child']
+    mv.insert_nodes(leaf, 0, 0)
+    assert mv.actions()[0].menu().actions()[0].text() == 'child'
+
+
+def test_source_remove_nodes(nested):
+    mv = qmenuview.MenuView()
+    mv.source = nested
+    removed = nested.pop(1)
+    mv.remove_nodes(nested, 1, 1)
+    assert [a.text() for a in mv.actions()] == ['testrow0', 'testrow2', 'testrow3', 'testrow4']
+    assert mv.get_node_action(removed) is None
+    del nested[0]['children'][:]
+    mv.remove_nodes(nested[0], 0, 4)
+    assert mv.actions()[0].menu() is None
+
+
+def test_source_update_nodes(nested):
+    mv = qmenuview.MenuView()
+    mv.source = nested
+    nested[0]['text'] = 'changed'
+    nested[0]['children'][3] = 'replaced'
+    mv.update_nodes(nested, 0, 0)
+    mv.update_nodes(nested[0], 3, 3)
+    assert mv.actions()[0].text() == 'changed'
+    assert mv.actions()[0].menu().actions()[3].text() == 'replaced'
+
+
+def test_source_node_triggered(qtbot, nested):
+    mv = qmenuview.MenuView()
+    mv.source = nested
+    with qtbot.waitSignal(mv.node_triggered, raising=True) as blocker:
+        mv.actions()[1].triggered.emit()
+    assert blocker.args[0] is nested[1]
+
+
+def test_source_custom():
+    class Source(object):
+        def children(self, node):
+            return range(3) if node is None else ()
+
+        def data(self, node, role):
+            if role == QtCore.Qt.DisplayRole:
+                return 'item%s' % node
+
+    mv = qmenuview.MenuView()
+    mv.source = Source()
+    assert [a.text() for a in mv.actions()] == ['item0', 'item1', 'item2']
+
+
+def test_iter_hierarchy_depth_first(treemodel):
+    indizes = qmenuview.MenuView.iter_hierarchy(treemodel)
+    first = next(indizes)
+    assert first == treemodel.index(0, 0)
+    second = next(indizes)
+    assert second == treemodel.index(0, 0, first)
+    assert next(indizes) == treemodel.index(0, 0, second)
+    assert len(list(indizes)) == 10 + 100 + 500 - 3
+
+
+def test_iter_hierarchy_level_order(treemodel):
+    indizes = list(qmenuview.MenuView.iter_hierarchy(treemodel, depth_first=False))
+    assert indizes == qmenuview.MenuView._flatten_hierarchy(treemodel)
+    assert len(indizes) == 10 + 100 + 500
+    assert indizes[10] == treemodel.index(0, 0, treemodel.index(0, 0))
+
+
+@pytest.mark.parametrize('depth_first', [True, False])
+def test_iter_hierarchy_max_depth(treemodel, depth_first):
+    indizes = list(qmenuview.MenuView.iter_hierarchy(treemodel, depth_first=depth_first, max_depth=2))
+    assert len(indizes) == 10 + 100
+    parent = treemodel.index(3, 0)
+    indizes = list(qmenuview.MenuView.iter_hierarchy(treemodel, parent, depth_first=depth_first, max_depth=1))
+    assert indizes == [treemodel.index(i, 0, parent) for i in range(10)]
+
+
+@pytest.mark.parametrize('depth_first', [True, False])
+def test_iter_hierarchy_max_nodes(treemodel, depth_first):
+    indizes = list(qmenuview.MenuView.iter_hierarchy(treemodel, depth_first=depth_first, max_nodes=42))
+    assert len(indizes) == 42
+
+
+def test_max_children_per_menu(qtbot, treemodel):
+    mv = qmenuview.MenuView()
+    mv.max_children_per_menu = 3
+    with qtbot.waitSignal(mv.limit_reached, raising=True) as blocker:
+        mv.model = treemodel
+    assert blocker.args == ['max_children_per_menu']
+    assert [a.text() for a in mv.actions()] == ['testrow0:0', 'testrow1:0', 'testrow2:0', '...']
+    assert len(mv.actions()[1].menu().actions()) == 4
+    assert mv.get_action(treemodel.index(5, 0)) is None
+    assert not mv.get_index(mv.actions()[3]).isValid()
+
+
+def test_expand_overflow(treemodel):
+    mv = qmenuview.MenuView()
+    mv.max_children_per_menu = 3
+    mv.model = treemodel
+    mv.actions()[3].trigger()
+    actions = mv.actions()
+    assert [a.text() for a in actions[:6]] == ['testrow%s:0' % i for i in range(6)]
+    assert len(actions) == 7
+    assert actions[4].menu().actions() == [], \
+        "Expanded submenus should be placeholders."
+    actions[4].menu().aboutToShow.emit()
+    assert len(actions[4].menu().actions()) == 4
+    assert mv.get_action(treemodel.index(2, 0, treemodel.index(4, 0))) is actions[4].menu().actions()[2]
+
+
+def test_max_children_insert_remove(treemodel):
+    mv = qmenuview.MenuView()
+    mv.max_children_per_menu = 3
+    mv.model = treemodel
+    treemodel.appendRow(QtGui.QStandardItem("hidden"))
+    assert len(mv.actions()) == 4
+    treemodel.insertRow(1, QtGui.QStandardItem("visible"))
+    assert [a.text() for a in mv.actions()] == ['testrow0:0', 'visible', 'testrow1:0', 'testrow2:0', '...']
+    treemodel.removeRows(2, 5)
+    assert [a.text() for a in mv.actions()] == ['testrow0:0', 'visible', '...']
+    treemodel.removeRows(0, treemodel.rowCount())
+    assert mv.actions() == []
+
+
+def test_max_depth(qtbot, treemodel):
+    mv = qmenuview.MenuView()
+    mv.max_depth = 2
+    with qtbot.waitSignal(mv.limit_reached, raising=True) as blocker:
+        mv.model = treemodel
+    assert blocker.args == ['max_depth']
+    menu = mv.actions()[1].menu().actions()[2].menu()
+    assert menu.actions() == []
+    menu.aboutToShow.emit()
+    assert [a.text() for a in menu.actions()] == ['testrow1:2:%s' % k for k in range(5)]
+
+
+def test_max_total_actions(qtbot, treemodel):
+    mv = qmenuview.MenuView()
+    mv.max_total_actions = 15
+    with qtbot.waitSignal(mv.limit_reached, raising=True) as blocker:
+        mv.model = treemodel
+    assert blocker.args == ['max_total_actions']
+    assert [a.text() for a in mv.actions()] == ['testrow0:0', '...']
+    submenu = mv.actions()[0].menu()
+    assert [a.text() for a in submenu.actions()] == ['testrow0:0', 'testrow0:1', 'testrow0:2', '...']
+    assert [a.text() for a in submenu.actions()[2].menu().actions()] == ['testrow0:2:0', '...']
+    treemodel.removeRows(0, 1, treemodel.index(0, 0))
+    treemodel.appendRow(QtGui.QStandardItem("hidden"))
+    assert len(mv.actions()) == 2
+
+
+GroupRole = QtCore.Qt.UserRole + 1
+
+
+@pytest.fixture(scope='function')
+def groupmodel():
+    m = QtGui.QStandardItemModel()
+    for i in range(5):
+        item = QtGui.QStandardItem("testrow%s" % i)
+        item.setCheckable(True)
+        item.setData('radio' if i < 3 else None, GroupRole)
+        m.appendRow(item)
+    m.item(0).setCheckState(QtCore.Qt.Checked)
+    return m
+
+
+@pytest.fixture(scope='function')
+def groupview(groupmodel):
+    mv = qmenuview.MenuView()
+    mv.checkgroup_role = GroupRole
+    mv.model = groupmodel
+    return mv
+
+
+def test_check_group_created(groupview):
+    actions = groupview.actions()
+    group = actions[0].actionGroup()
+    assert group is not None
+    assert group.isExclusive()
+    assert [a.actionGroup() for a in actions[:3]] == [group] * 3
+    assert actions[3].actionGroup() is None
+    assert actions[0].isChecked()
+
+
+def test_check_group_model_change(groupview, groupmodel):
+    actions = groupview.actions()
+    groupmodel.item(2).setCheckState(QtCore.Qt.Checked)
+    # the group unchecks the previous action, before the model does
+    assert [a.isChecked() for a in actions[:3]] == [False, False, True]
+
+
+def test_check_group_leave(groupview, groupmodel):
+    actions = groupview.actions()
+    groupmodel.item(1).setData(None, GroupRole)
+    assert actions[1].actionGroup() is None
+    groupmodel.item(4).setData('radio', GroupRole)
+    assert actions[4].actionGroup() is actions[0].actionGroup()
+
+
+def test_check_group_write_back(groupview, groupmodel):
+    changes = []
+    groupmodel.dataChanged.connect(lambda tl, br, *args: changes.append(tl.row()))
+    groupview.actions()[2].trigger()
+    assert changes == [0, 2]
+    states = [groupmodel.item(i).checkState() for i in range(3)]
+    assert states == [QtCore.Qt.Unchecked, QtCore.Qt.Unchecked, QtCore.Qt.Checked]
+    assert [a.isChecked() for a in groupview.actions()[:3]] == [False, False, True]
+
+
+def test_update_menus_check_state_only(groupview, groupmodel):
+    applied = []
+    setattribute = groupview._set_action_attribute
+    groupview._set_action_attribute = lambda a, i, args: applied.append(args.setfunc) or setattribute(a, i, args)
+    groupmodel.blockSignals(True)
+    groupmodel.item(1).setCheckState(QtCore.Qt.Checked)
+    groupmodel.item(1).setText("changed")
+    groupmodel.blockSignals(False)
+    index = groupmodel.index(1, 0)
+    groupview.update_menus(index, index, [QtCore.Qt.CheckStateRole])
+    assert applied == ['setChecked']
+    assert groupview.actions()[1].isChecked()
+    assert groupview.actions()[1].text() == "testrow1"
+    groupview.update_menus(index, index)
+    assert groupview.actions()[1].text() == "changed"
+
+
+def test_check_groups_cleared_on_reset(groupview, groupmodel):
+    group = groupview.actions()[0].actionGroup()
+    groupview.reset()
+    assert groupview.actions()[0].actionGroup() is not group
+    assert list(groupview._groups) == [groupview]
+
+
+GroupKeyRole = QtCore.Qt.UserRole + 2
+SortKeyRole = QtCore.Qt.UserRole + 3
+
+
+@pytest.fixture(scope='function')
+def sortmodel():
+    m = QtGui.QStandardItemModel()
+    for text, group in [('cherry', 'fruit'), ('leek', 'vegetable'), ('apple', 'fruit'),
+                        ('bean', 'vegetable'), ('Banana', 'fruit')]:
+        item = QtGui.QStandardItem(text)
+        item.setData(group, GroupKeyRole)
+        m.appendRow(item)
+    return m
+
+
+def texts(menu):
+    return [a.text() if not a.isSeparator() else '--' for a in menu.actions()]
+
+
+def test_sort(qtbot, sortmodel):
+    mv = qmenuview.MenuView()
+    mv.sort_role = QtCore.Qt.DisplayRole
+    mv.sort_key = lambda text: text.lower()
+    mv.model = sortmodel
+    assert texts(mv) == ['apple', 'Banana', 'bean', 'cherry', 'leek']
+    assert mv.get_index(mv.actions()[0]) == sortmodel.index(2, 0)
+    assert mv.get_action(sortmodel.index(0, 0)).text() == 'cherry'
+    with qtbot.waitSignal(mv.action_triggered, raising=True) as blocker:
+        mv.actions()[3].trigger()
+    assert blocker.args[0] == sortmodel.index(0, 0)
+
+
+def test_sort_insert_update_remove(sortmodel):
+    mv = qmenuview.MenuView()
+    mv.sort_role = QtCore.Qt.DisplayRole
+    mv.model = sortmodel
+    sortmodel.insertRow(1, QtGui.QStandardItem('date'))
+    assert texts(mv) == ['Banana', 'apple', 'bean', 'cherry', 'date', 'leek']
+    assert mv.get_index(mv.actions()[4]) == sortmodel.index(1, 0)
+    action = mv.get_action(sortmodel.index(0, 0))
+    sortmodel.item(0).setText('zucchini')
+    assert mv.actions()[-1] is action, \
+        "A changed row should be moved, not rebuilt."
+    sortmodel.removeRows(1, 2)
+    assert texts(mv) == ['Banana', 'apple', 'bean', 'zucchini']
+    assert [mv.get_index(a).row() for a in mv.actions()] == [3, 1, 2, 0]
+
+
+def test_sort_mixed_types():
+    m = QtGui.QStandardItemModel()
+    for text, key in [('b', 'b'), ('two', 2), ('none', None), ('a', 'a'), ('half', 0.5)]:
+        item = QtGui.QStandardItem(text)
+        item.setData(key, SortKeyRole)
+        m.appendRow(item)
+    mv = qmenuview.MenuView()
+    mv.sort_role = SortKeyRole
+    mv.model = m
+    assert texts(mv) == ['none', 'half', 'two', 'a', 'b'], \
+        "None should come first, then numbers, then the other values grouped by type."
+    m.item(0).setData(1, SortKeyRole)
+    assert texts(mv) == ['none', 'half', 'b', 'two', 'a']
+
+
+def test_sort_change_text_column(sortmodel):
+    for row in range(sortmodel.rowCount()):
+        sortmodel.setItem(row, 1, QtGui.QStandardItem(str(row)))
+    mv = qmenuview.MenuView()
+    mv.sort_role = QtCore.Qt.DisplayRole
+    mv.model = sortmodel
+    assert texts(mv) == ['Banana', 'apple', 'bean', 'cherry', 'leek']
+    mv.text_column = 1
+    assert texts(mv) == ['0', '1', '2', '3', '4'], \
+        "The keys should be read from the new text column."
+    assert mv.get_index(mv.actions()[0]) == sortmodel.index(0, 0)
+
+
+def test_group(sortmodel):
+    mv = qmenuview.MenuView()
+    mv.group_role = GroupKeyRole
+    mv.model = sortmodel
+    assert texts(mv) == ['cherry', 'apple', 'Banana', '--', 'leek', 'bean'], \
+        "Groups should keep the model order inside and be divided by a separator."
+    item = QtGui.QStandardItem('salt')
+    item.setData('condiment', GroupKeyRole)
+    sortmodel.appendRow(item)
+    assert texts(mv) == ['salt', '--', 'cherry', 'apple', 'Banana', '--', 'leek', 'bean']
+    sortmodel.removeRow(5)
+    sortmodel.item(1).setData('fruit', GroupKeyRole)
+    assert texts(mv) == ['cherry', 'apple', 'Banana', 'leek', '--', 'bean']
+    assert mv.get_index(mv.actions()[3]) == sortmodel.index(1, 0)
+    assert not mv.get_index(mv.actions()[4]).isValid(), \
+        "A separator should not have an index."
+
+
+def test_sort_per_level(treemodel):
+    mv = qmenuview.MenuView()
+    mv.sort_role = {1: QtCore.Qt.DisplayRole}
+    mv.sort_key = lambda text: -int(text.split(':')[1])
+    mv.model = treemodel
+    assert texts(mv)[:2] == ['testrow0:0', 'testrow1:0'], \
+        "The top level should keep the model order."
+    submenu = mv.actions()[2].menu()
+    assert texts(submenu)[:2] == ['testrow2:9', 'testrow2:8']
+    assert texts(submenu.actions()[0].menu()) == ['testrow2:9:%s' % k for k in range(5)]
+    assert mv.get_index(submenu.actions()[0].menu().actions()[1]) ==\
+        treemodel.index(1, 0, treemodel.index(9, 0, treemodel.index(2, 0)))
+
+
+def test_sort_placeholders_and_overflow(treemodel):
+    mv = qmenuview.MenuView()
+    mv.sort_role = QtCore.Qt.DisplayRole
+    mv.sort_key = lambda text: -int(text.split(':')[1])
+    mv.max_depth = 1
+    mv.max_loaded_menus = 1
+    mv.max_children_per_menu = 4
+    mv.model = treemodel
+    first, second = mv.actions()[0].menu(), mv.actions()[1].menu()
+    first.aboutToShow.emit()
+    assert texts(first) == ['testrow0:3', 'testrow0:2', 'testrow0:1', 'testrow0:0', '...']
+    second.aboutToShow.emit()
+    assert first.actions() == []
+    first.aboutToShow.emit()
+    assert texts(first)[:4] == ['testrow0:3', 'testrow0:2', 'testrow0:1', 'testrow0:0']
+    first.actions()[-1].trigger()
+    assert texts(first)[:3] == ['testrow0:7', 'testrow0:6', 'testrow0:5']
+    assert mv.get_index(first.actions()[0]) == treemodel.index(7, 0, treemodel.index(0, 0))
+    treemodel.removeRows(0, 10, treemodel.index(0, 0))
+    assert mv.actions()[0].menu() is None
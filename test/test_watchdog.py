@@ -0,0 +1,122 @@
+import logging
+import time
+
+import pytest
+
+import qmenuview
+from qmenuview import watchdog
+from qmenuview.qt import QtGui
+
+
+@pytest.fixture(scope='function', autouse=True)
+def useqtbot(qtbot):
+    pass
+
+
+@pytest.fixture(scope='function')
+def treemodel():
+    m = QtGui.QStandardItemModel()
+    for i in range(3):
+        item = QtGui.QStandardItem("testrow%s" % i)
+        m.appendRow(item)
+        for j in range(3):
+            item.appendRow(QtGui.QStandardItem("testrow%s:%s" % (i, j)))
+    return m
+
+
+def test_report_slow_handler(qtbot, treemodel, caplog):
+    mv = qmenuview.MenuView()
+    mv.model = treemodel
+    dog = watchdog.Watchdog(budget=0)
+    dog.attach(mv)
+    item = QtGui.QStandardItem("new")
+    item.appendRow(QtGui.QStandardItem("child"))
+    with caplog.at_level(logging.WARNING, logger='qmenuview.watchdog'):
+        with qtbot.waitSignal(dog.stalled) as blocker:
+            treemodel.insertRow(1, item)
+    report = blocker.args[0]
+    assert report['operation'] == 'insert_menus'
+    assert (report['first'], report['last']) == (1, 1)
+    assert report['nodes'] == 2
+    assert report['stack']
+    assert dog.recent() == [report]
+    assert 'insert_menus' in caplog.text
+    assert [a.text() for a in mv.actions()][1] == 'new'
+
+
+def test_ring_buffer(treemodel):
+    mv = qmenuview.MenuView()
+    mv.model = treemodel
+    dog = watchdog.Watchdog(budget=0, size=2)
+    dog.attach(mv)
+    for i in range(3):
+        treemodel.item(0).setText("changed%s" % i)
+    reports = dog.recent()
+    assert len(reports) == 2
+    assert [r['operation'] for r in reports] == ['update_menus', 'update_menus']
+    dog.clear()
+    assert dog.recent() == []
+
+
+def test_stack_sample(treemodel):
+    class SlowView(qmenuview.MenuView):
+        def create_action(self, parent):
+            time.sleep(0.05)
+            return super(SlowView, self).create_action(parent)
+
+    mv = SlowView()
+    mv.model = treemodel
+    dog = watchdog.Watchdog(budget=10)
+    dog.attach(mv)
+    treemodel.appendRow(QtGui.QStandardItem("slow"))
+    report = dog.recent()[0]
+    assert report['elapsed'] > 10
+    assert 'time.sleep' in ''.join(report['stack'])
+
+
+def test_show_budget(treemodel):
+    mv = qmenuview.MenuView()
+    mv.max_depth = 1
+    mv.model = treemodel
+    dog = watchdog.Watchdog(budget=1000, show_budget=0)
+    dog.attach(mv)
+    treemodel.item(0).setText("fast")
+    assert dog.recent() == []
+    mv.actions()[0].menu().aboutToShow.emit()
+    report = dog.recent()[0]
+    assert report['operation'] == 'load_menu'
+    assert (report['first'], report['last']) == (0, 2)
+    assert report['nodes'] == 3
+
+
+def test_detach(treemodel):
+    mv = qmenuview.MenuView()
+    mv.model = treemodel
+    dog = watchdog.Watchdog(budget=0)
+    dog.attach(mv)
+    dog.detach(mv)
+    assert 'insert_menus' not in mv.__dict__
+    treemodel.appendRow(QtGui.QStandardItem("new"))
+    assert mv.actions()[-1].text() == "new"
+    assert dog.recent() == []
+
+
+def test_detach_stops_sampler(treemodel):
+    mv = qmenuview.MenuView()
+    mv.model = treemodel
+    other = qmenuview.MenuView()
+    dog = watchdog.Watchdog(budget=1000)
+    dog.attach(mv)
+    dog.attach(other)
+    treemodel.appendRow(QtGui.QStandardItem("new"))
+    thread = dog._sampler._thread
+    assert thread.is_alive()
+    dog.detach(other)
+    assert thread.is_alive(), "The sampler should run, while a view is attached."
+    dog.detach(mv)
+    assert not thread.is_alive(), "Detaching the last view should stop the sampler."
+    dog.attach(mv)
+    treemodel.appendRow(QtGui.QStandardItem("again"))
+    assert dog._sampler._thread.is_alive()
+    dog.close()
+    assert dog._sampler._thread is None